@@ -38,6 +38,7 @@ class Music:
         limit: int | None = None,
         offset: int | None = None,
         order_by: str | None = None,
+        cursor: str | None = None,
     ) -> PagedItems:
         """Get Track listing from the server."""
         return PagedItems.parse(
@@ -48,6 +49,7 @@ class Music:
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
+                cursor=cursor,
             ),
             Track,
         )
@@ -116,6 +118,7 @@ class Music:
         limit: int | None = None,
         offset: int | None = None,
         order_by: str | None = None,
+        cursor: str | None = None,
     ) -> PagedItems:
         """Get Albums listing from the server."""
         return PagedItems.parse(
@@ -126,6 +129,7 @@ class Music:
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
+                cursor=cursor,
             ),
             Album,
         )
@@ -184,6 +188,7 @@ class Music:
         offset: int | None = None,
         order_by: str | None = None,
         album_artists_only: bool = False,
+        cursor: str | None = None,
     ) -> PagedItems:
         """Get Artists listing from the server."""
         return PagedItems.parse(
@@ -194,6 +199,7 @@ class Music:
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
+                cursor=cursor,
                 album_artists_only=album_artists_only,
             ),
             Artist,
@@ -252,6 +258,7 @@ class Music:
         limit: int | None = None,
         offset: int | None = None,
         order_by: str | None = None,
+        cursor: str | None = None,
     ) -> PagedItems:
         """Get Playlists listing from the server."""
         return PagedItems.parse(
@@ -262,6 +269,7 @@ class Music:
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
+                cursor=cursor,
             ),
             Playlist,
         )
@@ -334,6 +342,7 @@ class Music:
         limit: int | None = None,
         offset: int | None = None,
         order_by: str | None = None,
+        cursor: str | None = None,
     ) -> PagedItems:
         """Get Radio listing from the server."""
         return PagedItems.parse(
@@ -344,6 +353,7 @@ class Music:
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
+                cursor=cursor,
             ),
             Radio,
         )
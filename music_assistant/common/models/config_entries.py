@@ -17,10 +17,12 @@ from music_assistant.constants import (
     CONF_EQ_MID,
     CONF_EQ_TREBLE,
     CONF_FLOW_MODE,
+    CONF_FLOW_PREFETCH,
     CONF_HIDE_GROUP_CHILDS,
     CONF_LOG_LEVEL,
     CONF_OUTPUT_CHANNELS,
     CONF_OUTPUT_CODEC,
+    CONF_STREAM_PROFILE,
     CONF_VOLUME_NORMALIZATION,
     CONF_VOLUME_NORMALIZATION_TARGET,
     SECURE_STRING_SUBSTITUTE,
@@ -428,6 +430,37 @@ CONF_ENTRY_CROSSFADE_DURATION = ConfigEntry(
     advanced=True,
 )
 
+CONF_ENTRY_FLOW_PREFETCH = ConfigEntry(
+    key=CONF_FLOW_PREFETCH,
+    type=ConfigEntryType.INTEGER,
+    range=(0, 60),
+    default_value=10,
+    label="Prefetch next track (seconds)",
+    description="Start loading (and buffering) the next track this many seconds before the "
+    "end of the current track. Increase this value if you experience gaps between tracks "
+    "with (slow) streaming providers, use 0 to disable. Note that the next track is fixed "
+    "once it is prefetched, it can no longer be moved or removed in the queue.",
+    depends_on=CONF_FLOW_MODE,
+    advanced=True,
+)
+
+CONF_ENTRY_STREAM_PROFILE = ConfigEntry(
+    key=CONF_STREAM_PROFILE,
+    type=ConfigEntryType.STRING,
+    label="Streaming profile",
+    options=[
+        ConfigValueOption("Low latency (small buffers)", "low_latency"),
+        ConfigValueOption("Balanced", "balanced"),
+        ConfigValueOption("High throughput (large bursts)", "high_throughput"),
+    ],
+    default_value="balanced",
+    description="Define how audio is buffered and sent to the player. "
+    "Low latency sends small chunks as soon as possible, for players with small buffers. "
+    "High throughput sends large bursts of audio, for players on (congested) wireless "
+    "networks. Change this setting only if you experience playback issues.",
+    advanced=True,
+)
+
 
 DEFAULT_PLAYER_CONFIG_ENTRIES = (
     CONF_ENTRY_VOLUME_NORMALIZATION,
@@ -440,4 +473,6 @@ DEFAULT_PLAYER_CONFIG_ENTRIES = (
     CONF_ENTRY_EQ_TREBLE,
     CONF_ENTRY_OUTPUT_CHANNELS,
     CONF_ENTRY_CROSSFADE_DURATION,
+    CONF_ENTRY_FLOW_PREFETCH,
+    CONF_ENTRY_STREAM_PROFILE,
 )
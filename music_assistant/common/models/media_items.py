@@ -409,6 +409,7 @@ class PagedItems(DataClassDictMixin):
     limit: int
     offset: int
     total: int | None = None
+    next_cursor: str | None = None
 
     @classmethod
     def parse(cls, raw: dict[str, Any], item_type: type) -> PagedItems:
@@ -419,6 +420,7 @@ class PagedItems(DataClassDictMixin):
             limit=raw["limit"],
             offset=raw["offset"],
             total=raw["total"],
+            next_cursor=raw.get("next_cursor"),
         )
 
 
@@ -74,6 +74,10 @@ class SyncTask:
     provider_instance: str
     media_types: tuple[MediaType, ...]
     task: asyncio.Task
+    # progress of the sync (if reported by the provider),
+    # the total may still grow while the provider is discovering items
+    items_processed: int = 0
+    items_total: int | None = None
 
     def to_dict(self, *args, **kwargs) -> dict[str, Any]:
         """Return SyncTask as (serializable) dict."""
@@ -82,4 +86,6 @@ class SyncTask:
             "provider_domain": self.provider_domain,
             "provider_instance": self.provider_instance,
             "media_types": [x.value for x in self.media_types],
+            "items_processed": self.items_processed,
+            "items_total": self.items_total,
         }
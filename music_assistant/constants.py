@@ -5,7 +5,7 @@ from typing import Final
 
 API_SCHEMA_VERSION: Final[int] = 23
 MIN_SCHEMA_VERSION: Final[int] = 23
-DB_SCHEMA_VERSION: Final[int] = 25
+DB_SCHEMA_VERSION: Final[int] = 27
 
 ROOT_LOGGER_NAME: Final[str] = "music_assistant"
 
@@ -51,6 +51,8 @@ CONF_BIND_IP: Final[str] = "bind_ip"
 CONF_BIND_PORT: Final[str] = "bind_port"
 CONF_PUBLISH_IP: Final[str] = "publish_ip"
 CONF_AUTO_PLAY: Final[str] = "auto_play"
+CONF_FLOW_PREFETCH: Final[str] = "flow_prefetch"
+CONF_STREAM_PROFILE: Final[str] = "stream_profile"
 
 # config default values
 DEFAULT_HOST: Final[str] = "0.0.0.0"
@@ -58,11 +60,15 @@ DEFAULT_PORT: Final[int] = 8095
 
 # common db tables
 DB_TABLE_TRACK_LOUDNESS: Final[str] = "track_loudness"
+DB_TABLE_SEEK_INDEX: Final[str] = "seek_index"
+DB_TABLE_SCAN_MANIFEST: Final[str] = "scan_manifest"
 DB_TABLE_PLAYLOG: Final[str] = "playlog"
 DB_TABLE_ARTISTS: Final[str] = "artists"
 DB_TABLE_ALBUMS: Final[str] = "albums"
 DB_TABLE_TRACKS: Final[str] = "tracks"
 DB_TABLE_ALBUM_TRACKS: Final[str] = "albumtracks"
+DB_TABLE_TRACK_ARTISTS: Final[str] = "track_artists"
+DB_TABLE_ALBUM_ARTISTS: Final[str] = "album_artists"
 DB_TABLE_PLAYLISTS: Final[str] = "playlists"
 DB_TABLE_RADIOS: Final[str] = "radios"
 DB_TABLE_CACHE: Final[str] = "cache"
@@ -70,6 +76,9 @@ DB_TABLE_SETTINGS: Final[str] = "settings"
 DB_TABLE_THUMBS: Final[str] = "thumbnails"
 DB_TABLE_PROVIDER_MAPPINGS: Final[str] = "provider_mappings"
 
+# number of (library) items to process before the pending db writes are committed
+DB_SYNC_BATCH_SIZE: Final[int] = 250
+
 # all other
 MASS_LOGO_ONLINE: Final[
     str
@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import functools
 import logging
 import os
+import sys
 import time
+import zlib
 from collections import OrderedDict
-from collections.abc import Iterator, MutableMapping
-from typing import TYPE_CHECKING, Any
+from collections.abc import Awaitable, Callable, Iterator, MutableMapping
+from enum import Enum
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from music_assistant.common.helpers.json import json_dumps, json_loads
 from music_assistant.common.models.config_entries import ConfigEntry, ConfigValueType
@@ -19,6 +23,7 @@ from music_assistant.constants import (
     DB_TABLE_SETTINGS,
     ROOT_LOGGER_NAME,
 )
+from music_assistant.server.helpers.api import api_command
 from music_assistant.server.helpers.database import DatabaseConnection
 from music_assistant.server.models.core_controller import CoreController
 
@@ -27,6 +32,14 @@ if TYPE_CHECKING:
 
 LOGGER = logging.getLogger(f"{ROOT_LOGGER_NAME}.cache")
 CONF_CLEAR_CACHE = "clear_cache"
+CONF_MEMORY_CACHE_SIZE = "memory_cache_size"
+DEFAULT_MEMORY_CACHE_SIZE = 32  # MB
+# writes to the cache db are buffered and flushed (in a single transaction) after this delay
+DB_FLUSH_DELAY = 5
+# (json) data larger than this (number of bytes) is stored compressed in the cache db
+DB_COMPRESS_MIN_SIZE = 4096
+_MISSING = object()
+_T = TypeVar("_T")
 
 
 class CacheController(CoreController):
@@ -38,7 +51,10 @@ class CacheController(CoreController):
         """Initialize core controller."""
         super().__init__(*args, **kwargs)
         self.database: DatabaseConnection | None = None
-        self._mem_cache = MemoryCache(500)
+        self._mem_cache = MemoryCache(DEFAULT_MEMORY_CACHE_SIZE * 1024 * 1024)
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._pending_writes: dict[str, dict[str, Any]] = {}
+        self._flush_timer: asyncio.TimerHandle | None = None
         self.manifest.name = "Cache controller"
         self.manifest.description = (
             "Music Assistant's core controller for caching data throughout the application."
@@ -67,6 +83,17 @@ class CacheController(CoreController):
                 label="Clear cache",
                 description="Reset/clear all items in the cache. ",
             ),
+            ConfigEntry(
+                key=CONF_MEMORY_CACHE_SIZE,
+                type=ConfigEntryType.INTEGER,
+                range=(1, 1024),
+                default_value=DEFAULT_MEMORY_CACHE_SIZE,
+                label="Memory cache size (MB)",
+                description="The (approximate) maximum amount of memory used to keep "
+                "frequently accessed cache items in memory. \n"
+                "Use the cache statistics (hits/misses/evictions) to size it for your library.",
+                advanced=True,
+            ),
             # ConfigEntry(
             #     key=CONF_BIND_IP,
             #     type=ConfigEntryType.STRING,
@@ -83,13 +110,15 @@ class CacheController(CoreController):
             # ),
         )
 
-    async def setup(self, config: CoreConfig) -> None:  # noqa: ARG002
+    async def setup(self, config: CoreConfig) -> None:
         """Async initialize of cache module."""
+        self._mem_cache.max_size = config.get_value(CONF_MEMORY_CACHE_SIZE) * 1024 * 1024
         await self._setup_database()
         self.__schedule_cleanup_task()
 
     async def close(self) -> None:
         """Cleanup on exit."""
+        await self._flush_pending_writes()
         await self.database.close()
 
     async def get(self, cache_key: str, checksum: str | None = None, default=None):
@@ -107,22 +136,27 @@ class CacheController(CoreController):
 
         # try memory cache first
         cache_data = self._mem_cache.get(cache_key)
-        if cache_data and (not checksum or cache_data[1] == checksum) and cache_data[2] >= cur_time:
+        if cache_data and (not checksum or cache_data[1] == checksum):
             return cache_data[0]
-        # fall back to db cache
-        if (db_row := await self.database.get_row(DB_TABLE_CACHE, {"key": cache_key})) and (
-            not checksum or db_row["checksum"] == checksum and db_row["expires"] >= cur_time
+        # fall back to db cache (or the writes that are not yet flushed to the db)
+        if not (db_row := self._pending_writes.get(cache_key)):
+            db_row = await self.database.get_row(DB_TABLE_CACHE, {"key": cache_key})
+        if (
+            db_row
+            and (not checksum or db_row["checksum"] == checksum)
+            and db_row["expires"] >= cur_time
         ):
             try:
-                data = await asyncio.to_thread(json_loads, db_row["data"])
+                data, size = await asyncio.to_thread(_deserialize_data, db_row["data"])
             except Exception as exc:  # pylint: disable=broad-except
                 LOGGER.exception("Error parsing cache data for %s", cache_key, exc_info=exc)
             else:
                 # also store in memory cache for faster access
-                self._mem_cache[cache_key] = (
-                    data,
-                    db_row["checksum"],
-                    db_row["expires"],
+                self._mem_cache.set(
+                    cache_key,
+                    (data, db_row["checksum"]),
+                    expires=db_row["expires"],
+                    size=len(cache_key) + size,
                 )
                 return data
         return default
@@ -134,37 +168,105 @@ class CacheController(CoreController):
         if checksum is not None and not isinstance(checksum, str):
             checksum = str(checksum)
         expires = int(time.time() + expiration)
-        self._mem_cache[cache_key] = (data, checksum, expires)
-        if (expires - time.time()) < 3600 * 4:
-            # do not cache items in db with short expiration
+        # store in memory right away, the (approximate) size of the item is updated once
+        # the data is serialized in a thread (a deep walk of a large object blocks the loop)
+        cache_value = (data, checksum)
+        self._mem_cache.set(cache_key, cache_value, expires=expires, size=sys.getsizeof(data))
+        # do not cache items in db with short expiration
+        store_in_db = (expires - time.time()) >= 3600 * 4
+        try:
+            data, size = await asyncio.to_thread(_serialize_data, data, store_in_db)
+        except TypeError:
+            if store_in_db:
+                raise
+            # data that is only kept in memory does not need to be serializable
             return
-        data = await asyncio.to_thread(json_dumps, data)
-        await self.database.insert(
-            DB_TABLE_CACHE,
-            {"key": cache_key, "expires": expires, "checksum": checksum, "data": data},
-            allow_replace=True,
-        )
+        self._mem_cache.set_size(cache_key, cache_value, len(cache_key) + size)
+        if not store_in_db:
+            return
+        self._pending_writes[cache_key] = {
+            "key": cache_key,
+            "expires": expires,
+            "checksum": checksum,
+            "data": data,
+        }
+        if self._flush_timer is None:
+            # run the flush in a clean context, it may be armed from within a (db) transaction
+            self._flush_timer = self.mass.loop.call_later(
+                DB_FLUSH_DELAY,
+                self.mass.create_task,
+                self._flush_pending_writes,
+                context=contextvars.Context(),
+            )
+
+    async def coalesce(self, key: str, func: Callable[[], Awaitable[_T]]) -> _T:
+        """Call func, concurrent calls with the same key await the already running call.
+
+        Used to prevent a stampede of (identical) requests to a provider when an item
+        is not (yet) in the cache.
+        """
+        if (task := self._in_flight.get(key)) is None:
+            task = asyncio.create_task(func())
+            self._in_flight[key] = task
+
+            def on_done(_task: asyncio.Task) -> None:
+                if self._in_flight.get(key) is _task:
+                    self._in_flight.pop(key)
+
+            task.add_done_callback(on_done)
+        # shield the shared task so a cancelled caller does not cancel it for all others
+        return await asyncio.shield(task)
+
+    async def refresh(self, key: str, func: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh a (stale) cache item in the background, see coalesce."""
+        try:
+            await self.coalesce(key, func)
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("Error while refreshing cache item %s: %s", key, str(err))
 
     async def delete(self, cache_key):
         """Delete data from cache."""
         self._mem_cache.pop(cache_key, None)
+        self._pending_writes.pop(cache_key, None)
         await self.database.delete(DB_TABLE_CACHE, {"key": cache_key})
 
     async def clear(self, key_filter: str | None = None) -> None:
         """Clear all/partial items from cache."""
-        self._mem_cache = {}
+        if key_filter:
+            for key in [x for x in self._mem_cache if key_filter in x]:
+                self._mem_cache.pop(key)
+            for key in [x for x in self._pending_writes if key_filter in x]:
+                self._pending_writes.pop(key)
+        else:
+            self._mem_cache.clear()
+            self._pending_writes.clear()
         query = f"key LIKE '%{key_filter}%'" if key_filter else None
         await self.database.delete(DB_TABLE_CACHE, query=query)
 
     async def auto_cleanup(self):
         """Sceduled auto cleanup task."""
-        # for now we simply reset the memory cache
-        self._mem_cache = {}
+        self._mem_cache.purge_expired()
         cur_timestamp = int(time.time())
-        for db_row in await self.database.get_rows(DB_TABLE_CACHE):
-            # clean up db cache object only if expired
-            if db_row["expires"] < cur_timestamp:
-                await self.delete(db_row["key"])
+        # clean up all expired db cache objects at once (using the expires index)
+        await self.database.delete_where_query(DB_TABLE_CACHE, f"expires < {cur_timestamp}")
+        # compact db (only if enough space can be reclaimed)
+        await self.database.vacuum()
+
+    @api_command("cache/stats")
+    def get_stats(self) -> dict[str, int]:
+        """Return statistics of the memory cache (e.g. to tune its size)."""
+        return self._mem_cache.get_stats()
+
+    async def _flush_pending_writes(self) -> None:
+        """Write all pending (buffered) cache items to the database."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending_writes:
+            return
+        pending_writes = list(self._pending_writes.values())
+        self._pending_writes = {}
+        await self.database.insert_or_replace_many(DB_TABLE_CACHE, pending_writes)
 
     async def _setup_database(self):
         """Initialize database."""
@@ -201,8 +303,6 @@ class CacheController(CoreController):
             DB_TABLE_SETTINGS,
             {"key": "version", "value": str(DB_SCHEMA_VERSION), "type": "str"},
         )
-        # compact db
-        await self.database.execute("VACUUM")
 
     async def __create_database_tables(self) -> None:
         """Create database table(s)."""
@@ -223,16 +323,25 @@ class CacheController(CoreController):
         await self.database.execute(
             f"CREATE INDEX IF NOT EXISTS {DB_TABLE_CACHE}_key_idx on {DB_TABLE_CACHE}(key);"
         )
+        await self.database.execute(
+            f"CREATE INDEX IF NOT EXISTS {DB_TABLE_CACHE}_expires_idx "
+            f"on {DB_TABLE_CACHE}(expires);"
+        )
 
     def __schedule_cleanup_task(self):
         """Schedule the cleanup task."""
         self.mass.create_task(self.auto_cleanup())
         # reschedule self
-        self.mass.loop.call_later(3600, self.__schedule_cleanup_task)
+        self.mass.loop.call_later(3600, self.__schedule_cleanup_task, context=contextvars.Context())
 
 
-def use_cache(expiration=86400 * 30):
-    """Return decorator that can be used to cache a method's result."""
+def use_cache(expiration: int = 86400 * 30, stale_while_revalidate: int = 0):
+    """Return decorator that can be used to cache a method's result.
+
+    Concurrent calls (with the same arguments) are coalesced into a single call.
+    When stale_while_revalidate is set, an expired result is still returned for
+    (at most) this number of seconds while it is refreshed in the background.
+    """
 
     def wrapper(func):
         @functools.wraps(func)
@@ -247,18 +356,44 @@ def use_cache(expiration=86400 * 30):
             for key in sorted(kwargs.keys()):
                 cache_key_parts.append(f"{key}{kwargs[key]}")
             cache_key = ".".join(cache_key_parts)
-
-            cachedata = await method_class.cache.get(cache_key, checksum=cache_checksum)
-
-            if not skip_cache and cachedata is not None:
-                return cachedata
-            result = await func(*args, **kwargs)
-            asyncio.create_task(
-                method_class.cache.set(
-                    cache_key, result, expiration=expiration, checksum=cache_checksum
+            cache: CacheController = method_class.cache
+
+            async def fetch():
+                result = await func(*args, **kwargs)
+                if result is None:
+                    # nothing to cache (a cached None would be a cache miss anyway)
+                    return result
+                if stale_while_revalidate:
+                    # store the result along with the timestamp it needs to be refreshed
+                    cache_data = {
+                        "data": result,
+                        "refresh_after": int(time.time() + expiration),
+                    }
+                else:
+                    cache_data = result
+                asyncio.create_task(
+                    cache.set(
+                        cache_key,
+                        cache_data,
+                        expiration=expiration + stale_while_revalidate,
+                        checksum=cache_checksum,
+                    )
                 )
-            )
-            return result
+                return result
+
+            cachedata = None if skip_cache else await cache.get(cache_key, checksum=cache_checksum)
+            if cachedata is None:
+                return await cache.coalesce(cache_key, fetch)
+            if (
+                stale_while_revalidate
+                and isinstance(cachedata, dict)
+                and "refresh_after" in cachedata
+            ):
+                if cachedata["refresh_after"] < time.time():
+                    # serve the stale data and refresh it in the background
+                    asyncio.create_task(cache.refresh(cache_key, fetch))
+                return cachedata["data"]
+            return cachedata
 
         return wrapped
 
@@ -266,42 +401,144 @@ def use_cache(expiration=86400 * 30):
 
 
 class MemoryCache(MutableMapping):
-    """Simple limited in-memory cache implementation."""
+    """Simple in-memory LRU cache, limited by the (approximate) size of its items.
+
+    Items may have an expiration (timestamp), expired items are never returned
+    and are removed when accessed or when `purge_expired` is called.
+    """
+
+    def __init__(self, max_size: int):
+        """Initialize (with the max size of all items in bytes)."""
+        self._max_size = max_size
+        self._size = 0
+        # key --> (value, expires, size)
+        self.d: OrderedDict[str, tuple[Any, float | None, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
-    def __init__(self, maxlen: int):
-        """Initialize."""
-        self._maxlen = maxlen
-        self.d = OrderedDict()
+    @property
+    def max_size(self) -> int:
+        """Return max size (in bytes)."""
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int) -> None:
+        """Set max size (in bytes), evicts items if needed."""
+        self._max_size = max_size
+        self._evict()
 
     @property
-    def maxlen(self) -> int:
-        """Return max length."""
-        return self._maxlen
+    def size(self) -> int:
+        """Return the (approximate) size of all items (in bytes)."""
+        return self._size
 
     def get(self, key: str, default: Any = None) -> Any:
-        """Return item or default."""
-        return self.d.get(key, default)
+        """Return (non expired) item or default."""
+        if (entry := self.d.get(key)) is None:
+            self.misses += 1
+            return default
+        value, expires, _ = entry
+        if expires is not None and expires < time.time():
+            self.pop(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self.d.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self, key: str, value: Any, expires: float | None = None, size: int | None = None
+    ) -> None:
+        """Set item, optionally with an expiration timestamp and its (precalculated) size."""
+        self.pop(key)
+        if size is None:
+            size = _get_approximate_size(key) + _get_approximate_size(value)
+        if size > self._max_size:
+            # never store items that would flush (almost) the whole cache
+            return
+        self.d[key] = (value, expires, size)
+        self._size += size
+        self._evict()
+
+    def set_size(self, key: str, value: Any, size: int) -> None:
+        """Update the (approximate) size of an item, if it was not replaced in the meantime."""
+        if (entry := self.d.get(key)) is None or entry[0] is not value:
+            return
+        if size > self._max_size:
+            self.pop(key)
+            return
+        self.d[key] = (value, entry[1], size)
+        self._size += size - entry[2]
+        self._evict()
 
     def pop(self, key: str, default: Any = None) -> Any:
         """Pop item from collection."""
-        return self.d.pop(key, default)
+        if (entry := self.d.pop(key, None)) is None:
+            return default
+        self._size -= entry[2]
+        return entry[0]
+
+    def clear(self) -> None:
+        """Remove all items."""
+        self.d.clear()
+        self._size = 0
+
+    def purge_expired(self) -> int:
+        """Remove all expired items, returns the number of items removed."""
+        cur_time = time.time()
+        expired_keys = [
+            key
+            for key, (_, expires, _) in self.d.items()
+            if expires is not None and expires < cur_time
+        ]
+        for key in expired_keys:
+            self.pop(key)
+        self.expirations += len(expired_keys)
+        return len(expired_keys)
+
+    def get_stats(self) -> dict[str, int]:
+        """Return statistics of the cache."""
+        return {
+            "items": len(self.d),
+            "size": self._size,
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _evict(self) -> None:
+        """Evict the least recently used items until the cache fits its max size."""
+        while self._size > self._max_size and self.d:
+            _, (_, _, size) = self.d.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
 
     def __getitem__(self, key: str) -> Any:
         """Get item."""
-        self.d.move_to_end(key)
-        return self.d[key]
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
 
     def __setitem__(self, key: str, value: Any) -> None:
         """Set item."""
-        if key in self.d:
-            self.d.move_to_end(key)
-        elif len(self.d) == self.maxlen:
-            self.d.popitem(last=False)
-        self.d[key] = value
+        self.set(key, value)
 
     def __delitem__(self, key) -> None:
         """Delete item."""
-        del self.d[key]
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Return if (non expired) item is in the cache, without touching the LRU order."""
+        if (entry := self.d.get(key)) is None:
+            return False
+        return entry[1] is None or entry[1] >= time.time()
 
     def __iter__(self) -> Iterator:
         """Iterate items."""
@@ -310,3 +547,46 @@ class MemoryCache(MutableMapping):
     def __len__(self) -> int:
         """Return length."""
         return len(self.d)
+
+
+def _serialize_data(data: Any, compress: bool = True) -> tuple[str | bytes, int]:
+    """Serialize data to store in the cache db, large values are (zlib) compressed.
+
+    Returns the serialized data and the length of the (uncompressed) json,
+    which is used as (cheap) estimate of the size of the data in memory.
+    """
+    json_data = json_dumps(data)
+    if not compress or len(json_data) < DB_COMPRESS_MIN_SIZE:
+        return json_data, len(json_data)
+    return zlib.compress(json_data.encode("utf-8")), len(json_data)
+
+
+def _deserialize_data(data: str | bytes) -> tuple[Any, int]:
+    """Deserialize data stored in the cache db, returns the data and the length of the json."""
+    if isinstance(data, bytes):
+        data = zlib.decompress(data)
+    return json_loads(data), len(data)
+
+
+def _get_approximate_size(obj: Any) -> int:
+    """Return the approximate (deep) size of an object in bytes."""
+    size = 0
+    seen: set[int] = set()
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, type | Enum):
+            # skip shared objects such as classes and enum members
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, str | bytes | bytearray | int | float | None):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list | tuple | set | frozenset):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(item.__dict__)
+    return size
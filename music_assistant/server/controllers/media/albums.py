@@ -22,7 +22,12 @@ from music_assistant.common.models.media_items import (
     MediaType,
     Track,
 )
-from music_assistant.constants import DB_TABLE_ALBUM_TRACKS, DB_TABLE_ALBUMS, DB_TABLE_TRACKS
+from music_assistant.constants import (
+    DB_TABLE_ALBUM_ARTISTS,
+    DB_TABLE_ALBUM_TRACKS,
+    DB_TABLE_ALBUMS,
+    DB_TABLE_TRACKS,
+)
 from music_assistant.server.controllers.media.base import MediaControllerBase
 from music_assistant.server.helpers.compare import (
     compare_album,
@@ -104,7 +109,7 @@ class AlbumsController(MediaControllerBase[Album]):
             await self.mass.metadata.get_album_metadata(item)
         # actually add (or update) the item in the library db
         # use the lock to prevent a race condition of the same item being added twice
-        async with self._db_add_lock:
+        async with self._db_add_lock, self.mass.music.database.transaction():
             library_item = await self._add_library_item(item)
         # also fetch the same album on all providers
         if metadata_lookup:
@@ -158,6 +163,12 @@ class AlbumsController(MediaControllerBase[Album]):
         )
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, provider_mappings)
+        # update album artists table
+        await self._set_artist_mappings(db_id, album_artists)
+        # update search index
+        await self._set_search_index(
+            db_id, update.name if overwrite else cur_item.name, album_artists
+        )
         self.logger.debug("updated %s in database: %s", update.name, db_id)
         # get full created object
         library_item = await self.get_library_item(db_id)
@@ -178,6 +189,8 @@ class AlbumsController(MediaControllerBase[Album]):
                 await self.mass.music.tracks.remove_item_from_library(db_track.item_id)
         # delete entry(s) from albumtracks table
         await self.mass.music.database.delete(DB_TABLE_ALBUM_TRACKS, {"album_id": db_id})
+        # delete entry(s) from album artists table
+        await self.mass.music.database.delete(DB_TABLE_ALBUM_ARTISTS, {"album_id": db_id})
         # delete the album itself from db
         await super().remove_item_from_library(item_id)
 
@@ -241,7 +254,7 @@ class AlbumsController(MediaControllerBase[Album]):
         # insert new item
         album_artists = await self._get_artist_mappings(item, cur_item)
         sort_artist = album_artists[0].sort_name
-        new_item = await self.mass.music.database.insert(
+        db_id = await self.mass.music.database.insert(
             self.db_table,
             {
                 "name": item.name,
@@ -259,9 +272,12 @@ class AlbumsController(MediaControllerBase[Album]):
                 "timestamp_modified": int(utc_timestamp()),
             },
         )
-        db_id = new_item["item_id"]
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, item.provider_mappings)
+        # update album artists table
+        await self._set_artist_mappings(db_id, album_artists)
+        # update search index
+        await self._set_search_index(db_id, item.name, album_artists)
         self.logger.debug("added %s to database", item.name)
         # return the full item we just added
         return await self.get_library_item(db_id)
@@ -19,7 +19,13 @@ from music_assistant.common.models.media_items import (
     PagedItems,
     Track,
 )
-from music_assistant.constants import VARIOUS_ARTISTS_ID_MBID, VARIOUS_ARTISTS_NAME
+from music_assistant.constants import (
+    DB_TABLE_ALBUM_ARTISTS,
+    DB_TABLE_PROVIDER_MAPPINGS,
+    DB_TABLE_TRACK_ARTISTS,
+    VARIOUS_ARTISTS_ID_MBID,
+    VARIOUS_ARTISTS_NAME,
+)
 from music_assistant.server.controllers.media.base import MediaControllerBase
 from music_assistant.server.controllers.music import (
     DB_TABLE_ALBUMS,
@@ -68,7 +74,7 @@ class ArtistsController(MediaControllerBase[Artist]):
             await self.mass.metadata.get_artist_metadata(item)
         # actually add (or update) the item in the library db
         # use the lock to prevent a race condition of the same item being added twice
-        async with self._db_add_lock:
+        async with self._db_add_lock, self.mass.music.database.transaction():
             library_item = await self._add_library_item(item)
         # also fetch same artist on all providers
         if metadata_lookup:
@@ -112,6 +118,8 @@ class ArtistsController(MediaControllerBase[Artist]):
         )
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, provider_mappings)
+        # update search index
+        await self._set_search_index(db_id, update.name if overwrite else cur_item.name)
         self.logger.debug("updated %s in database: %s", update.name, db_id)
         # get full created object
         library_item = await self.get_library_item(db_id)
@@ -123,7 +131,7 @@ class ArtistsController(MediaControllerBase[Artist]):
         # return the full item we just updated
         return library_item
 
-    async def library_items(
+    async def library_items(  # noqa: PLR0913
         self,
         favorite: bool | None = None,
         search: str | None = None,
@@ -132,6 +140,8 @@ class ArtistsController(MediaControllerBase[Artist]):
         order_by: str = "sort_name",
         extra_query: str | None = None,
         extra_query_params: dict[str, Any] | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
         album_artists_only: bool = False,
     ) -> PagedItems:
         """Get in-database (album) artists."""
@@ -146,6 +156,8 @@ class ArtistsController(MediaControllerBase[Artist]):
             order_by=order_by,
             extra_query=extra_query,
             extra_query_params=extra_query_params,
+            cursor=cursor,
+            include_total=include_total,
         )
 
     async def tracks(
@@ -183,19 +195,25 @@ class ArtistsController(MediaControllerBase[Artist]):
         db_id = int(item_id)  # ensure integer
         # recursively also remove artist albums
         for db_row in await self.mass.music.database.get_rows_from_query(
-            f"SELECT item_id FROM {DB_TABLE_ALBUMS} WHERE artists LIKE '%\"{db_id}\"%'",
+            f"SELECT album_id FROM {DB_TABLE_ALBUM_ARTISTS} WHERE artist_id = :artist_id",
+            {"artist_id": db_id},
             limit=5000,
         ):
             with contextlib.suppress(MediaNotFoundError):
-                await self.mass.music.albums.remove_item_from_library(db_row["item_id"])
+                await self.mass.music.albums.remove_item_from_library(db_row["album_id"])
 
         # recursively also remove artist tracks
         for db_row in await self.mass.music.database.get_rows_from_query(
-            f"SELECT item_id FROM {DB_TABLE_TRACKS} WHERE artists LIKE '%\"{db_id}\"%'",
+            f"SELECT track_id FROM {DB_TABLE_TRACK_ARTISTS} WHERE artist_id = :artist_id",
+            {"artist_id": db_id},
             limit=5000,
         ):
             with contextlib.suppress(MediaNotFoundError):
-                await self.mass.music.tracks.remove_item_from_library(db_row["item_id"])
+                await self.mass.music.tracks.remove_item_from_library(db_row["track_id"])
+
+        # delete any remaining (e.g. not removable) links to the artist
+        await self.mass.music.database.delete(DB_TABLE_ALBUM_ARTISTS, {"artist_id": db_id})
+        await self.mass.music.database.delete(DB_TABLE_TRACK_ARTISTS, {"artist_id": db_id})
 
         # delete the artist itself from db
         await super().remove_item_from_library(db_id)
@@ -252,12 +270,12 @@ class ArtistsController(MediaControllerBase[Artist]):
                 item_id,
                 provider_instance_id_or_domain,
             ):
-                # TODO: adjust to json query instead of text search?
-                query = f"WHERE tracks.artists LIKE '%\"{db_artist.item_id}\"%'"
-                query += (
-                    f" AND tracks.provider_mappings LIKE '%\"{provider_instance_id_or_domain}\"%'"
+                paged_list = await self.mass.music.tracks.library_items(
+                    extra_query=self._get_artist_items_query(
+                        MediaType.TRACK, provider_instance_id_or_domain
+                    ),
+                    extra_query_params={"artist_id": int(db_artist.item_id)},
                 )
-                paged_list = await self.mass.music.tracks.library_items(extra_query=query)
                 return paged_list.items
         # store (serializable items) in cache
         self.mass.create_task(
@@ -270,9 +288,10 @@ class ArtistsController(MediaControllerBase[Artist]):
         item_id: str | int,
     ) -> list[Track]:
         """Return all tracks for an artist in the library."""
-        # TODO: adjust to json query instead of text search?
-        query = f"WHERE tracks.artists LIKE '%\"{item_id}\"%'"
-        paged_list = await self.mass.music.tracks.library_items(extra_query=query)
+        paged_list = await self.mass.music.tracks.library_items(
+            extra_query=self._get_artist_items_query(MediaType.TRACK),
+            extra_query_params={"artist_id": int(item_id)},
+        )
         return paged_list.items
 
     async def get_provider_artist_albums(
@@ -302,12 +321,12 @@ class ArtistsController(MediaControllerBase[Artist]):
                 item_id,
                 provider_instance_id_or_domain,
             ):
-                # TODO: adjust to json query instead of text search?
-                query = f"WHERE albums.artists LIKE '%\"{db_artist.item_id}\"%'"
-                query += (
-                    f" AND albums.provider_mappings LIKE '%\"{provider_instance_id_or_domain}\"%'"
+                paged_list = await self.mass.music.albums.library_items(
+                    extra_query=self._get_artist_items_query(
+                        MediaType.ALBUM, provider_instance_id_or_domain
+                    ),
+                    extra_query_params={"artist_id": int(db_artist.item_id)},
                 )
-                paged_list = await self.mass.music.albums.library_items(extra_query=query)
                 return paged_list.items
         # store (serializable items) in cache
         self.mass.create_task(
@@ -320,11 +339,37 @@ class ArtistsController(MediaControllerBase[Artist]):
         item_id: str | int,
     ) -> list[Album]:
         """Return all in-library albums for an artist."""
-        # TODO: adjust to json query instead of text search?
-        query = f"WHERE albums.artists LIKE '%\"{item_id}\"%'"
-        paged_list = await self.mass.music.albums.library_items(extra_query=query)
+        paged_list = await self.mass.music.albums.library_items(
+            extra_query=self._get_artist_items_query(MediaType.ALBUM),
+            extra_query_params={"artist_id": int(item_id)},
+        )
         return paged_list.items
 
+    @staticmethod
+    def _get_artist_items_query(
+        media_type: MediaType, provider_instance_id_or_domain: str | None = None
+    ) -> str:
+        """Return (WHERE) query to select the library albums/tracks of the artist (:artist_id).
+
+        Optionally only the items that are (also) available on the given provider.
+        """
+        if media_type == MediaType.ALBUM:
+            table, join_table, id_column = DB_TABLE_ALBUMS, DB_TABLE_ALBUM_ARTISTS, "album_id"
+        else:
+            table, join_table, id_column = DB_TABLE_TRACKS, DB_TABLE_TRACK_ARTISTS, "track_id"
+        query = (
+            f"{table}.item_id in (SELECT {id_column} FROM {join_table} "
+            "WHERE artist_id = :artist_id)"
+        )
+        if provider_instance_id_or_domain:
+            query += (
+                f" AND {table}.item_id in (SELECT item_id FROM {DB_TABLE_PROVIDER_MAPPINGS} "
+                f"WHERE media_type = '{media_type.value}' "
+                f"AND (provider_instance = '{provider_instance_id_or_domain}' "
+                f"OR provider_domain = '{provider_instance_id_or_domain}'))"
+            )
+        return query
+
     async def _add_library_item(self, item: Artist | ItemMapping) -> Artist:
         """Add a new item record to the database."""
         # enforce various artists name + id
@@ -368,7 +413,7 @@ class ArtistsController(MediaControllerBase[Artist]):
         # try to construct (a half baken) Artist object from it
         if isinstance(item, ItemMapping):
             item = Artist.from_dict(item.to_dict())
-        new_item = await self.mass.music.database.insert(
+        db_id = await self.mass.music.database.insert(
             self.db_table,
             {
                 "name": item.name,
@@ -381,9 +426,10 @@ class ArtistsController(MediaControllerBase[Artist]):
                 "timestamp_modified": int(utc_timestamp()),
             },
         )
-        db_id = new_item["item_id"]
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, item.provider_mappings)
+        # update search index
+        await self._set_search_index(db_id, item.name)
         self.logger.debug("added %s to database", item.name)
         # return the full item we just added
         return await self.get_library_item(db_id)
@@ -3,12 +3,13 @@ from __future__ import annotations
 
 import logging
 from abc import ABCMeta, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections.abc import AsyncGenerator, Iterable, Mapping
 from contextlib import suppress
 from time import time
 from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
-from music_assistant.common.helpers.json import json_loads, serialize_to_json
+from music_assistant.common.helpers.json import json_dumps, json_loads, serialize_to_json
 from music_assistant.common.models.enums import EventType, MediaType, ProviderFeature
 from music_assistant.common.models.errors import InvalidDataError, MediaNotFoundError
 from music_assistant.common.models.media_items import (
@@ -21,7 +22,13 @@ from music_assistant.common.models.media_items import (
     Track,
     media_from_dict,
 )
-from music_assistant.constants import DB_TABLE_PROVIDER_MAPPINGS, ROOT_LOGGER_NAME
+from music_assistant.constants import (
+    DB_TABLE_ALBUM_ARTISTS,
+    DB_TABLE_PROVIDER_MAPPINGS,
+    DB_TABLE_TRACK_ARTISTS,
+    ROOT_LOGGER_NAME,
+)
+from music_assistant.server.helpers.compare import create_search_string
 
 if TYPE_CHECKING:
     from music_assistant.server import MusicAssistant
@@ -30,6 +37,9 @@ ItemCls = TypeVar("ItemCls", bound="MediaItemType")
 
 REFRESH_INTERVAL = 60 * 60 * 24 * 30
 JSON_KEYS = ("artists", "metadata", "provider_mappings")
+# (not null) columns that can be combined with the item_id for cursor based paging
+KEYSET_COLUMNS = ("item_id", "name", "sort_name", "timestamp_added", "timestamp_modified")
+COUNT_CACHE_SIZE = 50
 
 
 class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
@@ -43,6 +53,9 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
         """Initialize class."""
         self.mass = mass
         self.base_query = f"SELECT * FROM {self.db_table}"
+        self.fts_table = f"{self.db_table}_fts"
+        # cached (total) counts of library queries: (database revision, count)
+        self._count_cache: dict[tuple[str, str], tuple[int, int]] = {}
         self.logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.music.{self.media_type.value}")
 
     @abstractmethod
@@ -71,6 +84,8 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
             DB_TABLE_PROVIDER_MAPPINGS,
             {"media_type": self.media_type.value, "item_id": db_id},
         )
+        # update search index
+        await self.mass.music.database.delete(self.fts_table, {"rowid": db_id})
         # NOTE: this does not delete any references to this item in other records,
         # this is handled/overridden in the mediatype specific controllers
         self.mass.signal_event(EventType.MEDIA_ITEM_DELETED, library_item.uri, library_item)
@@ -85,52 +100,92 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
         order_by: str = "sort_name",
         extra_query: str | None = None,
         extra_query_params: dict[str, Any] | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> PagedItems:
-        """Get in-database items."""
+        """Get in-database items.
+
+        Pass the (opaque) next_cursor of the previous page as cursor to fetch the next page,
+        this is a lot cheaper than using an offset for large libraries.
+        Cursors are supported when ordering by one of the KEYSET_COLUMNS.
+        """
         sql_query = self.base_query
-        params = extra_query_params or {}
+        params = dict(extra_query_params or {})
         query_parts: list[str] = []
         if extra_query:
             # prevent duplicate where statement
             if extra_query.lower().startswith("where "):
                 extra_query = extra_query[5:]
             query_parts.append(extra_query)
-        if search:
-            params["search"] = f"%{search}%"
-            if self.media_type in (MediaType.ALBUM, MediaType.TRACK):
-                query_parts.append(
-                    f"({self.db_table}.name LIKE :search "
-                    f" OR {self.db_table}.sort_name LIKE :search"
-                    f" OR {self.db_table}.artists LIKE :search)"
-                )
-            else:
-                query_parts.append(f"{self.db_table}.name LIKE :search")
+        if search and (fts_query := self._get_fts_query(search)):
+            # use the full text search index to find matching items
+            params["search"] = fts_query
+            query_parts.append(
+                f"{self.db_table}.item_id IN (SELECT rowid FROM {self.fts_table} "
+                f"WHERE {self.fts_table} MATCH :search)"
+            )
         if favorite is not None:
             query_parts.append(f"{self.db_table}.favorite = :favorite")
             params["favorite"] = favorite
         if query_parts:
             # concetenate all where queries
             sql_query += " WHERE " + " AND ".join(query_parts)
-        sql_query += f" ORDER BY {order_by}"
+        keyset = self._get_keyset(order_by)
+        if keyset is not None:
+            # order by a unique key so we can continue after the last item of a page
+            key_column, direction = keyset
+            order_by = f"{key_column} {direction}, {self.db_table}.item_id {direction}"
+        if cursor:
+            if keyset is None:
+                raise InvalidDataError(f"Cursor is not supported when ordering by {order_by}")
+            cursor_key, cursor_id = self._decode_cursor(cursor)
+            operator = "<" if direction == "DESC" else ">"
+            cursor_query = (
+                f"({key_column}, {self.db_table}.item_id) {operator} (:_cursor_key, :_cursor_id)"
+            )
+            items_query = f"{sql_query} {'AND' if query_parts else 'WHERE'} {cursor_query}"
+            items_params = {**params, "_cursor_key": cursor_key, "_cursor_id": cursor_id}
+            offset = 0
+        else:
+            items_query = sql_query
+            items_params = params
         items = await self._get_library_items_by_query(
-            sql_query, params, limit=limit, offset=offset
+            f"{items_query} ORDER BY {order_by}", items_params, limit=limit, offset=offset
         )
         count = len(items)
-        if 0 < count < limit:
+        next_cursor = None
+        if keyset is not None and count and count == limit:
+            last_item = items[-1]
+            next_cursor = self._encode_cursor(
+                getattr(last_item, key_column.split(".")[1]), last_item.item_id
+            )
+        if not include_total:
+            total = None
+        elif not cursor and 0 < count < limit:
             total = offset + count
         else:
-            total = await self.mass.music.database.get_count_from_query(sql_query, params)
-        return PagedItems(items=items, count=count, limit=limit, offset=offset, total=total)
+            total = await self._get_library_count(sql_query, params)
+        return PagedItems(
+            items=items,
+            count=count,
+            limit=limit,
+            offset=offset,
+            total=total,
+            next_cursor=next_cursor,
+        )
 
     async def iter_library_items(
         self,
         favorite: bool | None = None,
         search: str | None = None,
         order_by: str = "sort_name",
+        extra_query: str | None = None,
+        extra_query_params: dict[str, Any] | None = None,
     ) -> AsyncGenerator[ItemCls, None]:
         """Iterate all in-database items."""
         limit: int = 500
         offset: int = 0
+        cursor: str | None = None
         while True:
             next_items = await self.library_items(
                 favorite=favorite,
@@ -138,12 +193,20 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
+                extra_query=extra_query,
+                extra_query_params=extra_query_params,
+                cursor=cursor,
+                include_total=False,
             )
             for item in next_items.items:
                 yield item
             if next_items.count < limit:
                 break
-            offset += limit
+            if next_items.next_cursor:
+                cursor = next_items.next_cursor
+            else:
+                # ordering does not support a cursor, fallback to offset
+                offset += limit
 
     async def get(
         self,
@@ -219,10 +282,7 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
         # create safe search string
         search_query = search_query.replace("/", " ").replace("'", "")
         if provider_instance_id_or_domain == "library":
-            return [
-                self.item_cls.from_dict(self._parse_db_row(db_row))
-                for db_row in await self.mass.music.database.search(self.db_table, search_query)
-            ]
+            return await self._search_library(search_query, limit)
         prov = self.mass.get_provider(provider_instance_id_or_domain)
         if prov is None:
             return []
@@ -329,37 +389,14 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
         offset: int = 0,
     ) -> list[ItemCls]:
         """Fetch all records from library for given provider."""
-        if provider_instance_id_or_domain == "library":
-            if provider_item_ids is not None:
-                prov_ids_string = str(tuple(int(x) for x in provider_item_ids))
-                if prov_ids_string.endswith(",)"):
-                    prov_ids_string = prov_ids_string.replace(",)", ")")
-                extra_query = f"item_id in {prov_ids_string}"
-            else:
-                extra_query = None
-            paged_list = await self.library_items(
-                limit=limit, offset=offset, extra_query=extra_query
-            )
-            return paged_list.items
-
-        # we use the separate provider_mappings table to perform quick lookups
-        # from provider id's to database id's because this is faster
-        # (and more compatible) than querying the provider_mappings json column
-        subquery = (
-            f"SELECT item_id FROM {DB_TABLE_PROVIDER_MAPPINGS} WHERE "
-            f" media_type = '{self.media_type.value}' AND "
-            f"(provider_instance = '{provider_instance_id_or_domain}' "
-            f"OR provider_domain = '{provider_instance_id_or_domain}')"
+        query, params = self._get_prov_id_query(provider_instance_id_or_domain, provider_item_ids)
+        paged_list = await self.library_items(
+            limit=limit,
+            offset=offset,
+            extra_query=query,
+            extra_query_params=params,
+            include_total=False,
         )
-        if provider_item_ids is not None:
-            prov_ids = str(tuple(provider_item_ids))
-            if prov_ids.endswith(",)"):
-                prov_ids = prov_ids.replace(",)", ")")
-            subquery += f" AND provider_item_id in {prov_ids}"
-        # final query is a where query from the subquery
-        # that queries the provider_mappings table
-        query = f"WHERE {self.db_table}.item_id in ({subquery})"
-        paged_list = await self.library_items(limit=limit, offset=offset, extra_query=query)
         return paged_list.items
 
     async def iter_library_items_by_prov_id(
@@ -368,20 +405,11 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
         provider_item_ids: tuple[str, ...] | None = None,
     ) -> AsyncGenerator[ItemCls, None]:
         """Iterate all records from database for given provider."""
-        limit: int = 500
-        offset: int = 0
-        while True:
-            next_items = await self.get_library_items_by_prov_id(
-                provider_instance_id_or_domain,
-                provider_item_ids=provider_item_ids,
-                limit=limit,
-                offset=offset,
-            )
-            for item in next_items:
-                yield item
-            if len(next_items) < limit:
-                break
-            offset += limit
+        query, params = self._get_prov_id_query(provider_instance_id_or_domain, provider_item_ids)
+        async for item in self.iter_library_items(
+            order_by="item_id", extra_query=query, extra_query_params=params
+        ):
+            yield item
 
     async def set_favorite(self, item_id: str | int, favorite: bool) -> None:
         """Set the favorite bool on a database item."""
@@ -410,9 +438,15 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
         if not force_refresh and (cache := await self.mass.cache.get(cache_key)):
             return self.item_cls.from_dict(cache)
         if provider := self.mass.get_provider(provider_instance_id_or_domain):
-            with suppress(MediaNotFoundError):
+
+            async def get_item() -> ItemCls | None:
                 if item := await provider.get_item(self.media_type, item_id):
                     await self.mass.cache.set(cache_key, item.to_dict())
+                return item
+
+            with suppress(MediaNotFoundError):
+                # concurrent requests for the same item share a single provider call
+                if item := await self.mass.cache.coalesce(cache_key, get_item):
                     return item
         # if we reach this point all possibilities failed and the item could not be found.
         # There is a possibility that the (streaming) provider changed the id of the item
@@ -595,6 +629,58 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
             )
         ]
 
+    async def _search_library(self, search_query: str, limit: int = 25) -> list[ItemCls]:
+        """Search the library using the full text search index, best matches first."""
+        if not (fts_query := self._get_fts_query(search_query)):
+            return []
+        query = (
+            f"{self.base_query} JOIN {self.fts_table} "
+            f"ON {self.fts_table}.rowid = {self.db_table}.item_id "
+            f"WHERE {self.fts_table} MATCH :search ORDER BY {self.fts_table}.rank"
+        )
+        return await self._get_library_items_by_query(query, {"search": fts_query}, limit=limit)
+
+    async def _set_search_index(
+        self,
+        item_id: str | int,
+        name: str,
+        artists: Iterable[Artist | ItemMapping] | None = None,
+    ) -> None:
+        """Update the (full text) search index for a library item."""
+        db_id = int(item_id)  # ensure integer
+        await self.mass.music.database.delete(self.fts_table, {"rowid": db_id})
+        await self.mass.music.database.insert(
+            self.fts_table,
+            {
+                "rowid": db_id,
+                "name": create_search_string(name),
+                "artists": " ".join(create_search_string(x.name) for x in artists or ()),
+            },
+        )
+
+    async def rebuild_search_index(self) -> None:
+        """Rebuild the (full text) search index from all library items."""
+        database = self.mass.music.database
+        async with database.transaction():
+            await database.delete(self.fts_table)
+            batch: list[dict[str, Any]] = []
+            async for db_row in database.iter_items(self.db_table):
+                if self.media_type in (MediaType.ALBUM, MediaType.TRACK):
+                    artists = json_loads(db_row["artists"])
+                else:
+                    artists = []
+                batch.append(
+                    {
+                        "rowid": db_row["item_id"],
+                        "name": create_search_string(db_row["name"]),
+                        "artists": " ".join(create_search_string(x["name"]) for x in artists),
+                    }
+                )
+                if len(batch) == 500:
+                    await database.insert_many(self.fts_table, batch)
+                    batch = []
+            await database.insert_many(self.fts_table, batch)
+
     async def _set_provider_mappings(
         self, item_id: str | int, provider_mappings: Iterable[ProviderMapping]
     ) -> None:
@@ -612,8 +698,9 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
                 )
             )
         # delete removed mappings
+        provider_mappings = set(provider_mappings)
         for prov_mapping in cur_mappings:
-            if prov_mapping not in set(provider_mappings):
+            if prov_mapping not in provider_mappings:
                 await self.mass.music.database.delete(
                     DB_TABLE_PROVIDER_MAPPINGS,
                     {
@@ -624,16 +711,18 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
                     },
                 )
         # add entries
-        for provider_mapping in provider_mappings:
-            await self.mass.music.database.insert_or_replace(
-                DB_TABLE_PROVIDER_MAPPINGS,
+        await self.mass.music.database.insert_or_replace_many(
+            DB_TABLE_PROVIDER_MAPPINGS,
+            (
                 {
                     **match,
                     "provider_domain": provider_mapping.provider_domain,
                     "provider_instance": provider_mapping.provider_instance,
                     "provider_item_id": provider_mapping.item_id,
-                },
-            )
+                }
+                for provider_mapping in provider_mappings
+            ),
+        )
 
     def _get_provider_mappings(
         self,
@@ -668,6 +757,28 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
                 artist_mappings.append(artist_mapping)
         return artist_mappings
 
+    async def _set_artist_mappings(
+        self,
+        item_id: str | int,
+        artists: Iterable[Artist | ItemMapping],
+    ) -> None:
+        """Store the (library) artist(s) of an album/track in the track/album artists table."""
+        db_id = int(item_id)  # ensure integer
+        if self.media_type == MediaType.ALBUM:
+            join_table, id_column = DB_TABLE_ALBUM_ARTISTS, "album_id"
+        else:
+            join_table, id_column = DB_TABLE_TRACK_ARTISTS, "track_id"
+        await self.mass.music.database.delete(join_table, {id_column: db_id})
+        await self.mass.music.database.insert_or_replace_many(
+            join_table,
+            (
+                {id_column: db_id, "artist_id": int(artist.item_id)}
+                for artist in artists
+                # artists that could not be added to the library are not linked
+                if artist.provider == "library"
+            ),
+        )
+
     async def _get_artist_mapping(self, artist: Artist | ItemMapping) -> ItemMapping:
         """Extract (database) track artist as ItemMapping."""
         if artist.provider == "library":
@@ -695,6 +806,87 @@ class MediaControllerBase(Generic[ItemCls], metaclass=ABCMeta):
             return artist
         return ItemMapping.from_item(artist)
 
+    def _get_prov_id_query(
+        self,
+        provider_instance_id_or_domain: str,
+        provider_item_ids: tuple[str, ...] | None = None,
+    ) -> tuple[str | None, dict[str, Any]]:
+        """Return the (WHERE) query and its params to select the library items for given provider.
+
+        The provider (item) id's are bound as parameters, so any (quote) character is allowed.
+        """
+        if provider_instance_id_or_domain == "library":
+            if provider_item_ids is None:
+                return None, {}
+            params = {f"_item_id_{i}": int(x) for i, x in enumerate(provider_item_ids)}
+            placeholders = ", ".join(f":{x}" for x in params)
+            return f"{self.db_table}.item_id in ({placeholders})", params
+
+        # we use the separate provider_mappings table to perform quick lookups
+        # from provider id's to database id's because this is faster
+        # (and more compatible) than querying the provider_mappings json column
+        params = {
+            "_media_type": self.media_type.value,
+            "_provider": provider_instance_id_or_domain,
+        }
+        subquery = (
+            f"SELECT item_id FROM {DB_TABLE_PROVIDER_MAPPINGS} WHERE "
+            "media_type = :_media_type AND "
+            "(provider_instance = :_provider OR provider_domain = :_provider)"
+        )
+        if provider_item_ids is not None:
+            item_params = {f"_prov_item_id_{i}": x for i, x in enumerate(provider_item_ids)}
+            placeholders = ", ".join(f":{x}" for x in item_params)
+            subquery += f" AND provider_item_id in ({placeholders})"
+            params.update(item_params)
+        # final query is a where query from the subquery
+        # that queries the provider_mappings table
+        return f"{self.db_table}.item_id in ({subquery})", params
+
+    async def _get_library_count(self, query: str, query_params: dict[str, Any]) -> int:
+        """Return the (cached) number of library items for given query."""
+        database = self.mass.music.database
+        cache_key = (query, repr(sorted(query_params.items())))
+        if (cached := self._count_cache.get(cache_key)) and cached[0] == database.revision:
+            return cached[1]
+        revision = database.revision
+        total = await database.get_count_from_query(query, query_params)
+        if len(self._count_cache) >= COUNT_CACHE_SIZE:
+            # drop the oldest entry
+            self._count_cache.pop(next(iter(self._count_cache)))
+        self._count_cache[cache_key] = (revision, total)
+        return total
+
+    def _get_keyset(self, order_by: str) -> tuple[str, str] | None:
+        """Return the (qualified) key column and direction to use for cursor based paging."""
+        column, _, direction = order_by.strip().partition(" ")
+        column = column.removeprefix(f"{self.db_table}.")
+        direction = direction.strip().upper() or "ASC"
+        if column not in KEYSET_COLUMNS or direction not in ("ASC", "DESC"):
+            return None
+        return (f"{self.db_table}.{column}", direction)
+
+    @staticmethod
+    def _encode_cursor(key: Any, item_id: int | str) -> str:
+        """Return an (opaque) cursor pointing to the position after the given key/item."""
+        return urlsafe_b64encode(json_dumps([key, int(item_id)]).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[Any, int]:
+        """Decode (opaque) cursor into the key and item_id it points to."""
+        try:
+            key, item_id = json_loads(urlsafe_b64decode(cursor.encode()))
+            return (key, int(item_id))
+        except (ValueError, TypeError) as err:
+            raise InvalidDataError(f"Invalid cursor: {cursor}") from err
+
+    @staticmethod
+    def _get_fts_query(search: str) -> str | None:
+        """Return (prefix matching) full text search query for the given search string."""
+        if search_terms := create_search_string(search).split():
+            return " ".join(f'"{term}"*' for term in search_terms)
+        return None
+
     @staticmethod
     def _parse_db_row(db_row: Mapping) -> dict[str, Any]:
         """Parse raw db Mapping into a dict."""
@@ -64,7 +64,7 @@ class PlaylistController(MediaControllerBase[Playlist]):
 
         # actually add (or update) the item in the library db
         # use the lock to prevent a race condition of the same item being added twice
-        async with self._db_add_lock:
+        async with self._db_add_lock, self.mass.music.database.transaction():
             library_item = await self._add_library_item(item)
         # preload playlist tracks listing (do not load them in the db)
         async for _ in self.tracks(item.item_id, item.provider):
@@ -104,6 +104,8 @@ class PlaylistController(MediaControllerBase[Playlist]):
         )
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, provider_mappings)
+        # update search index
+        await self._set_search_index(db_id, update.name or cur_item.name)
         self.logger.debug("updated %s in database: %s", update.name, db_id)
         # get full created object
         library_item = await self.get_library_item(db_id)
@@ -264,7 +266,7 @@ class PlaylistController(MediaControllerBase[Playlist]):
         # insert new item
         item.timestamp_added = int(utc_timestamp())
         item.timestamp_modified = int(utc_timestamp())
-        new_item = await self.mass.music.database.insert(
+        db_id = await self.mass.music.database.insert(
             self.db_table,
             {
                 "name": item.name,
@@ -278,9 +280,10 @@ class PlaylistController(MediaControllerBase[Playlist]):
                 "timestamp_modified": int(utc_timestamp()),
             },
         )
-        db_id = new_item["item_id"]
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, item.provider_mappings)
+        # update search index
+        await self._set_search_index(db_id, item.name)
         self.logger.debug("added %s to database", item.name)
         # return the full item we just added
         return await self.get_library_item(db_id)
@@ -14,7 +14,7 @@ from music_assistant.common.models.errors import (
     UnsupportedFeaturedException,
 )
 from music_assistant.common.models.media_items import Album, ItemMapping, Track
-from music_assistant.constants import DB_TABLE_ALBUM_TRACKS, DB_TABLE_TRACKS
+from music_assistant.constants import DB_TABLE_ALBUM_TRACKS, DB_TABLE_TRACK_ARTISTS, DB_TABLE_TRACKS
 from music_assistant.server.helpers.compare import (
     compare_artists,
     compare_track,
@@ -144,7 +144,7 @@ class TracksController(MediaControllerBase[Track]):
             item.album.metadata.images = item.metadata.images
         # actually add (or update) the item in the library db
         # use the lock to prevent a race condition of the same item being added twice
-        async with self._db_add_lock:
+        async with self._db_add_lock, self.mass.music.database.transaction():
             library_item = await self._add_library_item(item)
         # also fetch same track on all providers (will also get other quality versions)
         if metadata_lookup:
@@ -183,6 +183,10 @@ class TracksController(MediaControllerBase[Track]):
         )
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, provider_mappings)
+        # update track artists table
+        await self._set_artist_mappings(db_id, track_artists)
+        # update search index
+        await self._set_search_index(db_id, update.name or cur_item.name, track_artists)
         # handle track album
         if update.album:
             await self._set_track_album(
@@ -259,6 +263,8 @@ class TracksController(MediaControllerBase[Track]):
         db_id = int(item_id)  # ensure integer
         # delete entry(s) from albumtracks table
         await self.mass.music.database.delete(DB_TABLE_ALBUM_TRACKS, {"track_id": db_id})
+        # delete entry(s) from track artists table
+        await self.mass.music.database.delete(DB_TABLE_TRACK_ARTISTS, {"track_id": db_id})
         # delete the track itself from db
         await super().remove_item_from_library(db_id)
 
@@ -375,7 +381,7 @@ class TracksController(MediaControllerBase[Track]):
                 return await self.update_item_in_library(cur_item.item_id, item)
         track_artists = await self._get_artist_mappings(item)
         sort_artist = track_artists[0].sort_name
-        new_item = await self.mass.music.database.insert(
+        db_id = await self.mass.music.database.insert(
             self.db_table,
             {
                 "name": item.name,
@@ -392,9 +398,12 @@ class TracksController(MediaControllerBase[Track]):
                 "timestamp_modified": int(utc_timestamp()),
             },
         )
-        db_id = new_item["item_id"]
         # update/set provider_mappings table
         await self._set_provider_mappings(db_id, item.provider_mappings)
+        # update track artists table
+        await self._set_artist_mappings(db_id, track_artists)
+        # update search index
+        await self._set_search_index(db_id, item.name, track_artists)
         # handle track album
         if item.album:
             await self._set_track_album(
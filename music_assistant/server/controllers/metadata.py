@@ -7,6 +7,7 @@ import os
 import urllib.parse
 from base64 import b64encode
 from contextlib import suppress
+from functools import partial
 from random import shuffle
 from time import time
 from typing import TYPE_CHECKING
@@ -15,7 +16,14 @@ from uuid import uuid4
 import aiofiles
 from aiohttp import web
 
-from music_assistant.common.models.enums import ImageType, MediaType, ProviderFeature, ProviderType
+from music_assistant.common.models.config_entries import ConfigEntry, ConfigValueType
+from music_assistant.common.models.enums import (
+    ConfigEntryType,
+    ImageType,
+    MediaType,
+    ProviderFeature,
+    ProviderType,
+)
 from music_assistant.common.models.errors import MediaNotFoundError
 from music_assistant.common.models.media_items import (
     Album,
@@ -28,7 +36,14 @@ from music_assistant.common.models.media_items import (
     Track,
 )
 from music_assistant.constants import ROOT_LOGGER_NAME
-from music_assistant.server.helpers.images import create_collage, get_image_thumb
+from music_assistant.server.helpers.images import (
+    DEFAULT_THUMBNAIL_QUALITY,
+    THUMBNAIL_FORMATS,
+    ThumbnailCache,
+    create_collage,
+    get_image_checksum,
+    get_image_thumb,
+)
 from music_assistant.server.models.core_controller import CoreController
 
 if TYPE_CHECKING:
@@ -36,6 +51,12 @@ if TYPE_CHECKING:
     from music_assistant.server.models.metadata_provider import MetadataProvider
 
 LOGGER = logging.getLogger(f"{ROOT_LOGGER_NAME}.metadata")
+CONF_THUMBNAIL_CACHE_SIZE = "thumbnail_cache_size"
+DEFAULT_THUMBNAIL_CACHE_SIZE = 500  # MB
+CONF_THUMBNAIL_QUALITY = "thumbnail_quality"
+# thumbnail sizes/format requested by the frontend, pre-generated after a library sync
+PREGENERATE_THUMBNAIL_SIZES = (256, 512)
+PREGENERATE_THUMBNAIL_FORMAT = "webp"
 
 
 class MetaDataController(CoreController):
@@ -49,14 +70,51 @@ class MetaDataController(CoreController):
         self.cache = self.mass.cache
         self._pref_lang: str | None = None
         self.scan_busy: bool = False
+        self.thumbnail_cache = ThumbnailCache(
+            os.path.join(self.mass.storage_path, "thumbnails"),
+            DEFAULT_THUMBNAIL_CACHE_SIZE * 1024 * 1024,
+        )
+        self._thumbnail_quality = DEFAULT_THUMBNAIL_QUALITY
         self.manifest.name = "Metadata controller"
         self.manifest.description = (
             "Music Assistant's core controller which handles all metadata for music."
         )
         self.manifest.icon = "book-information-variant"
 
-    async def setup(self, config: CoreConfig) -> None:  # noqa: ARG002
+    async def get_config_entries(
+        self,
+        action: str | None = None,  # noqa: ARG002
+        values: dict[str, ConfigValueType] | None = None,  # noqa: ARG002
+    ) -> tuple[ConfigEntry, ...]:
+        """Return all Config Entries for this core module (if any)."""
+        return (
+            ConfigEntry(
+                key=CONF_THUMBNAIL_CACHE_SIZE,
+                type=ConfigEntryType.INTEGER,
+                range=(10, 10000),
+                default_value=DEFAULT_THUMBNAIL_CACHE_SIZE,
+                label="Thumbnail cache size (MB)",
+                description="The maximum amount of disk space used to store "
+                "generated thumbnails (of local images).",
+                advanced=True,
+            ),
+            ConfigEntry(
+                key=CONF_THUMBNAIL_QUALITY,
+                type=ConfigEntryType.INTEGER,
+                range=(10, 100),
+                default_value=DEFAULT_THUMBNAIL_QUALITY,
+                label="Thumbnail quality",
+                description="The quality of (lossy) WebP and JPEG thumbnails, "
+                "lower values result in smaller images.",
+                advanced=True,
+            ),
+        )
+
+    async def setup(self, config: CoreConfig) -> None:
         """Async initialize of module."""
+        self.thumbnail_cache.max_size = config.get_value(CONF_THUMBNAIL_CACHE_SIZE) * 1024 * 1024
+        self._thumbnail_quality = config.get_value(CONF_THUMBNAIL_QUALITY)
+        await self.thumbnail_cache.setup()
         self.mass.streams.register_dynamic_route("/imageproxy", self.handle_imageproxy)
 
     async def close(self) -> None:
@@ -112,6 +170,7 @@ class MetaDataController(CoreController):
             LOGGER.debug("Finished scan for missing artist metadata")
 
         self.mass.create_task(scan_artist_metadata)
+        self.mass.create_task(self._pregenerate_thumbnails, task_id="pregenerate_thumbnails")
 
     async def get_artist_metadata(self, artist: Artist) -> None:
         """Get/update rich metadata for an artist."""
@@ -337,13 +396,24 @@ class MetaDataController(CoreController):
         return image.path
 
     async def get_thumbnail(
-        self, path: str, size: int | None = None, provider: str = "url", base64: bool = False
+        self,
+        path: str,
+        size: int | None = None,
+        provider: str = "url",
+        base64: bool = False,
+        image_format: str = "png",
     ) -> bytes | str:
         """Get/create thumbnail image for path (image url or local path)."""
-        thumbnail = await get_image_thumb(self.mass, path, size=size, provider=provider)
+        cache_key = await self._get_thumbnail_key(path, provider, size, image_format)
+        if (thumbnail := await self.thumbnail_cache.get(cache_key)) is None:
+            # concurrent requests for the same thumbnail share a single task to create it
+            thumbnail = await self.mass.cache.coalesce(
+                f"thumbnail.{cache_key}",
+                partial(self._create_thumbnail, cache_key, path, size, provider, image_format),
+            )
         if base64:
             enc_image = b64encode(thumbnail).decode()
-            thumbnail = f"data:image/png;base64,{enc_image}"
+            thumbnail = f"data:image/{image_format};base64,{enc_image}"
         return thumbnail
 
     async def handle_imageproxy(self, request: web.Request) -> web.Response:
@@ -354,14 +424,90 @@ class MetaDataController(CoreController):
         if "%" in path:
             # assume (double) encoded url, decode it
             path = urllib.parse.unquote(path)
+        # the output format can be forced with the fmt query param,
+        # otherwise we pick the best format the client accepts
+        image_format = request.query.get("fmt", "").lower().replace("jpg", "jpeg")
+        if image_format not in THUMBNAIL_FORMATS:
+            accept = request.headers.get("Accept", "")
+            if "image/webp" in accept:
+                image_format = "webp"
+            elif "image/jpeg" in accept:
+                image_format = "jpeg"
+            else:
+                image_format = "png"
+        # the thumbnail key includes the checksum of the (resolved) source image,
+        # so the ETag changes when the image is modified
+        try:
+            cache_key = await self._get_thumbnail_key(path, provider, size, image_format)
+        except FileNotFoundError:
+            return web.Response(status=404)
+        # we set the cache header to 1 year (forever)
+        # the client can use the checksum value to refresh when content changes
+        headers = {
+            "Cache-Control": "max-age=31536000",
+            "ETag": f'"{cache_key}"',
+            "Vary": "Accept",
+        }
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            return web.Response(status=304, headers=headers)
 
         with suppress(FileNotFoundError):
-            image_data = await self.get_thumbnail(path, size=size, provider=provider)
-            # we set the cache header to 1 year (forever)
-            # the client can use the checksum value to refresh when content changes
+            image_data = await self.get_thumbnail(
+                path, size=size, provider=provider, image_format=image_format
+            )
             return web.Response(
                 body=image_data,
-                headers={"Cache-Control": "max-age=31536000"},
-                content_type="image/png",
+                headers=headers,
+                content_type=f"image/{image_format}",
             )
         return web.Response(status=404)
+
+    async def _get_thumbnail_key(
+        self, path: str, provider: str, size: int | None, image_format: str
+    ) -> str:
+        """Return the key of a thumbnail (in the thumbnail cache)."""
+        checksum = await get_image_checksum(self.mass, path, provider)
+        return ThumbnailCache.get_key(
+            path, provider, size, image_format, self._thumbnail_quality, checksum
+        )
+
+    async def _create_thumbnail(
+        self, cache_key: str, path: str, size: int | None, provider: str, image_format: str
+    ) -> bytes:
+        """Create thumbnail image for path and store it in the thumbnail cache."""
+        thumbnail = await get_image_thumb(
+            self.mass,
+            path,
+            size=size,
+            provider=provider,
+            image_format=image_format,
+            quality=self._thumbnail_quality,
+        )
+        await self.thumbnail_cache.set(cache_key, thumbnail)
+        return thumbnail
+
+    async def _pregenerate_thumbnails(self) -> None:
+        """Create the (missing) thumbnails of (local) library images in the common sizes."""
+        LOGGER.debug("Start creating thumbnails for library items")
+        for ctrl in (self.mass.music.artists, self.mass.music.albums, self.mass.music.playlists):
+            async for item in ctrl.iter_library_items():
+                if not (image := item.image) or image.provider == "url":
+                    # images from (remote) urls are not proxied
+                    continue
+                for size in PREGENERATE_THUMBNAIL_SIZES:
+                    try:
+                        cache_key = await self._get_thumbnail_key(
+                            image.path, image.provider, size, PREGENERATE_THUMBNAIL_FORMAT
+                        )
+                        if cache_key in self.thumbnail_cache:
+                            continue
+                        await self._create_thumbnail(
+                            cache_key,
+                            image.path,
+                            size,
+                            image.provider,
+                            PREGENERATE_THUMBNAIL_FORMAT,
+                        )
+                    except Exception as err:  # pylint: disable=broad-except
+                        LOGGER.debug("Unable to create thumbnail for %s: %s", image.path, str(err))
+        LOGGER.debug("Finished creating thumbnails for library items")
@@ -5,6 +5,7 @@ import asyncio
 import os
 import shutil
 import statistics
+import time
 from collections.abc import AsyncGenerator
 from contextlib import suppress
 from itertools import zip_longest
@@ -26,6 +27,7 @@ from music_assistant.common.models.media_items import BrowseFolder, MediaItemTyp
 from music_assistant.common.models.provider import SyncTask
 from music_assistant.constants import (
     DB_SCHEMA_VERSION,
+    DB_TABLE_ALBUM_ARTISTS,
     DB_TABLE_ALBUM_TRACKS,
     DB_TABLE_ALBUMS,
     DB_TABLE_ARTISTS,
@@ -33,12 +35,16 @@ from music_assistant.constants import (
     DB_TABLE_PLAYLOG,
     DB_TABLE_PROVIDER_MAPPINGS,
     DB_TABLE_RADIOS,
+    DB_TABLE_SCAN_MANIFEST,
+    DB_TABLE_SEEK_INDEX,
     DB_TABLE_SETTINGS,
+    DB_TABLE_TRACK_ARTISTS,
     DB_TABLE_TRACK_LOUDNESS,
     DB_TABLE_TRACKS,
 )
 from music_assistant.server.helpers.api import api_command
 from music_assistant.server.helpers.database import DatabaseConnection
+from music_assistant.server.helpers.seek_index import SeekIndex
 from music_assistant.server.models.core_controller import CoreController
 from music_assistant.server.models.music_provider import MusicProvider
 
@@ -53,6 +59,7 @@ if TYPE_CHECKING:
 
 DEFAULT_SYNC_INTERVAL = 3 * 60  # default sync interval in minutes
 CONF_SYNC_INTERVAL = "sync_interval"
+DB_MAINTENANCE_INTERVAL = 24 * 3600  # interval (in seconds) of the database maintenance
 
 
 class MusicController(CoreController):
@@ -72,6 +79,7 @@ class MusicController(CoreController):
         self.radio = RadioController(self.mass)
         self.playlists = PlaylistController(self.mass)
         self.in_progress_syncs: list[SyncTask] = []
+        self._last_sync_progress_event = 0.0
         self._sync_lock = asyncio.Lock()
         self.manifest.name = "Music controller"
         self.manifest.description = (
@@ -106,6 +114,7 @@ class MusicController(CoreController):
         sync_interval = config.get_value(CONF_SYNC_INTERVAL)
         self.logger.info("Using a sync interval of %s minutes.", sync_interval)
         self._schedule_sync()
+        self.mass.loop.call_later(DB_MAINTENANCE_INTERVAL, self._schedule_db_maintenance)
 
     async def close(self) -> None:
         """Cleanup on exit."""
@@ -144,6 +153,23 @@ class MusicController(CoreController):
         """Return list with providers that are currently (scheduled for) syncing."""
         return self.in_progress_syncs
 
+    def update_sync_progress(
+        self, provider_instance: str, items_processed: int, items_total: int | None
+    ) -> None:
+        """Update the progress of the running sync task of a provider."""
+        sync_tasks = [x for x in self.in_progress_syncs if x.provider_instance == provider_instance]
+        if not sync_tasks:
+            # e.g. an incremental sync (outside of a sync task)
+            return
+        for sync_task in sync_tasks:
+            sync_task.items_processed = items_processed
+            sync_task.items_total = items_total
+        # throttle the (update) events to prevent flooding the clients
+        now = time.monotonic()
+        if items_processed == items_total or now - self._last_sync_progress_event >= 1:
+            self._last_sync_progress_event = now
+            self.mass.signal_event(EventType.SYNC_TASKS_UPDATED, data=self.in_progress_syncs)
+
     @api_command("music/search")
     async def search(
         self,
@@ -477,6 +503,91 @@ class MusicController(CoreController):
             return result["loudness"]
         return None
 
+    async def set_seek_index(
+        self, item_id: str, provider_instance_id_or_domain: str, seek_index: SeekIndex
+    ) -> None:
+        """Store the seek index for a (file based) track in db."""
+        await self.database.insert(
+            DB_TABLE_SEEK_INDEX,
+            {
+                "item_id": item_id,
+                "provider": provider_instance_id_or_domain,
+                "seek_index": json_dumps(seek_index.to_dict()),
+            },
+            allow_replace=True,
+        )
+
+    async def get_seek_index(
+        self, item_id: str, provider_instance_id_or_domain: str
+    ) -> SeekIndex | None:
+        """Get the seek index for a (file based) track from db."""
+        if result := await self.database.get_row(
+            DB_TABLE_SEEK_INDEX,
+            {
+                "item_id": item_id,
+                "provider": provider_instance_id_or_domain,
+            },
+        ):
+            return SeekIndex.from_dict(json_loads(result["seek_index"]))
+        return None
+
+    async def set_scan_manifest(
+        self, provider_instance: str, manifest: dict[str, tuple[bool, str | None]]
+    ) -> None:
+        """Store the scan manifest (path --> is_dir, checksum) of a (file based) provider in db.
+
+        Replaces the previous manifest of the provider.
+        """
+        async with self.database.transaction():
+            await self.database.delete(DB_TABLE_SCAN_MANIFEST, {"provider": provider_instance})
+            await self.database.insert_many(
+                DB_TABLE_SCAN_MANIFEST,
+                (
+                    {
+                        "provider": provider_instance,
+                        "path": path,
+                        "is_dir": is_dir,
+                        "checksum": checksum,
+                    }
+                    for path, (is_dir, checksum) in manifest.items()
+                ),
+            )
+
+    async def update_scan_manifest(
+        self,
+        provider_instance: str,
+        entries: dict[str, tuple[bool, str | None]],
+        removed_paths: set[str],
+    ) -> None:
+        """Add/replace and remove entries of the scan manifest of a (file based) provider."""
+        async with self.database.transaction():
+            for path in removed_paths:
+                await self.database.delete(
+                    DB_TABLE_SCAN_MANIFEST, {"provider": provider_instance, "path": path}
+                )
+            await self.database.insert_or_replace_many(
+                DB_TABLE_SCAN_MANIFEST,
+                (
+                    {
+                        "provider": provider_instance,
+                        "path": path,
+                        "is_dir": is_dir,
+                        "checksum": checksum,
+                    }
+                    for path, (is_dir, checksum) in entries.items()
+                ),
+            )
+
+    async def get_scan_manifest(self, provider_instance: str) -> dict[str, tuple[bool, str | None]]:
+        """Get the scan manifest (path --> is_dir, checksum) of a (file based) provider from db."""
+        rows = await self.database.get_rows_from_query(
+            f"SELECT path, is_dir, checksum FROM {DB_TABLE_SCAN_MANIFEST} "
+            "WHERE provider = :provider",
+            {"provider": provider_instance},
+            limit=-1,
+        )
+        return {row["path"]: (bool(row["is_dir"]), row["checksum"]) for row in rows}
+
     async def get_provider_loudness(self, provider_instance_id_or_domain: str) -> float | None:
         """Get average integrated loudness for tracks of given provider."""
         all_items = []
@@ -600,6 +711,7 @@ class MusicController(CoreController):
         """Cleanup provider records from the database."""
         # clean cache items from deleted provider(s)
         await self.mass.cache.clear(provider_instance)
+        await self.database.delete(DB_TABLE_SCAN_MANIFEST, {"provider": provider_instance})
 
         # cleanup media items from db matched to deleted provider
         for ctrl in (
@@ -622,10 +734,24 @@ class MusicController(CoreController):
         # NOTE: sync_interval is stored in minutes, we need seconds
         self.mass.loop.call_later(sync_interval * 60, self._schedule_sync)
 
-    async def _setup_database(self):
+    def _schedule_db_maintenance(self) -> None:
+        """Schedule the periodic database maintenance."""
+        self.mass.create_task(self._db_maintenance())
+        # reschedule self
+        self.mass.loop.call_later(DB_MAINTENANCE_INTERVAL, self._schedule_db_maintenance)
+
+    async def _db_maintenance(self) -> None:
+        """Perform (periodic) maintenance on the library database."""
+        if self.in_progress_syncs:
+            # do not interfere with a running sync, we'll try again next time
+            return
+        if await self.database.vacuum():
+            self.logger.debug("Compacted library database")
+
+    async def _setup_database(self):  # noqa: PLR0915
         """Initialize database."""
         db_path = os.path.join(self.mass.storage_path, "library.db")
-        self.database = DatabaseConnection(db_path)
+        self.database = DatabaseConnection(db_path, read_pool_size=3)
         await self.database.setup()
 
         # always create db tables if they don't exist to prevent errors trying to access them later
@@ -657,6 +783,16 @@ class MusicController(CoreController):
                 await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_TRACKS}")
                 await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_PLAYLISTS}")
                 await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_RADIOS}")
+                for table in (
+                    DB_TABLE_ARTISTS,
+                    DB_TABLE_ALBUMS,
+                    DB_TABLE_TRACKS,
+                    DB_TABLE_PLAYLISTS,
+                    DB_TABLE_RADIOS,
+                ):
+                    await self.database.execute(f"DROP TABLE IF EXISTS {table}_fts")
+                await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_TRACK_ARTISTS}")
+                await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_ALBUM_ARTISTS}")
                 # recreate missing tables
                 await self.__create_database_tables()
 
@@ -671,6 +807,9 @@ class MusicController(CoreController):
                         "Resetting %s library/database - a full rescan will be performed!", table
                     )
                     await self.database.execute(f"DROP TABLE IF EXISTS {table}")
+                    await self.database.execute(f"DROP TABLE IF EXISTS {table}_fts")
+                await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_TRACK_ARTISTS}")
+                await self.database.execute(f"DROP TABLE IF EXISTS {DB_TABLE_ALBUM_ARTISTS}")
                 # recreate missing tables
                 await self.__create_database_tables()
 
@@ -722,6 +861,26 @@ class MusicController(CoreController):
                     "ADD COLUMN media_type TEXT NOT NULL DEFAULT 'track'"
                 )
 
+            if prev_version < 26:
+                # fill the (new) full text search index(es)
+                for ctrl in (self.artists, self.albums, self.tracks, self.playlists, self.radio):
+                    await ctrl.rebuild_search_index()
+
+            if prev_version < 27:
+                # fill the (new) track/album artists tables from the artists json column
+                for table, join_table, id_column in (
+                    (DB_TABLE_TRACKS, DB_TABLE_TRACK_ARTISTS, "track_id"),
+                    (DB_TABLE_ALBUMS, DB_TABLE_ALBUM_ARTISTS, "album_id"),
+                ):
+                    await self.database.execute(
+                        f"INSERT OR IGNORE INTO {join_table}({id_column}, artist_id) "
+                        f"SELECT {table}.item_id, "
+                        "CAST(json_extract(value, '$.item_id') AS INTEGER) "
+                        f"FROM {table}, json_each({table}.artists) "
+                        "WHERE json_extract(value, '$.provider') = 'library'"
+                    )
+                await self.database.commit()
+
             self.logger.info(
                 "Database migration to version %s completed",
                 DB_SCHEMA_VERSION,
@@ -734,8 +893,6 @@ class MusicController(CoreController):
         )
         # create indexes if needed
         await self.__create_database_indexes()
-        # compact db
-        await self.database.execute("VACUUM")
 
     async def __create_database_tables(self) -> None:
         """Create database tables."""
@@ -753,6 +910,21 @@ class MusicController(CoreController):
                     loudness REAL,
                     UNIQUE(item_id, provider));"""
         )
+        await self.database.execute(
+            f"""CREATE TABLE IF NOT EXISTS {DB_TABLE_SEEK_INDEX}(
+                    item_id TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    seek_index json NOT NULL,
+                    UNIQUE(item_id, provider));"""
+        )
+        await self.database.execute(
+            f"""CREATE TABLE IF NOT EXISTS {DB_TABLE_SCAN_MANIFEST}(
+                    provider TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    is_dir BOOLEAN NOT NULL DEFAULT 0,
+                    checksum TEXT,
+                    UNIQUE(provider, path));"""
+        )
         await self.database.execute(
             f"""CREATE TABLE IF NOT EXISTS {DB_TABLE_PLAYLOG}(
                 item_id INTEGER NOT NULL,
@@ -818,6 +990,20 @@ class MusicController(CoreController):
                     UNIQUE(track_id, album_id)
                 );"""
         )
+        await self.database.execute(
+            f"""CREATE TABLE IF NOT EXISTS {DB_TABLE_TRACK_ARTISTS}(
+                    track_id INTEGER NOT NULL,
+                    artist_id INTEGER NOT NULL,
+                    UNIQUE(track_id, artist_id)
+                );"""
+        )
+        await self.database.execute(
+            f"""CREATE TABLE IF NOT EXISTS {DB_TABLE_ALBUM_ARTISTS}(
+                    album_id INTEGER NOT NULL,
+                    artist_id INTEGER NOT NULL,
+                    UNIQUE(album_id, artist_id)
+                );"""
+        )
         await self.database.execute(
             f"""CREATE TABLE IF NOT EXISTS {DB_TABLE_PLAYLISTS}(
                     item_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -854,6 +1040,20 @@ class MusicController(CoreController):
                     UNIQUE(media_type, provider_instance, provider_item_id)
                 );"""
         )
+        # full text search index for each media type (rowid is the item_id of the library item)
+        # both columns are filled with the (unaccented) output of create_search_string
+        for table in (
+            DB_TABLE_ARTISTS,
+            DB_TABLE_ALBUMS,
+            DB_TABLE_TRACKS,
+            DB_TABLE_PLAYLISTS,
+            DB_TABLE_RADIOS,
+        ):
+            await self.database.execute(
+                f"""CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+                        name, artists, tokenize='unicode61 remove_diacritics 2'
+                    );"""
+            )
 
     async def __create_database_indexes(self) -> None:
         """Create database indexes."""
@@ -890,3 +1090,12 @@ class MusicController(CoreController):
         await self.database.execute("CREATE INDEX IF NOT EXISTS artists_mbid_idx on artists(mbid);")
         await self.database.execute("CREATE INDEX IF NOT EXISTS albums_mbid_idx on albums(mbid);")
         await self.database.execute("CREATE INDEX IF NOT EXISTS tracks_mbid_idx on tracks(mbid);")
+        # the unique constraint already indexes the track/album id, add the reverse lookup
+        await self.database.execute(
+            f"CREATE INDEX IF NOT EXISTS {DB_TABLE_TRACK_ARTISTS}_artist_id_idx "
+            f"on {DB_TABLE_TRACK_ARTISTS}(artist_id);"
+        )
+        await self.database.execute(
+            f"CREATE INDEX IF NOT EXISTS {DB_TABLE_ALBUM_ARTISTS}_artist_id_idx "
+            f"on {DB_TABLE_ALBUM_ARTISTS}(artist_id);"
+        )
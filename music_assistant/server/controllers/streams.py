@@ -9,10 +9,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 import time
 import urllib.parse
 from collections.abc import AsyncGenerator
-from contextlib import suppress
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import shortuuid
@@ -26,7 +27,7 @@ from music_assistant.common.models.config_entries import (
 )
 from music_assistant.common.models.enums import ConfigEntryType, ContentType
 from music_assistant.common.models.errors import MediaNotFoundError, QueueEmpty
-from music_assistant.common.models.media_items import AudioFormat
+from music_assistant.common.models.media_items import AudioFormat, StreamDetails
 from music_assistant.common.models.player_queue import PlayerQueue
 from music_assistant.common.models.queue_item import QueueItem
 from music_assistant.constants import (
@@ -36,17 +37,22 @@ from music_assistant.constants import (
     CONF_EQ_BASS,
     CONF_EQ_MID,
     CONF_EQ_TREBLE,
+    CONF_FLOW_PREFETCH,
     CONF_OUTPUT_CHANNELS,
     CONF_OUTPUT_CODEC,
     CONF_PUBLISH_IP,
+    CONF_STREAM_PROFILE,
 )
 from music_assistant.server.helpers.audio import (
-    check_audio_support,
     crossfade_pcm_parts,
     get_media_stream,
     get_stream_details,
+    report_stream_played,
 )
+from music_assistant.server.helpers.ffmpeg import load_ffmpeg_capabilities
+from music_assistant.server.helpers.filecache import FileCache
 from music_assistant.server.helpers.process import AsyncProcess
+from music_assistant.server.helpers.ringbuffer import RingBuffer, RingBufferReader
 from music_assistant.server.helpers.util import get_ips
 from music_assistant.server.helpers.webserver import Webserver
 from music_assistant.server.models.core_controller import CoreController
@@ -67,6 +73,62 @@ DEFAULT_STREAM_HEADERS = {
 }
 FLOW_MAX_SAMPLE_RATE = 192000
 FLOW_MAX_BIT_DEPTH = 24
+CONF_MULTI_CLIENT_BUFFER = "multi_client_buffer"
+DEFAULT_MULTI_CLIENT_BUFFER = 10  # seconds
+CONF_AUDIO_CACHE_SIZE = "audio_cache_size"
+DEFAULT_AUDIO_CACHE_SIZE = 0  # MB, disabled by default
+
+
+@dataclass(frozen=True)
+class StreamProfile:
+    """Buffering and chunk size policy for streaming audio to a player."""
+
+    # duration (in seconds) of the pcm chunks read from the source audio
+    pcm_chunk_seconds: float
+    # max size of the chunks read from the (ffmpeg) encoder
+    read_size: int
+    # (kernel) buffer size of the encoder pipes, None for the system default
+    pipe_size: int | None
+    # size of the first write to the player, sent as soon as this amount is available
+    initial_burst: int
+    # after the initial burst, chunks are batched into writes of (at least) this size
+    write_batch_size: int
+    # max number of seconds audio is held back to fill the initial burst or a batch,
+    # so (slow) real-time sources such as radio streams do not cause long silences
+    max_batch_delay: float = 2
+
+    def get_pcm_chunk_size(self, pcm_format: AudioFormat) -> int:
+        """Return the size of the pcm chunks (in whole frames) for the given format."""
+        frame_size = int(pcm_format.bit_depth / 8 * pcm_format.channels)
+        return max(int(pcm_format.sample_rate * self.pcm_chunk_seconds), 1) * frame_size
+
+
+STREAM_PROFILES = {
+    # small chunks, sent as soon as possible (e.g. for slimproto/airplay bridges)
+    "low_latency": StreamProfile(
+        pcm_chunk_seconds=0.5,
+        read_size=65536,
+        pipe_size=65536,
+        initial_burst=0,
+        write_batch_size=0,
+    ),
+    "balanced": StreamProfile(
+        pcm_chunk_seconds=2,
+        read_size=768000,
+        pipe_size=None,
+        initial_burst=0,
+        write_batch_size=0,
+    ),
+    # large bursts and writes (e.g. for chromecast/dlna players on wifi)
+    "high_throughput": StreamProfile(
+        pcm_chunk_seconds=2,
+        read_size=768000,
+        pipe_size=1048576,
+        initial_burst=1048576,
+        write_batch_size=262144,
+    ),
+}
+DEFAULT_STREAM_PROFILE = "balanced"
 
 
 class MultiClientStreamJob:
@@ -76,6 +138,8 @@ class MultiClientStreamJob:
     all client players receive the exact same (PCM) audio chunks from the source audio.
     A StreamJob is tied to a Queue and streams the queue flow stream,
     In case a stream is restarted (e.g. when seeking), a new MultiClientStreamJob will be created.
+    The audio chunks are fanned out to the clients using a (shared) ring buffer,
+    in which each client has its own read position.
     """
 
     def __init__(
@@ -86,6 +150,7 @@ class MultiClientStreamJob:
         start_queue_item: QueueItem,
         seek_position: int = 0,
         fade_in: bool = False,
+        buffer_seconds: int = DEFAULT_MULTI_CLIENT_BUFFER,
     ) -> None:
         """Initialize MultiClientStreamJob instance."""
         self.stream_controller = stream_controller
@@ -98,9 +163,10 @@ class MultiClientStreamJob:
         self.fade_in = fade_in
         self.job_id = shortuuid.uuid()
         self.expected_players: set[str] = set()
-        self.subscribed_players: dict[str, asyncio.Queue[bytes]] = {}
-        self.bytes_streamed: int = 0
+        self.subscribed_players: dict[str, RingBufferReader] = {}
         self.client_seconds_skipped: dict[str, int] = {}
+        self._buffer = RingBuffer(buffer_seconds * pcm_format.pcm_sample_size)
+        self._encoders: dict[str, StreamJobEncoder] = {}
         self._all_clients_connected = asyncio.Event()
         # start running the audio task in the background
         self._audio_task = asyncio.create_task(self._stream_job_runner())
@@ -122,15 +188,20 @@ class MultiClientStreamJob:
         """Return if this Job is running."""
         return not self.finished and not self.pending
 
+    @property
+    def bytes_streamed(self) -> int:
+        """Return the number of (PCM) bytes streamed so far."""
+        return self._buffer.bytes_written
+
     def stop(self) -> None:
         """Stop running this job."""
         self._finished = True
+        self._buffer.close()
+        for encoder in self._encoders.values():
+            encoder.stop()
         if self._audio_task.done():
             return
         self._audio_task.cancel()
-        for sub_queue in self.subscribed_players.values():
-            with suppress(asyncio.QueueFull):
-                sub_queue.put_nowait(b"")
 
     async def resolve_stream_url(
         self,
@@ -161,87 +232,295 @@ class MultiClientStreamJob:
         self.expected_players.add(child_player_id)
         return url
 
-    async def subscribe(self, player_id: str) -> AsyncGenerator[bytes, None]:
-        """Subscribe consumer and iterate incoming chunks on the queue."""
-        try:
-            self.subscribed_players[player_id] = sub_queue = asyncio.Queue(2)
-
-            if self._all_clients_connected.is_set():
-                # client subscribes while we're already started
-                self.logger.debug(
-                    "Client %s is joining while the stream is already started", player_id
-                )
-                # calculate how many seconds the client missed so far
-                self.client_seconds_skipped[player_id] = (
-                    self.bytes_streamed / self.pcm_format.pcm_sample_size
-                )
-            else:
-                self.logger.debug("Subscribed client %s", player_id)
-
-            if len(self.subscribed_players) == len(self.expected_players):
-                # we reached the number of expected subscribers, set event
-                # so that chunks can be pushed
-                self._all_clients_connected.set()
+    async def subscribe_encoded(
+        self, player_id: str, ffmpeg_args: list[str]
+    ) -> AsyncGenerator[memoryview, None]:
+        """Subscribe consumer and iterate the audio chunks, encoded with the given ffmpeg args.
 
-            # keep reading audio chunks from the queue until we receive an empty one
-            while True:
-                chunk = await sub_queue.get()
-                if chunk == b"":
-                    # EOF chunk received
-                    break
+        Clients that subscribe (before the stream is started) with identical ffmpeg args,
+        share the same encoder. Clients that join a running stream get their own encoder,
+        so they receive the (container) header of the encoded stream.
+        """
+        encoder_key = " ".join(ffmpeg_args)
+        encoder = self._encoders.get(encoder_key)
+        if encoder is None or encoder.finished or self._all_clients_connected.is_set():
+            encoder = StreamJobEncoder(
+                self._add_subscriber(player_id),
+                ffmpeg_args,
+                buffer_size=self.pcm_format.pcm_sample_size * 2,
+            )
+            if not self._all_clients_connected.is_set():
+                self._encoders[encoder_key] = encoder
+        else:
+            self.logger.debug("Client %s is sharing an existing encoder", player_id)
+            self._add_subscriber(player_id, pcm_reader=encoder.pcm_reader)
+        # start at the beginning of the encoded stream (which contains the header)
+        reader = encoder.buffer.add_reader(rewind=encoder.buffer.bytes_written)
+        try:
+            async for chunk in reader.iter_chunks():
                 yield chunk
         finally:
-            self.subscribed_players.pop(player_id, None)
-            self.logger.debug("Unsubscribed client %s", player_id)
-            # check if this was the last subscriber and we should cancel
-            await asyncio.sleep(2)
-            if len(self.subscribed_players) == 0 and self._audio_task and not self.finished:
-                self.logger.debug("Cleaning up, all clients disappeared...")
-                self._audio_task.cancel()
-
-    async def _put_chunk(self, chunk: bytes) -> None:
-        """Put chunk of data to all subscribers."""
-        async with asyncio.TaskGroup() as tg:
-            for sub_queue in list(self.subscribed_players.values()):
-                # put this chunk on the player's subqueue
-                tg.create_task(sub_queue.put(chunk))
-        self.bytes_streamed += len(chunk)
+            encoder.buffer.remove_reader(reader)
+            if not encoder.buffer.readers:
+                # this was the last client of this encoder
+                encoder.stop()
+            await self._remove_subscriber(player_id, encoder.pcm_reader)
+
+    def _add_subscriber(
+        self, player_id: str, pcm_reader: RingBufferReader | None = None
+    ) -> RingBufferReader:
+        """Register a (new) subscriber and return the reader for the PCM audio."""
+        if pcm_reader is not None:
+            # client shares the reader of another client
+            self.logger.debug("Subscribed client %s", player_id)
+        elif self._all_clients_connected.is_set():
+            # client subscribes while we're already started
+            self.logger.debug("Client %s is joining while the stream is already started", player_id)
+            pcm_reader = self._buffer.add_reader()
+            # calculate how many seconds the client missed so far
+            self.client_seconds_skipped[player_id] = (
+                pcm_reader.position / self.pcm_format.pcm_sample_size
+            )
+        else:
+            pcm_reader = self._buffer.add_reader()
+            self.logger.debug("Subscribed client %s", player_id)
+        self.subscribed_players[player_id] = pcm_reader
+
+        if len(self.subscribed_players) == len(self.expected_players):
+            # we reached the number of expected subscribers, set event
+            # so that chunks can be pushed
+            self._all_clients_connected.set()
+        return pcm_reader
+
+    async def _remove_subscriber(self, player_id: str, pcm_reader: RingBufferReader) -> None:
+        """Unregister a subscriber and cancel the stream if all clients disappeared."""
+        if self.subscribed_players.get(player_id) is pcm_reader:
+            self.subscribed_players.pop(player_id)
+        self.logger.debug(
+            "Unsubscribed client %s (lag: %s seconds, skipped: %s seconds)",
+            player_id,
+            round(pcm_reader.lag / self.pcm_format.pcm_sample_size, 2),
+            round(pcm_reader.bytes_skipped / self.pcm_format.pcm_sample_size, 2),
+        )
+        # check if this was the last subscriber and we should cancel
+        await asyncio.sleep(2)
+        if len(self.subscribed_players) == 0 and self._audio_task and not self.finished:
+            self.logger.debug("Cleaning up, all clients disappeared...")
+            self._audio_task.cancel()
 
     async def _stream_job_runner(self) -> None:
         """Feed audio chunks to StreamJob subscribers."""
         chunk_num = 0
-        async for chunk in self.stream_controller.get_flow_stream(
-            self.queue, self.start_queue_item, self.pcm_format, self.seek_position, self.fade_in
-        ):
-            if chunk_num == 0:
-                # wait until all expected clients are connected
-                try:
-                    async with asyncio.timeout(10):
-                        await self._all_clients_connected.wait()
-                except TimeoutError:
-                    if len(self.subscribed_players) == 0:
-                        self.stream_controller.logger.error(
-                            "Abort multi client stream job for queue %s: "
-                            "clients did not connect within timeout",
+        try:
+            async for chunk in self.stream_controller.get_flow_stream(
+                self.queue, self.start_queue_item, self.pcm_format, self.seek_position, self.fade_in
+            ):
+                if chunk_num == 0:
+                    # wait until all expected clients are connected
+                    try:
+                        async with asyncio.timeout(10):
+                            await self._all_clients_connected.wait()
+                    except TimeoutError:
+                        if len(self.subscribed_players) == 0:
+                            self.stream_controller.logger.error(
+                                "Abort multi client stream job for queue %s: "
+                                "clients did not connect within timeout",
+                                self.queue.display_name,
+                            )
+                            break
+                        # not all clients connected but timeout expired, set flag and move on
+                        # with all clients that did connect
+                        self._all_clients_connected.set()
+                    else:
+                        self.stream_controller.logger.debug(
+                            "Starting multi client stream job for queue %s "
+                            "with %s out of %s connected clients",
                             self.queue.display_name,
+                            len(self.subscribed_players),
+                            len(self.expected_players),
                         )
-                        break
-                    # not all clients connected but timeout expired, set flag and move on
-                    # with all clients that did connect
-                    self._all_clients_connected.set()
-                else:
-                    self.stream_controller.logger.debug(
-                        "Starting multi client stream job for queue %s "
-                        "with %s out of %s connected clients",
-                        self.queue.display_name,
-                        len(self.subscribed_players),
-                        len(self.expected_players),
-                    )
-            await self._put_chunk(chunk)
-            chunk_num += 1
+                await self._buffer.put(chunk)
+                chunk_num += 1
+        finally:
+            # mark EOF
+            self._buffer.close()
+
+
+class StreamJobEncoder:
+    """Encoder (ffmpeg process) for the PCM audio of a MultiClientStreamJob.
+
+    The encoded audio is fanned out to all clients of the encoder using a ring buffer,
+    so clients that request the exact same output (format) share a single encoder.
+    """
+
+    def __init__(
+        self, pcm_reader: RingBufferReader, ffmpeg_args: list[str], buffer_size: int
+    ) -> None:
+        """Initialize StreamJobEncoder instance."""
+        self.pcm_reader = pcm_reader
+        self.ffmpeg_args = ffmpeg_args
+        self.buffer = RingBuffer(buffer_size)
+        self._encoder_task = asyncio.create_task(self._run())
+
+    @property
+    def finished(self) -> bool:
+        """Return if this encoder is finished."""
+        return self.buffer.closed
+
+    def stop(self) -> None:
+        """Stop the encoder."""
+        self.pcm_reader.ring_buffer.remove_reader(self.pcm_reader)
+        self.buffer.close()
+        if not self._encoder_task.done():
+            self._encoder_task.cancel()
+
+    async def _run(self) -> None:
+        """Feed the PCM audio to ffmpeg and the encoded audio to the buffer."""
+        try:
+            async with AsyncProcess(self.ffmpeg_args, True) as ffmpeg_proc:
+                # feed stdin with pcm audio chunks from origin
+                async def read_audio():
+                    try:
+                        async for chunk in self.pcm_reader.iter_chunks():
+                            try:
+                                await ffmpeg_proc.write(chunk)
+                            except BrokenPipeError:
+                                break
+                    finally:
+                        ffmpeg_proc.write_eof()
+
+                ffmpeg_proc.attach_task(read_audio())
+
+                # read final chunks from stdout
+                async for chunk in ffmpeg_proc.iter_any(768000):
+                    await self.buffer.put(chunk)
+        finally:
+            self.buffer.close()
+
+
+class FlowStreamPrefetch:
+    """Resolve the next queue track of a flow stream and (pre)buffer its (PCM) audio.
+
+    This runs in the background while the current track is still streaming,
+    so slow providers (e.g. resolving the stream url) do not cause gaps between tracks.
+    Note that the next track is loaded into the queue buffer (index_in_buffer) when the
+    prefetch starts, so it can no longer be moved or removed in the queue from then on.
+    """
+
+    def __init__(
+        self,
+        stream_controller: StreamsController,
+        queue_id: str,
+        pcm_format: AudioFormat,
+        strip_silence_begin: bool = False,
+        buffer_seconds: float = 2,
+    ) -> None:
+        """Initialize FlowStreamPrefetch instance and start prefetching."""
+        self.stream_controller = stream_controller
+        self.queue_id = queue_id
+        self.pcm_format = pcm_format
+        self.strip_silence_begin = strip_silence_begin
+        self._next_track: asyncio.Future[
+            tuple[QueueItem, bool, StreamDetails]
+        ] = asyncio.get_running_loop().create_future()
+        # the buffer is limited by the amount of audio (in bytes) instead of the number
+        # of chunks, as the chunk size depends on the stream profile
+        pcm_sample_size = pcm_format.sample_rate * (pcm_format.bit_depth // 8) * pcm_format.channels
+        self._max_buffer_size = int(pcm_sample_size * buffer_seconds)
+        self._buffer_size = 0
+        self._buffer_drained = asyncio.Event()
+        self._chunks: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._error: Exception | None = None
+        self._prefetch_task = asyncio.create_task(self._run())
+
+    async def get_next_track(self) -> tuple[QueueItem, bool, StreamDetails]:
+        """Return the next queue track (with its crossfade flag and streamdetails).
+
+        Raises QueueEmpty if there are no more tracks or MediaNotFoundError
+        if the streamdetails could not be retrieved.
+        """
+        return await self._next_track
+
+    async def iter_chunks(self) -> AsyncGenerator[bytes, None]:
+        """Iterate the (buffered) PCM audio chunks of the next track."""
+        try:
+            while not (self._chunks.empty() and self._prefetch_task.done()):
+                chunk = await self._chunks.get()
+                if chunk is None:
+                    break
+                self._buffer_size -= len(chunk)
+                self._buffer_drained.set()
+                yield chunk
+            if self._error:
+                raise self._error
+        finally:
+            # the playback is reported here (instead of by the prefetch itself),
+            # so a prefetched track that is never played is not reported
+            _, _, streamdetails = self._next_track.result()
+            await report_stream_played(self.stream_controller.mass, streamdetails)
+
+    def stop(self) -> None:
+        """Stop prefetching."""
+        if not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+
+    async def _run(self) -> None:
+        """Resolve the next track and feed its audio into the buffer."""
+        mass = self.stream_controller.mass
+        try:
+            _, queue_track, use_crossfade = await mass.player_queues.preload_next_url(self.queue_id)
+            streamdetails = await get_stream_details(mass, queue_track)
+        except Exception as err:  # pylint: disable=broad-except
+            self._next_track.set_exception(err)
+            return
+        self._next_track.set_result((queue_track, use_crossfade, streamdetails))
+        try:
+            async for chunk in get_media_stream(
+                mass,
+                streamdetails,
+                pcm_format=self.pcm_format,
+                strip_silence_begin=self.strip_silence_begin,
+                report_playback=False,
+            ):
+                # wait until there is room in the buffer (always allow at least one chunk)
+                while self._buffer_size and self._buffer_size + len(chunk) > self._max_buffer_size:
+                    self._buffer_drained.clear()
+                    await self._buffer_drained.wait()
+                self._buffer_size += len(chunk)
+                self._chunks.put_nowait(chunk)
+        except Exception as err:  # pylint: disable=broad-except
+            self._error = err
+        finally:
+            # mark EOF
+            self._chunks.put_nowait(None)
 
-        # mark EOF with empty chunk
-        await self._put_chunk(b"")
+
+async def batch_chunks(
+    chunks: AsyncGenerator[bytes, None], profile: StreamProfile
+) -> AsyncGenerator[bytes, None]:
+    """Batch (encoded) audio chunks into writes according to the given streaming profile.
+
+    A (partial) batch is sent when the audio in it was held back for max_batch_delay seconds,
+    which is checked when the next chunk arrives.
+    """
+    buffer = bytearray()
+    bytes_sent = 0
+    batch_start = 0.0
+    async for chunk in chunks:
+        batch_size = profile.write_batch_size if bytes_sent else profile.initial_burst
+        if not buffer and len(chunk) >= batch_size:
+            yield chunk
+            bytes_sent += len(chunk)
+            continue
+        if not buffer:
+            batch_start = time.monotonic()
+        buffer += chunk
+        if len(buffer) >= batch_size or time.monotonic() - batch_start >= profile.max_batch_delay:
+            yield bytes(buffer)
+            bytes_sent += len(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
 
 
 def parse_pcm_info(content_type: str) -> tuple[int, int, int]:
@@ -265,6 +544,10 @@ class StreamsController(CoreController):
         super().__init__(*args, **kwargs)
         self._server = Webserver(self.logger, enable_dynamic_routes=True)
         self.multi_client_jobs: dict[str, MultiClientStreamJob] = {}
+        self.multi_client_buffer = DEFAULT_MULTI_CLIENT_BUFFER
+        self.audio_cache = FileCache(
+            os.path.join(self.mass.storage_path, "audio_cache"), DEFAULT_AUDIO_CACHE_SIZE
+        )
         self.register_dynamic_route = self._server.register_dynamic_route
         self.unregister_dynamic_route = self._server.unregister_dynamic_route
         self.manifest.name = "Streamserver"
@@ -324,26 +607,54 @@ class StreamsController(CoreController):
                 "not be adjusted in regular setups.",
                 advanced=True,
             ),
+            ConfigEntry(
+                key=CONF_MULTI_CLIENT_BUFFER,
+                type=ConfigEntryType.INTEGER,
+                range=(2, 60),
+                default_value=DEFAULT_MULTI_CLIENT_BUFFER,
+                label="Multi client stream buffer (seconds)",
+                description="The amount of audio that is buffered when streaming to multiple "
+                "players at once (e.g. a sync group). A player may fall behind the others "
+                "by this amount before it slows down the stream for the whole group.",
+                advanced=True,
+            ),
+            ConfigEntry(
+                key=CONF_AUDIO_CACHE_SIZE,
+                type=ConfigEntryType.INTEGER,
+                range=(0, 100000),
+                default_value=DEFAULT_AUDIO_CACHE_SIZE,
+                label="Audio cache size (MB)",
+                description="Keep the (source) audio of tracks from streaming providers on disk, "
+                "so repeated plays and seeking do not need to download the track again. \n"
+                "The least recently played tracks are removed when the cache is full, "
+                "use 0 to disable the audio cache.",
+                advanced=True,
+            ),
         )
 
     async def setup(self, config: CoreConfig) -> None:
         """Async initialize of module."""
-        ffmpeg_present, libsoxr_support, version = await check_audio_support()
-        if not ffmpeg_present:
+        # the ffmpeg capabilities are stored in the cache db,
+        # so ffmpeg is only probed again if the binary changed
+        capabilities = await load_ffmpeg_capabilities(self.mass)
+        if not capabilities.present:
             self.logger.error("FFmpeg binary not found on your system, playback will NOT work!.")
-        elif not libsoxr_support:
+        elif not capabilities.libsoxr:
             self.logger.warning(
                 "FFmpeg version found without libsoxr support, "
                 "highest quality audio not available. "
             )
         self.logger.info(
             "Detected ffmpeg version %s %s",
-            version,
-            "with libsoxr support" if libsoxr_support else "",
+            capabilities.version,
+            "with libsoxr support" if capabilities.libsoxr else "",
         )
         # start the webserver
         self.publish_port = config.get_value(CONF_BIND_PORT)
         self.publish_ip = config.get_value(CONF_PUBLISH_IP)
+        self.multi_client_buffer = config.get_value(CONF_MULTI_CLIENT_BUFFER)
+        self.audio_cache.max_size = config.get_value(CONF_AUDIO_CACHE_SIZE) * 1024 * 1024
+        await self.audio_cache.setup()
         await self._server.setup(
             bind_ip=config.get_value(CONF_BIND_IP),
             bind_port=self.publish_port,
@@ -454,6 +765,7 @@ class StreamsController(CoreController):
             start_queue_item=start_queue_item,
             seek_position=seek_position,
             fade_in=fade_in,
+            buffer_seconds=self.multi_client_buffer,
         )
         return stream_job
 
@@ -517,8 +829,9 @@ class StreamsController(CoreController):
             input_format=pcm_format,
             output_format=output_format,
         )
+        profile = await self._get_stream_profile(queue_player.player_id)
 
-        async with AsyncProcess(ffmpeg_args, True) as ffmpeg_proc:
+        async with AsyncProcess(ffmpeg_args, True, pipe_size=profile.pipe_size) as ffmpeg_proc:
             # feed stdin with pcm audio chunks from origin
             async def read_audio():
                 try:
@@ -528,6 +841,7 @@ class StreamsController(CoreController):
                         pcm_format=pcm_format,
                         seek_position=seek_position,
                         fade_in=fade_in,
+                        chunk_size=profile.get_pcm_chunk_size(pcm_format),
                     ):
                         try:
                             await ffmpeg_proc.write(chunk)
@@ -539,7 +853,7 @@ class StreamsController(CoreController):
             ffmpeg_proc.attach_task(read_audio())
 
             # read final chunks from stdout
-            async for chunk in ffmpeg_proc.iter_any(768000):
+            async for chunk in batch_chunks(ffmpeg_proc.iter_any(profile.read_size), profile):
                 try:
                     await resp.write(chunk)
                 except (BrokenPipeError, ConnectionResetError):
@@ -605,8 +919,9 @@ class StreamsController(CoreController):
             input_format=pcm_format,
             output_format=output_format,
         )
+        profile = await self._get_stream_profile(queue_player.player_id)
 
-        async with AsyncProcess(ffmpeg_args, True) as ffmpeg_proc:
+        async with AsyncProcess(ffmpeg_args, True, pipe_size=profile.pipe_size) as ffmpeg_proc:
             # feed stdin with pcm audio chunks from origin
             async def read_audio():
                 try:
@@ -627,10 +942,11 @@ class StreamsController(CoreController):
             ffmpeg_proc.attach_task(read_audio())
 
             # read final chunks from stdout
+            # (the chunks can not be batched if the icy metadata is sent after each chunk)
             iterator = (
                 ffmpeg_proc.iter_chunked(icy_meta_interval)
                 if enable_icy
-                else ffmpeg_proc.iter_any(768000)
+                else batch_chunks(ffmpeg_proc.iter_any(profile.read_size), profile)
             )
             async for chunk in iterator:
                 try:
@@ -728,27 +1044,17 @@ class StreamsController(CoreController):
             output_format=output_format,
         )
 
-        async with AsyncProcess(ffmpeg_args, True) as ffmpeg_proc:
-            # feed stdin with pcm audio chunks from origin
-            async def read_audio():
-                try:
-                    async for chunk in streamjob.subscribe(child_player_id):
-                        try:
-                            await ffmpeg_proc.write(chunk)
-                        except BrokenPipeError:
-                            break
-                finally:
-                    ffmpeg_proc.write_eof()
-
-            ffmpeg_proc.attach_task(read_audio())
-
-            # read final chunks from stdout
-            async for chunk in ffmpeg_proc.iter_any(768000):
-                try:
-                    await resp.write(chunk)
-                except (BrokenPipeError, ConnectionResetError):
-                    # race condition
-                    break
+        # the (player specific) encoder is shared with other players of the job
+        # that request the exact same output
+        profile = await self._get_stream_profile(child_player_id)
+        async for chunk in batch_chunks(
+            streamjob.subscribe_encoded(child_player_id, ffmpeg_args), profile
+        ):
+            try:
+                await resp.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # race condition
+                break
 
         return resp
 
@@ -764,137 +1070,183 @@ class StreamsController(CoreController):
         # ruff: noqa: PLR0915
         assert pcm_format.content_type.is_pcm()
         queue_track = None
+        # prefetch of the next track and the (prefetched) track that is currently streaming
+        prefetch: FlowStreamPrefetch | None = None
+        streaming_prefetch: FlowStreamPrefetch | None = None
         last_fadeout_part = b""
         total_bytes_written = 0
         self.logger.info("Start Queue Flow stream for Queue %s", queue.display_name)
+        # number of seconds before the end of a track to start prefetching the next track
+        prefetch_seconds = self.mass.config.get_raw_player_config_value(
+            queue.queue_id, CONF_FLOW_PREFETCH, 10
+        )
 
-        while True:
-            # get (next) queue item to stream
-            if queue_track is None:
-                queue_track = start_queue_item
-                use_crossfade = queue.crossfade_enabled
-            else:
-                seek_position = 0
-                fade_in = False
-                try:
-                    (
-                        _,
-                        queue_track,
-                        use_crossfade,
-                    ) = await self.mass.player_queues.preload_next_url(queue.queue_id)
-                except QueueEmpty:
-                    break
+        try:
+            while True:
+                # get (next) queue item to stream
+                if queue_track is None:
+                    queue_track = start_queue_item
+                    use_crossfade = queue.crossfade_enabled
+                    # get streamdetails
+                    try:
+                        streamdetails = await get_stream_details(self.mass, queue_track)
+                    except MediaNotFoundError as err:
+                        # streamdetails retrieval failed, skip to next track instead of bailing out
+                        self.logger.warning(
+                            "Skip track %s due to missing streamdetails",
+                            queue_track.name,
+                            exc_info=err,
+                        )
+                        continue
+                    audio_source = get_media_stream(
+                        self.mass,
+                        streamdetails,
+                        pcm_format=pcm_format,
+                        seek_position=seek_position,
+                        fade_in=fade_in,
+                    )
+                else:
+                    seek_position = 0
+                    fade_in = False
+                    if prefetch is None:
+                        # the next track was not prefetched (yet), start it now
+                        prefetch = FlowStreamPrefetch(
+                            self,
+                            queue.queue_id,
+                            pcm_format,
+                            # only allow strip silence from begin if track is being crossfaded
+                            strip_silence_begin=last_fadeout_part != b"",
+                        )
+                    try:
+                        queue_track, use_crossfade, streamdetails = await prefetch.get_next_track()
+                    except QueueEmpty:
+                        break
+                    except MediaNotFoundError as err:
+                        # streamdetails retrieval failed, skip to next track instead of bailing out
+                        self.logger.warning(
+                            "Skip track %s due to missing streamdetails", str(err), exc_info=err
+                        )
+                        prefetch = None
+                        continue
+                    audio_source = prefetch.iter_chunks()
+                    streaming_prefetch, prefetch = prefetch, None
 
-            # get streamdetails
-            try:
-                streamdetails = await get_stream_details(self.mass, queue_track)
-            except MediaNotFoundError as err:
-                # streamdetails retrieval failed, skip to next track instead of bailing out...
-                self.logger.warning(
-                    "Skip track %s due to missing streamdetails",
+                self.logger.debug(
+                    "Start Streaming queue track: %s (%s) for queue %s - crossfade: %s",
+                    streamdetails.uri,
                     queue_track.name,
-                    exc_info=err,
+                    queue.display_name,
+                    use_crossfade,
                 )
-                continue
-
-            self.logger.debug(
-                "Start Streaming queue track: %s (%s) for queue %s - crossfade: %s",
-                streamdetails.uri,
-                queue_track.name,
-                queue.display_name,
-                use_crossfade,
-            )
 
-            # set some basic vars
-            pcm_sample_size = int(pcm_format.sample_rate * (pcm_format.bit_depth / 8) * 2)
-            crossfade_duration = self.mass.config.get_raw_player_config_value(
-                queue.queue_id, CONF_CROSSFADE_DURATION, 8
-            )
-            crossfade_size = int(pcm_sample_size * crossfade_duration)
-            queue_track.streamdetails.seconds_skipped = seek_position
-            buffer_size = crossfade_size if use_crossfade else int(pcm_sample_size * 2)
-
-            buffer = b""
-            bytes_written = 0
-            chunk_num = 0
-            # handle incoming audio chunks
-            async for chunk in get_media_stream(
-                self.mass,
-                streamdetails,
-                pcm_format=pcm_format,
-                seek_position=seek_position,
-                fade_in=fade_in,
-                # only allow strip silence from begin if track is being crossfaded
-                strip_silence_begin=last_fadeout_part != b"",
-            ):
-                chunk_num += 1
+                # set some basic vars
+                pcm_sample_size = int(pcm_format.sample_rate * (pcm_format.bit_depth / 8) * 2)
+                crossfade_duration = self.mass.config.get_raw_player_config_value(
+                    queue.queue_id, CONF_CROSSFADE_DURATION, 8
+                )
+                crossfade_size = int(pcm_sample_size * crossfade_duration)
+                queue_track.streamdetails.seconds_skipped = seek_position
+                buffer_size = crossfade_size if use_crossfade else int(pcm_sample_size * 2)
+                # start prefetching the next track when we reach this position (in bytes)
+                prefetch_position = None
+                if prefetch_seconds and streamdetails.duration:
+                    prefetch_position = (
+                        streamdetails.duration - seek_position - prefetch_seconds
+                    ) * pcm_sample_size
+
+                buffer = b""
+                bytes_received = 0
+                bytes_written = 0
+                chunk_num = 0
+                # handle incoming audio chunks
+                async for chunk in audio_source:
+                    chunk_num += 1
+                    bytes_received += len(chunk)
+
+                    if (
+                        prefetch is None
+                        and prefetch_position is not None
+                        and bytes_received >= prefetch_position
+                    ):
+                        # (almost) at the end of the track, start prefetching the next track
+                        prefetch = FlowStreamPrefetch(
+                            self,
+                            queue.queue_id,
+                            pcm_format,
+                            strip_silence_begin=use_crossfade,
+                            buffer_seconds=prefetch_seconds,
+                        )
 
-                ####  HANDLE FIRST PART OF TRACK
-
-                # buffer full for crossfade
-                if last_fadeout_part and (len(buffer) >= buffer_size):
-                    first_part = buffer + chunk
-                    # perform crossfade
-                    fadein_part = first_part[:crossfade_size]
-                    remaining_bytes = first_part[crossfade_size:]
-                    crossfade_part = await crossfade_pcm_parts(
-                        fadein_part,
-                        last_fadeout_part,
-                        pcm_format.bit_depth,
-                        pcm_format.sample_rate,
-                    )
-                    # send crossfade_part
-                    yield crossfade_part
-                    bytes_written += len(crossfade_part)
-                    # also write the leftover bytes from the strip action
-                    if remaining_bytes:
-                        yield remaining_bytes
-                        bytes_written += len(remaining_bytes)
-
-                    # clear vars
-                    last_fadeout_part = b""
-                    buffer = b""
+                    ####  HANDLE FIRST PART OF TRACK
+
+                    # buffer full for crossfade
+                    if last_fadeout_part and (len(buffer) >= buffer_size):
+                        first_part = buffer + chunk
+                        # perform crossfade
+                        fadein_part = memoryview(first_part)[:crossfade_size]
+                        remaining_bytes = first_part[crossfade_size:]
+                        crossfade_part = await crossfade_pcm_parts(
+                            fadein_part,
+                            last_fadeout_part,
+                            pcm_format.bit_depth,
+                            pcm_format.sample_rate,
+                        )
+                        # send crossfade_part
+                        yield crossfade_part
+                        bytes_written += len(crossfade_part)
+                        # also write the leftover bytes from the strip action
+                        if remaining_bytes:
+                            yield remaining_bytes
+                            bytes_written += len(remaining_bytes)
+
+                        # clear vars
+                        last_fadeout_part = b""
+                        buffer = b""
+                        continue
+
+                    # enough data in buffer, feed to output
+                    if len(buffer) >= (buffer_size * 2):
+                        yield buffer[:buffer_size]
+                        bytes_written += buffer_size
+                        buffer = buffer[buffer_size:] + chunk
+                        continue
+
+                    # all other: fill buffer
+                    buffer += chunk
                     continue
 
-                # enough data in buffer, feed to output
-                if len(buffer) >= (buffer_size * 2):
-                    yield buffer[:buffer_size]
-                    bytes_written += buffer_size
-                    buffer = buffer[buffer_size:] + chunk
+                #### HANDLE END OF TRACK
+
+                if bytes_written == 0:
+                    # stream error: got empty first chunk ?!
+                    self.logger.warning("Stream error on %s", streamdetails.uri)
+                    queue_track.streamdetails.seconds_streamed = 0
                     continue
 
-                # all other: fill buffer
-                buffer += chunk
-                continue
-
-            #### HANDLE END OF TRACK
-
-            if bytes_written == 0:
-                # stream error: got empty first chunk ?!
-                self.logger.warning("Stream error on %s", streamdetails.uri)
-                queue_track.streamdetails.seconds_streamed = 0
-                continue
-
-            if buffer and use_crossfade:
-                # if crossfade is enabled, save fadeout part to pickup for next track
-                last_fadeout_part = buffer[-crossfade_size:]
-                remaining_bytes = buffer[:-crossfade_size]
-                yield remaining_bytes
-                bytes_written += len(remaining_bytes)
-            elif buffer:
-                # no crossfade enabled, just yield the buffer last part
-                yield buffer
-                bytes_written += len(buffer)
-
-            # end of the track reached - store accurate duration
-            queue_track.streamdetails.seconds_streamed = bytes_written / pcm_sample_size
-            total_bytes_written += bytes_written
-            self.logger.debug(
-                "Finished Streaming queue track: %s (%s) on queue %s",
-                queue_track.streamdetails.uri,
-                queue_track.name,
-                queue.display_name,
-            )
+                if buffer and use_crossfade:
+                    # if crossfade is enabled, save fadeout part to pickup for next track
+                    last_fadeout_part = buffer[-crossfade_size:]
+                    remaining_bytes = buffer[:-crossfade_size]
+                    yield remaining_bytes
+                    bytes_written += len(remaining_bytes)
+                elif buffer:
+                    # no crossfade enabled, just yield the buffer last part
+                    yield buffer
+                    bytes_written += len(buffer)
+
+                # end of the track reached - store accurate duration
+                queue_track.streamdetails.seconds_streamed = bytes_written / pcm_sample_size
+                total_bytes_written += bytes_written
+                self.logger.debug(
+                    "Finished Streaming queue track: %s (%s) on queue %s",
+                    queue_track.streamdetails.uri,
+                    queue_track.name,
+                    queue.display_name,
+                )
+        finally:
+            for _prefetch in (prefetch, streaming_prefetch):
+                if _prefetch is not None:
+                    _prefetch.stop()
 
         self.logger.info("Finished Queue Flow stream for Queue %s", queue.display_name)
 
@@ -974,6 +1326,11 @@ class StreamsController(CoreController):
 
         return generic_args + input_args + extra_args + output_args
 
+    async def _get_stream_profile(self, player_id: str) -> StreamProfile:
+        """Return the (configured) streaming profile for the given player."""
+        profile = await self.mass.config.get_player_config_value(player_id, CONF_STREAM_PROFILE)
+        return STREAM_PROFILES.get(profile, STREAM_PROFILES[DEFAULT_STREAM_PROFILE])
+
     def _log_request(self, request: web.Request) -> None:
         """Log request."""
         if not self.logger.isEnabledFor(logging.DEBUG):
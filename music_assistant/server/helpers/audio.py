@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import os
 import re
 import struct
 from collections.abc import AsyncGenerator
+from contextlib import aclosing, suppress
 from io import BytesIO
 from time import time
 from typing import TYPE_CHECKING
@@ -27,7 +29,10 @@ from music_assistant.constants import (
     ROOT_LOGGER_NAME,
 )
 
-from .process import AsyncProcess, check_output
+from . import pcm
+from .ffmpeg import get_ffmpeg_args
+from .process import AsyncProcess
+from .seek_index import get_seek_index
 from .util import create_tempfile
 
 if TYPE_CHECKING:
@@ -40,14 +45,38 @@ LOGGER = logging.getLogger(f"{ROOT_LOGGER_NAME}.audio")
 
 
 async def crossfade_pcm_parts(
-    fade_in_part: bytes,
-    fade_out_part: bytes,
+    fade_in_part: bytes | memoryview,
+    fade_out_part: bytes | memoryview,
     bit_depth: int,
     sample_rate: int,
+    floating_point: bool = False,
+) -> bytes:
+    """Crossfade two chunks of pcm/raw audio.
+
+    The crossfade is performed in-process (using NumPy),
+    ffmpeg is only used as fallback for sample formats that are not supported.
+    """
+    try:
+        return await asyncio.to_thread(
+            pcm.crossfade, fade_in_part, fade_out_part, bit_depth, floating_point
+        )
+    except ValueError as err:
+        LOGGER.debug("in-process crossfade not possible, fallback to ffmpeg: %s", str(err))
+    return await crossfade_pcm_parts_ffmpeg(
+        fade_in_part, fade_out_part, bit_depth, sample_rate, floating_point
+    )
+
+
+async def crossfade_pcm_parts_ffmpeg(
+    fade_in_part: bytes | memoryview,
+    fade_out_part: bytes | memoryview,
+    bit_depth: int,
+    sample_rate: int,
+    floating_point: bool = False,
 ) -> bytes:
     """Crossfade two chunks of pcm/raw audio using ffmpeg."""
     sample_size = int(sample_rate * (bit_depth / 8) * 2)
-    fmt = ContentType.from_bit_depth(bit_depth)
+    fmt = ContentType.from_bit_depth(bit_depth, floating_point)
     # calculate the fade_length from the smallest chunk
     fade_length = min(len(fade_in_part), len(fade_out_part)) / sample_size
     fadeoutfile = create_tempfile()
@@ -107,131 +136,7 @@ async def crossfade_pcm_parts(
             len(fade_in_part),
             len(fade_out_part),
         )
-        return fade_out_part + fade_in_part
-
-
-async def strip_silence(
-    mass: MusicAssistant,  # noqa: ARG001
-    audio_data: bytes,
-    sample_rate: int,
-    bit_depth: int,
-    reverse: bool = False,
-) -> bytes:
-    """Strip silence from begin or end of pcm audio using ffmpeg."""
-    fmt = ContentType.from_bit_depth(bit_depth)
-    args = ["ffmpeg", "-hide_banner", "-loglevel", "quiet"]
-    args += [
-        "-acodec",
-        fmt.name.lower(),
-        "-f",
-        fmt,
-        "-ac",
-        "2",
-        "-ar",
-        str(sample_rate),
-        "-i",
-        "-",
-    ]
-    # filter args
-    if reverse:
-        args += [
-            "-af",
-            "areverse,atrim=start=0.2,silenceremove=start_periods=1:start_silence=0.1:start_threshold=0.02,areverse",
-        ]
-    else:
-        args += [
-            "-af",
-            "atrim=start=0.2,silenceremove=start_periods=1:start_silence=0.1:start_threshold=0.02",
-        ]
-    # output args
-    args += ["-f", fmt, "-"]
-    async with AsyncProcess(args, True) as proc:
-        stripped_data, _ = await proc.communicate(audio_data)
-
-    # return stripped audio
-    bytes_stripped = len(audio_data) - len(stripped_data)
-    if LOGGER.isEnabledFor(logging.DEBUG):
-        pcm_sample_size = int(sample_rate * (bit_depth / 8) * 2)
-        seconds_stripped = round(bytes_stripped / pcm_sample_size, 2)
-        location = "end" if reverse else "begin"
-        LOGGER.debug(
-            "stripped %s seconds of silence from %s of pcm audio. bytes stripped: %s",
-            seconds_stripped,
-            location,
-            bytes_stripped,
-        )
-    return stripped_data
-
-
-async def analyze_audio(mass: MusicAssistant, streamdetails: StreamDetails) -> None:
-    """Analyze track audio, for now we only calculate EBU R128 loudness."""
-    if streamdetails.loudness is not None:
-        # only when needed we do the analyze job
-        return
-
-    LOGGER.debug("Start analyzing audio for %s", streamdetails.uri)
-    # calculate BS.1770 R128 integrated loudness with ffmpeg
-    input_file = streamdetails.direct or "-"
-    proc_args = [
-        "ffmpeg",
-        "-t",
-        "300",  # limit to 5 minutes to prevent OOM
-        "-i",
-        input_file,
-        "-f",
-        streamdetails.audio_format.content_type,
-        "-af",
-        "ebur128=framelog=verbose",
-        "-f",
-        "null",
-        "-",
-    ]
-    async with AsyncProcess(
-        proc_args,
-        enable_stdin=streamdetails.direct is None,
-        enable_stdout=False,
-        enable_stderr=True,
-    ) as ffmpeg_proc:
-
-        async def writer():
-            """Task that grabs the source audio and feeds it to ffmpeg."""
-            music_prov = mass.get_provider(streamdetails.provider)
-            chunk_count = 0
-            async for audio_chunk in music_prov.get_audio_stream(streamdetails):
-                chunk_count += 1
-                await ffmpeg_proc.write(audio_chunk)
-                if chunk_count == 300:
-                    # safety guard: max (more or less) 5 minutes seconds of audio may be analyzed
-                    break
-            ffmpeg_proc.write_eof()
-
-        if streamdetails.direct is None:
-            writer_task = ffmpeg_proc.attach_task(writer())
-            # wait for the writer task to finish
-            await writer_task
-
-        _, stderr = await ffmpeg_proc.communicate()
-        try:
-            loudness_str = (
-                stderr.decode().split("Integrated loudness")[1].split("I:")[1].split("LUFS")[0]
-            )
-            loudness = float(loudness_str.strip())
-        except (IndexError, ValueError, AttributeError):
-            LOGGER.warning(
-                "Could not determine integrated loudness of %s - %s",
-                streamdetails.uri,
-                stderr.decode() or "received empty value",
-            )
-        else:
-            streamdetails.loudness = loudness
-            await mass.music.set_track_loudness(
-                streamdetails.item_id, streamdetails.provider, loudness
-            )
-            LOGGER.debug(
-                "Integrated loudness of %s is: %s",
-                streamdetails.uri,
-                loudness,
-            )
+        return bytes(fade_out_part) + bytes(fade_in_part)
 
 
 async def get_stream_details(mass: MusicAssistant, queue_item: QueueItem) -> StreamDetails:
@@ -386,12 +291,17 @@ async def get_media_stream(  # noqa: PLR0915
     fade_in: bool = False,
     strip_silence_begin: bool = False,
     strip_silence_end: bool = True,
+    chunk_size: int | None = None,
+    report_playback: bool = True,
 ) -> AsyncGenerator[bytes, None]:
     """
     Get the (raw PCM) audio stream for the given streamdetails.
 
     Other than stripping silence at end and beginning and optional
     volume normalization this is the pure, unaltered audio data as PCM chunks.
+    The chunks are 2 seconds of audio (1 second for radio) unless chunk_size is given.
+    If report_playback is disabled, the caller is responsible for reporting the playback
+    (see report_stream_played), e.g. when the audio is (pre)buffered before it is played.
     """
     bytes_sent = 0
     streamdetails.seconds_skipped = seek_position
@@ -400,22 +310,49 @@ async def get_media_stream(  # noqa: PLR0915
         strip_silence_begin = False
     # chunk size = 2 seconds of pcm audio
     pcm_sample_size = int(pcm_format.sample_rate * (pcm_format.bit_depth / 8) * 2)
-    chunk_size = pcm_sample_size * (1 if is_radio else 2)
-    expected_chunks = int((streamdetails.duration or 0) / 2)
-    if expected_chunks < 60:
+    if not chunk_size:
+        chunk_size = pcm_sample_size * (1 if is_radio else 2)
+    if (streamdetails.duration or 0) < 120:
         strip_silence_end = False
+    # amount of silence to keep when stripping silence (100ms)
+    frame_size = pcm_sample_size // pcm_format.sample_rate
+    silence_padding = int(pcm_format.sample_rate * 0.1) * frame_size
+    # max amount of silence to hold back while looking for the end of the track (12 seconds)
+    max_held_silence = pcm_sample_size * 12
+    # measure the loudness from the pcm audio we stream (if not yet known),
+    # only if we stream the (unaltered) track from the beginning (no seek or fade in)
+    loudness_meter = None
+    if streamdetails.loudness is None and not seek_position and not fade_in:
+        loudness_meter = _get_loudness_meter(pcm_format)
+
+    # the (source) audio of tracks of streaming providers can be cached locally,
+    # so ffmpeg can access (and seek) the cached file directly on repeated plays
+    direct = streamdetails.direct
+    audio_cache_key = None
+    if (
+        direct is None
+        and mass.streams.audio_cache.max_size
+        and not is_radio
+        and (music_prov := mass.get_provider(streamdetails.provider))
+        and music_prov.is_streaming_provider
+        and not streamdetails.audio_format.content_type.is_pcm()
+    ):
+        audio_cache_key = _get_audio_cache_key(streamdetails)
+        if direct := await mass.streams.audio_cache.get_file_path(audio_cache_key):
+            LOGGER.debug("using cached audio for: %s", streamdetails.uri)
 
     # collect all arguments for ffmpeg
-    seek_pos = seek_position if (streamdetails.direct or not streamdetails.can_seek) else 0
+    seek_pos = seek_position if (direct or not streamdetails.can_seek) else 0
     args = await _get_ffmpeg_args(
         streamdetails=streamdetails,
         pcm_output_format=pcm_format,
         # only use ffmpeg seeking if the provider stream does not support seeking
         seek_position=seek_pos,
         fade_in=fade_in,
+        input_file=direct,
     )
 
-    async with AsyncProcess(args, enable_stdin=streamdetails.direct is None) as ffmpeg_proc:
+    async with AsyncProcess(args, enable_stdin=direct is None) as ffmpeg_proc:
         LOGGER.debug("start media stream for: %s", streamdetails.uri)
 
         async def writer():
@@ -423,65 +360,85 @@ async def get_media_stream(  # noqa: PLR0915
             LOGGER.debug("writer started for %s", streamdetails.uri)
             music_prov = mass.get_provider(streamdetails.provider)
             seek_pos = seek_position if streamdetails.can_seek else 0
-            async for audio_chunk in music_prov.get_audio_stream(streamdetails, seek_pos):
-                await ffmpeg_proc.write(audio_chunk)
+            audio_stream = music_prov.get_audio_stream(streamdetails, seek_pos)
+            if audio_cache_key and not seek_pos:
+                # we receive the whole track, fill the audio cache while streaming
+                audio_stream = _fill_audio_cache(mass, audio_cache_key, audio_stream)
+            # close the stream right away if we stop early (e.g. to discard a partial cache file)
+            async with aclosing(audio_stream):
+                async for audio_chunk in audio_stream:
+                    await ffmpeg_proc.write(audio_chunk)
             # write eof when last packet is received
             ffmpeg_proc.write_eof()
             LOGGER.debug("writer finished for %s", streamdetails.uri)
 
-        if streamdetails.direct is None:
+        if direct is None:
             ffmpeg_proc.attach_task(writer())
 
-        # get pcm chunks from stdout
-        # we always stay one chunk behind to properly detect end of chunks
-        # so we can strip silence at the beginning and end of a track
-        prev_chunk = b""
-        chunk_num = 0
+        # get pcm chunks from stdout and strip silence at the beginning and end of a track,
+        # (trailing) silence is held back until we know if it is followed by more audio
+        held_silence = b""
+        bytes_stripped_begin = 0
+        bytes_received = 0
         try:
             async for chunk in ffmpeg_proc.iter_chunked(chunk_size):
-                chunk_num += 1
-                if strip_silence_begin and chunk_num == 2:
-                    # first 2 chunks received, strip silence of beginning
-                    stripped_audio = await strip_silence(
-                        mass,
-                        prev_chunk + chunk,
-                        sample_rate=pcm_format.sample_rate,
-                        bit_depth=pcm_format.bit_depth,
-                    )
-                    yield stripped_audio
-                    bytes_sent += len(stripped_audio)
-                    prev_chunk = b""
-                    del stripped_audio
+                bytes_received += len(chunk)
+                if loudness_meter is not None:
+                    await asyncio.to_thread(loudness_meter.update, chunk)
+                    if is_radio and loudness_meter.duration >= 300:
+                        # radio streams are endless, 5 minutes of audio is enough to measure
+                        mass.create_task(_set_loudness(mass, streamdetails, loudness_meter))
+                        loudness_meter = None
+                if strip_silence_begin and bytes_received - len(chunk) >= pcm_sample_size * 4:
+                    # only strip silence from the first 4 seconds of the track
+                    strip_silence_begin = False
+                if not (strip_silence_begin or strip_silence_end):
+                    yield chunk
+                    bytes_sent += len(chunk)
+                    continue
+
+                audio_bounds = await _get_audio_bounds(chunk, pcm_format)
+                if audio_bounds is None and strip_silence_begin:
+                    # silence at the beginning of the track, strip the whole chunk
+                    bytes_stripped_begin += len(chunk)
                     continue
-                if strip_silence_end and chunk_num >= (expected_chunks - 6):
-                    # last part of the track, collect multiple chunks to strip silence later
-                    prev_chunk += chunk
+                if audio_bounds is None:
+                    # chunk of silence, hold it back (within limits) until more audio follows
+                    held_silence += chunk
+                    if len(held_silence) >= max_held_silence:
+                        yield held_silence
+                        bytes_sent += len(held_silence)
+                        held_silence = b""
                     continue
 
-                # middle part of the track, send previous chunk and collect current chunk
-                if prev_chunk:
-                    yield prev_chunk
-                    bytes_sent += len(prev_chunk)
-
-                prev_chunk = chunk
-
-            # all chunks received, strip silence of last part
-            if strip_silence_end:
-                stripped_audio = await strip_silence(
-                    mass,
-                    prev_chunk,
-                    sample_rate=pcm_format.sample_rate,
-                    bit_depth=pcm_format.bit_depth,
-                    reverse=True,
+                start, end = audio_bounds
+                if strip_silence_begin:
+                    strip_silence_begin = False
+                    start = max(start - silence_padding, 0)
+                    bytes_stripped_begin += start
+                else:
+                    start = 0
+                if not strip_silence_end:
+                    end = len(chunk)
+                if held_silence:
+                    yield held_silence
+                    bytes_sent += len(held_silence)
+                yield chunk[start:end]
+                bytes_sent += end - start
+                held_silence = chunk[end:]
+
+            # all chunks received, strip silence at the end (but keep some padding)
+            if held_silence:
+                yield held_silence[:silence_padding]
+                bytes_sent += min(len(held_silence), silence_padding)
+            if bytes_stripped_begin or len(held_silence) > silence_padding:
+                LOGGER.debug(
+                    "stripped %s seconds of silence from begin and %s seconds from end of %s",
+                    round(bytes_stripped_begin / pcm_sample_size, 2),
+                    round(max(len(held_silence) - silence_padding, 0) / pcm_sample_size, 2),
+                    streamdetails.uri,
                 )
-                yield stripped_audio
-                bytes_sent += len(stripped_audio)
-                del stripped_audio
-            else:
-                yield prev_chunk
-                bytes_sent += len(prev_chunk)
-
-            del prev_chunk
+            del held_silence
 
             # update duration details based on the actual pcm data we sent
             streamdetails.seconds_streamed = bytes_sent / pcm_sample_size
@@ -491,16 +448,20 @@ async def get_media_stream(  # noqa: PLR0915
             raise err
         else:
             LOGGER.debug("finished media stream for: %s", streamdetails.uri)
+            if loudness_meter is not None:
+                mass.create_task(_set_loudness(mass, streamdetails, loudness_meter))
         finally:
-            # report playback
-            await mass.music.mark_item_played(
-                streamdetails.media_type, streamdetails.item_id, streamdetails.provider
-            )
-            if streamdetails.callback:
-                mass.create_task(streamdetails.callback, streamdetails)
-            # send analyze job to background worker
-            if streamdetails.loudness is None:
-                mass.create_task(analyze_audio(mass, streamdetails))
+            if report_playback:
+                await report_stream_played(mass, streamdetails)
+
+
+async def report_stream_played(mass: MusicAssistant, streamdetails: StreamDetails) -> None:
+    """Report playback of a media stream (mark the item as played and call the callback)."""
+    await mass.music.mark_item_played(
+        streamdetails.media_type, streamdetails.item_id, streamdetails.provider
+    )
+    if streamdetails.callback:
+        mass.create_task(streamdetails.callback, streamdetails)
 
 
 async def get_radio_stream(
@@ -558,9 +519,19 @@ async def get_http_stream(
     # headers
     headers = {}
     skip_bytes = 0
+    seek_index = None
     if seek_position and streamdetails.size:
-        skip_bytes = int(streamdetails.size / streamdetails.duration * seek_position)
+        # use the (exact) seek index if present, otherwise estimate the byte offset
+        seek_index = await get_seek_index(
+            mass, streamdetails, str(streamdetails.size), lambda: _iter_http_content(mass, url)
+        )
+        if seek_index:
+            skip_bytes = seek_index.get_offset(seek_position)
+        else:
+            skip_bytes = int(streamdetails.size / streamdetails.duration * seek_position)
         headers["Range"] = f"bytes={skip_bytes}-"
+    if seek_index and seek_index.header:
+        yield seek_index.header
 
     # start the streaming from http
     buffer = b""
@@ -583,12 +554,13 @@ async def get_http_stream(
     if not streamdetails.size:
         streamdetails.size = bytes_received
     if buffer_all:
-        skip_bytes = streamdetails.size / streamdetails.duration * seek_position
-        yield buffer[:skip_bytes]
+        if not skip_bytes:
+            skip_bytes = int(streamdetails.size / streamdetails.duration * seek_position)
+        yield buffer[skip_bytes:]
 
 
 async def get_file_stream(
-    mass: MusicAssistant,  # noqa: ARG001
+    mass: MusicAssistant,
     filename: str,
     streamdetails: StreamDetails,
     seek_position: int = 0,
@@ -596,38 +568,34 @@ async def get_file_stream(
     """Get audio stream from local accessible file."""
     if seek_position:
         assert streamdetails.duration, "Duration required for seek requests"
+    stat = await asyncio.to_thread(os.stat, filename)
     if not streamdetails.size:
-        stat = await asyncio.to_thread(os.stat, filename)
         streamdetails.size = stat.st_size
-    chunk_size = get_chunksize(streamdetails.audio_format.content_type)
-    async with aiofiles.open(streamdetails.data, "rb") as _file:
-        if seek_position:
-            seek_pos = int((streamdetails.size / streamdetails.duration) * seek_position)
-            await _file.seek(seek_pos)
-        # yield chunks of data from file
-        while True:
-            data = await _file.read(chunk_size)
-            if not data:
-                break
-            yield data
+    chunk_size = get_chunksize(streamdetails.audio_format)
+    seek_bytes = 0
+    if seek_position:
+        # use the (exact) seek index if present, otherwise estimate the byte offset
+        seek_index = await get_seek_index(
+            mass,
+            streamdetails,
+            f"{stat.st_size}.{stat.st_mtime}",
+            lambda: _iter_file_content(filename, chunk_size),
+        )
+        if seek_index:
+            seek_bytes = seek_index.get_offset(seek_position)
+            if seek_index.header:
+                yield seek_index.header
+        else:
+            seek_bytes = int((streamdetails.size / streamdetails.duration) * seek_position)
+    # yield chunks of data from file
+    async for data in _iter_file_content(filename, chunk_size, seek_bytes):
+        yield data
 
 
 async def check_audio_support() -> tuple[bool, bool, str]:
     """Check if ffmpeg is present (with/without libsoxr support)."""
-    cache_key = "audio_support_cache"
-    if cache := globals().get(cache_key):
-        return cache
-
-    # check for FFmpeg presence
-    returncode, output = await check_output("ffmpeg -version")
-    ffmpeg_present = returncode == 0 and "FFmpeg" in output.decode()
-
-    # use globals as in-memory cache
-    version = output.decode().split("ffmpeg version ")[1].split(" ")[0].split("-")[0]
-    libsoxr_support = "enable-libsoxr" in output.decode()
-    result = (ffmpeg_present, libsoxr_support, version)
-    globals()[cache_key] = result
-    return result
+    capabilities = (await get_ffmpeg_args()).capabilities
+    return (capabilities.present, capabilities.libsoxr, capabilities.version)
 
 
 async def get_preview_stream(
@@ -741,28 +709,22 @@ async def _get_ffmpeg_args(
     pcm_output_format: AudioFormat,
     seek_position: int = 0,
     fade_in: bool = False,
+    input_file: str | None = None,
 ) -> list[str]:
-    """Collect all args to send to the ffmpeg process."""
-    ffmpeg_present, libsoxr_support, version = await check_audio_support()
+    """Collect all args to send to the ffmpeg process.
 
-    if not ffmpeg_present:
+    The input is read from input_file (if given), the direct path/url of the stream
+    or otherwise from stdin.
+    """
+    input_file = input_file or streamdetails.direct
+    ffmpeg_args = await get_ffmpeg_args()
+    if not ffmpeg_args.capabilities.present:
         raise AudioError(
             "FFmpeg binary is missing from system."
             "Please install ffmpeg on your OS to enable playback.",
         )
 
-    major_version = int("".join(char for char in version.split(".")[0] if not char.isalpha()))
-
-    # generic args
-    generic_args = [
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "warning" if LOGGER.isEnabledFor(logging.DEBUG) else "quiet",
-        "-ignore_unknown",
-        "-protocol_whitelist",
-        "file,http,https,tcp,tls,crypto,pipe,fd",  # support nested protocols (e.g. within playlist)
-    ]
+    generic_args = ffmpeg_args.generic_args[LOGGER.isEnabledFor(logging.DEBUG)]
     # collect input args
     input_args = [
         "-ac",
@@ -772,28 +734,11 @@ async def _get_ffmpeg_args(
     ]
     if seek_position:
         input_args += ["-ss", str(seek_position)]
-    if streamdetails.direct:
+    if input_file:
         # ffmpeg can access the inputfile (or url) directly
-        if streamdetails.direct.startswith("http"):
-            # append reconnect options for direct stream from http
-            input_args += [
-                "-reconnect",
-                "1",
-                "-reconnect_streamed",
-                "1",
-                "-reconnect_delay_max",
-                "10",
-            ]
-            if major_version > 4:
-                # these options are only supported in ffmpeg > 5
-                input_args += [
-                    "-reconnect_on_network_error",
-                    "1",
-                    "-reconnect_on_http_error",
-                    "5xx",
-                ]
-
-        input_args += ["-i", streamdetails.direct]
+        if input_file.startswith("http"):
+            input_args += ffmpeg_args.reconnect_args
+        input_args += ["-i", input_file]
     else:
         # the input is received from pipe/stdin
         if streamdetails.audio_format.content_type != ContentType.UNKNOWN:
@@ -803,18 +748,7 @@ async def _get_ffmpeg_args(
             "-",
         ]
 
-    # collect output args
-    output_args = [
-        "-acodec",
-        pcm_output_format.content_type.name.lower(),
-        "-f",
-        pcm_output_format.content_type.value,
-        "-ac",
-        str(pcm_output_format.channels),
-        "-ar",
-        str(pcm_output_format.sample_rate),
-        "-",
-    ]
+    output_args = ffmpeg_args.get_output_args(pcm_output_format)
     # collect extra and filter args
     extra_args = []
     filter_params = []
@@ -822,7 +756,7 @@ async def _get_ffmpeg_args(
         filter_params.append(f"volume={streamdetails.gain_correct}dB")
     if (
         streamdetails.audio_format.sample_rate != pcm_output_format.sample_rate
-        and libsoxr_support
+        and ffmpeg_args.capabilities.libsoxr
         and streamdetails.media_type == MediaType.TRACK
     ):
         # prefer libsoxr high quality resampler (if present) for sample rate conversions
@@ -833,3 +767,107 @@ async def _get_ffmpeg_args(
         extra_args += ["-af", ",".join(filter_params)]
 
     return generic_args + input_args + extra_args + output_args
+
+
+async def _get_audio_bounds(chunk: bytes, pcm_format: AudioFormat) -> tuple[int, int] | None:
+    """Return the (byte) offsets of the start and end of the audio within a chunk of PCM audio.
+
+    Returns None if the whole chunk is silence.
+    """
+    try:
+        return await asyncio.to_thread(
+            pcm.get_audio_bounds,
+            chunk,
+            pcm_format.bit_depth,
+            pcm_format.sample_rate,
+            pcm_format.content_type == ContentType.PCM_F32LE,
+        )
+    except ValueError:
+        # unsupported sample format, do not strip anything
+        return (0, len(chunk))
+
+
+def _get_loudness_meter(pcm_format: AudioFormat) -> pcm.LoudnessMeter | None:
+    """Return a loudness meter for the given PCM format, None if the format is not supported."""
+    try:
+        return pcm.LoudnessMeter(
+            pcm_format.sample_rate,
+            pcm_format.bit_depth,
+            pcm_format.content_type == ContentType.PCM_F32LE,
+            pcm_format.channels,
+        )
+    except ValueError:
+        return None
+
+
+async def _set_loudness(
+    mass: MusicAssistant, streamdetails: StreamDetails, loudness_meter: pcm.LoudnessMeter
+) -> None:
+    """Store the (EBU R128) integrated loudness measured from the (pcm) audio stream."""
+    loudness = loudness_meter.integrated_loudness
+    if loudness is None:
+        LOGGER.warning(
+            "Could not determine integrated loudness of %s - measured %s seconds of audio",
+            streamdetails.uri,
+            round(loudness_meter.duration, 2),
+        )
+        return
+    # the stream is measured after the volume correction has been applied
+    loudness = round(loudness - (streamdetails.gain_correct or 0), 2)
+    streamdetails.loudness = loudness
+    await mass.music.set_track_loudness(streamdetails.item_id, streamdetails.provider, loudness)
+    LOGGER.debug("Integrated loudness of %s is: %s", streamdetails.uri, loudness)
+
+
+def _get_audio_cache_key(streamdetails: StreamDetails) -> str:
+    """Return the key of the (source) audio of a track in the audio cache."""
+    return hashlib.sha256(f"{streamdetails.provider}|{streamdetails.item_id}".encode()).hexdigest()
+
+
+async def _fill_audio_cache(
+    mass: MusicAssistant, cache_key: str, audio_stream: AsyncGenerator[bytes, None]
+) -> AsyncGenerator[bytes, None]:
+    """Pass through the (source) audio chunks of a track while writing them to the audio cache.
+
+    The file is only added to the cache if the whole track was received.
+    """
+    audio_cache = mass.streams.audio_cache
+    temp_file_path = await audio_cache.create_temp_file(cache_key)
+    bytes_written = 0
+    completed = False
+    try:
+        async with aiofiles.open(temp_file_path, "wb") as temp_file, aclosing(audio_stream):
+            async for chunk in audio_stream:
+                yield chunk
+                if bytes_written <= audio_cache.max_size:
+                    await temp_file.write(chunk)
+                    bytes_written += len(chunk)
+        completed = bytes_written <= audio_cache.max_size
+    finally:
+        if completed:
+            await audio_cache.store_file(cache_key, temp_file_path)
+        else:
+            with suppress(FileNotFoundError):
+                await asyncio.to_thread(os.remove, temp_file_path)
+
+
+async def _iter_http_content(mass: MusicAssistant, url: str) -> AsyncGenerator[bytes, None]:
+    """Yield the (whole) contents of a HTTP resource in chunks."""
+    timeout = ClientTimeout(total=0, connect=30, sock_read=5 * 60)
+    async with mass.http_session.get(url, timeout=timeout) as resp:
+        async for chunk in resp.content.iter_any():
+            yield chunk
+
+
+async def _iter_file_content(
+    filename: str, chunk_size: int, seek: int = 0
+) -> AsyncGenerator[bytes, None]:
+    """Yield the contents of a local file in chunks."""
+    async with aiofiles.open(filename, "rb") as _file:
+        if seek:
+            await _file.seek(seek)
+        while True:
+            data = await _file.read(chunk_size)
+            if not data:
+                break
+            yield data
@@ -32,6 +32,13 @@ def create_safe_string(input_str: str) -> str:
     return re.sub(r"[^a-zA-Z0-9]", "", unaccented_string)
 
 
+def create_search_string(input_str: str) -> str:
+    """Return clean lowered (and unaccented) string with separate words for (full text) search."""
+    input_str = input_str.lower().strip().replace("'", "")
+    unaccented_string = unidecode.unidecode(input_str).replace("'", "")
+    return re.sub(r"[^a-z0-9]+", " ", unaccented_string).strip()
+
+
 def loose_compare_strings(base: str, alt: str) -> bool:
     """Compare strings and return True even on partial match."""
     # this is used to display 'versions' of the same track/album
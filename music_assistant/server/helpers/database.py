@@ -1,28 +1,81 @@
 """Database helpers and logic."""
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator, Mapping
+import asyncio
+import pathlib
+from collections.abc import AsyncGenerator, Iterable, Mapping
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Any
 
 import aiosqlite
 
 
 class DatabaseConnection:
-    """Class that holds the (connection to the) database with some convenience helper functions."""
+    """Class that holds the (connection to the) database with some convenience helper functions.
+
+    All writes go through a single (write) connection. The database runs in WAL mode so
+    (listing) queries can be served by a small pool of read-only connections and do not
+    have to wait for (long running) writes, such as a library sync, to complete.
+    """
 
     _db: aiosqlite.Connection
 
-    def __init__(self, db_path: str):
-        """Initialize class."""
+    def __init__(
+        self,
+        db_path: str,
+        read_pool_size: int = 2,
+        cache_size: int = 8192,
+        mmap_size: int = 64 * 1024 * 1024,
+        synchronous: str = "NORMAL",
+    ):
+        """Initialize class.
+
+        - db_path: path to the (sqlite) database file.
+        - read_pool_size: number of read-only connections, 0 to serve reads from the writer.
+        - cache_size: size of the page cache (per connection) in KiB.
+        - mmap_size: max number of bytes of the database file to memory map.
+        - synchronous: sqlite synchronous mode (NORMAL is safe in WAL mode).
+        """
         self.db_path = db_path
+        self.read_pool_size = read_pool_size
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.synchronous = synchronous
+        self._read_pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._read_connections: list[aiosqlite.Connection] = []
+        # incremented on every write/commit, can be used to invalidate cached query results
+        self.revision = 0
+        # the task that runs a transaction (block) on this database and the depth of its
+        # (nested) transaction blocks, tasks/callbacks started within the block inherit
+        # the context but are not part of the transaction
+        self._transaction: ContextVar[tuple[asyncio.Task | None, int] | None] = ContextVar(
+            f"transaction_{id(self)}", default=None
+        )
 
     async def setup(self) -> None:
         """Perform async initialization."""
         self._db = await aiosqlite.connect(self.db_path)
         self._db.row_factory = aiosqlite.Row
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute(f"PRAGMA synchronous={self.synchronous}")
+        await self._set_connection_pragmas(self._db)
+        db_uri = pathlib.Path(self.db_path).absolute().as_uri()
+        for _ in range(self.read_pool_size):
+            read_conn = await aiosqlite.connect(f"{db_uri}?mode=ro", uri=True)
+            read_conn.row_factory = aiosqlite.Row
+            await self._set_connection_pragmas(read_conn)
+            await read_conn.execute("PRAGMA query_only=1")
+            self._read_connections.append(read_conn)
+            self._read_pool.put_nowait(read_conn)
 
     async def close(self) -> None:
         """Close db connection on exit."""
+        for read_conn in self._read_connections:
+            await read_conn.close()
+        self._read_connections = []
+        # let sqlite update the statistics of the query planner (if needed) before closing
+        await self._db.execute("PRAGMA optimize")
         await self._db.close()
 
     async def get_rows(
@@ -40,7 +93,8 @@ class DatabaseConnection:
         if order_by is not None:
             sql_query += f" ORDER BY {order_by}"
         sql_query += f" LIMIT {limit} OFFSET {offset}"
-        return await self._db.execute_fetchall(sql_query, match)
+        async with self._read_connection() as db:
+            return await db.execute_fetchall(sql_query, match)
 
     async def get_rows_from_query(
         self,
@@ -51,7 +105,8 @@ class DatabaseConnection:
     ) -> list[Mapping]:
         """Get all rows for given custom query."""
         query = f"{query} LIMIT {limit} OFFSET {offset}"
-        return await self._db.execute_fetchall(query, params)
+        async with self._read_connection() as db:
+            return await db.execute_fetchall(query, params)
 
     async def get_count_from_query(
         self,
@@ -60,7 +115,7 @@ class DatabaseConnection:
     ) -> int:
         """Get row count for given custom query."""
         query = f"SELECT count() FROM ({query})"
-        async with self._db.execute(query, params) as cursor:
+        async with self._read_connection() as db, db.execute(query, params) as cursor:
             if result := await cursor.fetchone():
                 return result[0]
         return 0
@@ -71,7 +126,7 @@ class DatabaseConnection:
     ) -> int:
         """Get row count for given table."""
         query = f"SELECT count(*) FROM {table}"
-        async with self._db.execute(query) as cursor:
+        async with self._read_connection() as db, db.execute(query) as cursor:
             if result := await cursor.fetchone():
                 return result[0]
         return 0
@@ -80,13 +135,14 @@ class DatabaseConnection:
         """Search table by column."""
         sql_query = f"SELECT * FROM {table} WHERE {table}.{column} LIKE :search"
         params = {"search": f"%{search}%"}
-        return await self._db.execute_fetchall(sql_query, params)
+        async with self._read_connection() as db:
+            return await db.execute_fetchall(sql_query, params)
 
     async def get_row(self, table: str, match: dict[str, Any]) -> Mapping | None:
         """Get single row for given table where column matches keys/values."""
         sql_query = f"SELECT * FROM {table} WHERE "
         sql_query += " AND ".join(f"{table}.{x} = :{x}" for x in match)
-        async with self._db.execute(sql_query, match) as cursor:
+        async with self._read_connection() as db, db.execute(sql_query, match) as cursor:
             return await cursor.fetchone()
 
     async def insert(
@@ -94,38 +150,48 @@ class DatabaseConnection:
         table: str,
         values: dict[str, Any],
         allow_replace: bool = False,
-    ) -> Mapping:
-        """Insert data in given table."""
-        keys = tuple(values.keys())
-        if allow_replace:
-            sql_query = f'INSERT OR REPLACE INTO {table}({",".join(keys)})'
-        else:
-            sql_query = f'INSERT INTO {table}({",".join(keys)})'
-        sql_query += f' VALUES ({",".join(f":{x}" for x in keys)})'
-        await self.execute(sql_query, values)
-        await self._db.commit()
-        # return inserted/replaced item
-        lookup_vals = {key: value for key, value in values.items() if value not in (None, "")}
-        return await self.get_row(table, lookup_vals)
+    ) -> int:
+        """Insert data in given table and return the rowid of the inserted/replaced row."""
+        sql_query = self._get_insert_query(table, tuple(values.keys()), allow_replace)
+        async with self._db.execute(sql_query, values) as cursor:
+            rowid = cursor.lastrowid
+        await self._commit()
+        return rowid
 
-    async def insert_or_replace(self, table: str, values: dict[str, Any]) -> Mapping:
+    async def insert_or_replace(self, table: str, values: dict[str, Any]) -> int:
         """Insert or replace data in given table."""
         return await self.insert(table=table, values=values, allow_replace=True)
 
+    async def insert_many(
+        self,
+        table: str,
+        values: Iterable[dict[str, Any]],
+        allow_replace: bool = False,
+    ) -> None:
+        """Insert multiple rows (with the same keys) in given table in a single statement."""
+        values = list(values)
+        if not values:
+            return
+        sql_query = self._get_insert_query(table, tuple(values[0].keys()), allow_replace)
+        await self._db.executemany(sql_query, values)
+        await self._commit()
+
+    async def insert_or_replace_many(self, table: str, values: Iterable[dict[str, Any]]) -> None:
+        """Insert or replace multiple rows in given table in a single statement."""
+        await self.insert_many(table=table, values=values, allow_replace=True)
+
     async def update(
         self,
         table: str,
         match: dict[str, Any],
         values: dict[str, Any],
-    ) -> Mapping:
+    ) -> None:
         """Update record."""
         keys = tuple(values.keys())
         sql_query = f'UPDATE {table} SET {",".join(f"{x}=:{x}" for x in keys)} WHERE '
         sql_query += " AND ".join(f"{x} = :{x}" for x in match)
         await self.execute(sql_query, {**match, **values})
-        await self._db.commit()
-        # return updated item
-        return await self.get_row(table, match)
+        await self._commit()
 
     async def delete(self, table: str, match: dict | None = None, query: str | None = None) -> None:
         """Delete data in given table."""
@@ -138,35 +204,146 @@ class DatabaseConnection:
         elif query:
             sql_query += query
         await self.execute(sql_query, match)
-        await self._db.commit()
+        await self._commit()
 
     async def delete_where_query(self, table: str, query: str | None = None) -> None:
         """Delete data in given table using given where clausule."""
         sql_query = f"DELETE FROM {table} WHERE {query}"
         await self.execute(sql_query)
-        await self._db.commit()
+        await self._commit()
 
     async def execute(self, query: str | str, values: dict = None) -> Any:
         """Execute command on the database."""
-        return await self._db.execute(query, values)
+        result = await self._db.execute(query, values)
+        if not query.lstrip().upper().startswith(("SELECT", "PRAGMA")):
+            # (raw) write, invalidate the cached query results
+            self.revision += 1
+        return result
+
+    async def commit(self) -> None:
+        """Commit all pending writes, also when running within a transaction."""
+        await self._db.commit()
+        self.revision += 1
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[DatabaseConnection, None]:
+        """Group all writes within this block into a single transaction (unit of work).
+
+        The (individual) write helpers will not commit while a transaction is active,
+        the commit happens once when the outermost transaction block exits.
+        Transaction blocks may be nested and may be entered from concurrent tasks.
+        Long running jobs (such as a library sync) can call `commit` at regular
+        intervals to commit their writes in batches.
+        Reads within the transaction are served by the write connection,
+        so they also see the (not yet committed) writes of the transaction.
+
+        NOTE: The (write) connection is shared so pending writes are always committed,
+        also if an exception occurred, and writes outside of a transaction block
+        (from other tasks) will commit the pending writes too.
+        """
+        token = self._transaction.set((asyncio.current_task(), self._transaction_depth + 1))
+        try:
+            yield self
+        finally:
+            self._transaction.reset(token)
+            if self._transaction_depth == 0:
+                await self._db.commit()
+                self.revision += 1
+
+    async def vacuum(self, min_free_ratio: float = 0.2) -> bool:
+        """Compact the database, only if the ratio of free pages makes it worth it.
+
+        Returns True if the database was vacuumed.
+        """
+        async with self._db.execute("PRAGMA page_count") as cursor:
+            page_count = (await cursor.fetchone())[0]
+        async with self._db.execute("PRAGMA freelist_count") as cursor:
+            free_count = (await cursor.fetchone())[0]
+        if not page_count or (free_count / page_count) < min_free_ratio:
+            return False
+        await self._db.commit()
+        await self._db.execute("VACUUM")
+        await self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return True
 
     async def iter_items(
         self,
         table: str,
         match: dict = None,
+        limit: int = 500,
     ) -> AsyncGenerator[Mapping, None]:
-        """Iterate all items within a table."""
-        limit: int = 500
-        offset: int = 0
+        """Iterate all items within a table.
+
+        Uses keyset pagination on the rowid of the table (instead of LIMIT/OFFSET)
+        so the cost of fetching the next page does not grow with the number of rows.
+        """
+        params = dict(match or {})
+        query_parts = [f"{x} = :{x}" for x in params]
+        # the rowid is selected as last column so it does not interfere with the table columns
+        base_query = f"SELECT *, _rowid_ FROM {table}"
+        sql_query = base_query
+        if query_parts:
+            sql_query += " WHERE " + " AND ".join(query_parts)
         while True:
-            next_items = await self.get_rows(
-                table=table,
-                match=match,
-                offset=offset,
-                limit=limit,
-            )
+            async with self._read_connection() as db:
+                next_items = await db.execute_fetchall(
+                    f"{sql_query} ORDER BY _rowid_ LIMIT {limit}", params
+                )
             for item in next_items:
                 yield item
             if len(next_items) < limit:
                 break
-            offset += limit
+            # continue after the last rowid of this page
+            params["_last_rowid"] = next_items[-1][-1]
+            sql_query = f"{base_query} WHERE " + " AND ".join(
+                [*query_parts, "_rowid_ > :_last_rowid"]
+            )
+
+    @asynccontextmanager
+    async def _read_connection(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        """Return a (read-only) connection from the pool.
+
+        Falls back to the write connection within a transaction
+        (so the uncommitted writes are visible) or if no read pool is configured.
+        """
+        if not self._read_connections or self._transaction_depth > 0:
+            yield self._db
+            return
+        read_conn = await self._read_pool.get()
+        try:
+            yield read_conn
+        finally:
+            self._read_pool.put_nowait(read_conn)
+
+    async def _commit(self) -> None:
+        """Commit pending writes, unless we're running within a transaction."""
+        if self._transaction_depth == 0:
+            await self._db.commit()
+        # bump the revision only after the commit, so (concurrent) reads of the
+        # previous state can never be cached under the new revision
+        self.revision += 1
+
+    @property
+    def _transaction_depth(self) -> int:
+        """Return the depth of the (nested) transaction block(s) the current task is in."""
+        transaction = self._transaction.get()
+        if transaction is None or transaction[0] is not asyncio.current_task():
+            return 0
+        return transaction[1]
+
+    async def _set_connection_pragmas(self, db: aiosqlite.Connection) -> None:
+        """Apply the (performance related) pragmas to a connection."""
+        # a negative cache_size is interpreted by sqlite as KiB instead of number of pages
+        await db.execute(f"PRAGMA cache_size=-{self.cache_size}")
+        await db.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        await db.execute("PRAGMA temp_store=MEMORY")
+
+    @staticmethod
+    def _get_insert_query(table: str, keys: tuple[str, ...], allow_replace: bool) -> str:
+        """Return (parametrized) insert query for given table and column names."""
+        if allow_replace:
+            sql_query = f'INSERT OR REPLACE INTO {table}({",".join(keys)})'
+        else:
+            sql_query = f'INSERT INTO {table}({",".join(keys)})'
+        sql_query += f' VALUES ({",".join(f":{x}" for x in keys)})'
+        return sql_query
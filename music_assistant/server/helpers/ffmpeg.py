@@ -0,0 +1,141 @@
+"""Detection (and persistent caching) of the capabilities of the ffmpeg binary.
+
+Probing ffmpeg requires a few (slow) subprocess calls, so the detected capabilities are
+stored in the cache db (keyed by the modification time of the binary) and only probed
+again when the binary changes. The (static) parts of the ffmpeg arguments are precomputed
+from the capabilities so starting a stream only needs (dictionary) lookups.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from mashumaro import DataClassDictMixin
+
+from music_assistant.constants import ROOT_LOGGER_NAME
+
+from .process import check_output
+
+if TYPE_CHECKING:
+    from music_assistant.common.models.media_items import AudioFormat
+    from music_assistant.server import MusicAssistant
+
+LOGGER = logging.getLogger(f"{ROOT_LOGGER_NAME}.ffmpeg")
+
+CACHE_KEY = "ffmpeg_capabilities"
+
+
+@dataclass
+class FFMpegCapabilities(DataClassDictMixin):
+    """Capabilities of the (system) ffmpeg binary."""
+
+    present: bool = False
+    version: str = ""
+    libsoxr: bool = False
+    # the reconnect_on_network_error/reconnect_on_http_error options (ffmpeg 5+)
+    reconnect_on_error: bool = False
+
+
+class FFMpegArgs:
+    """Precomputed (static) ffmpeg arguments based on the ffmpeg capabilities."""
+
+    def __init__(self, capabilities: FFMpegCapabilities) -> None:
+        """Initialize the argument templates."""
+        self.capabilities = capabilities
+        self.generic_args = {
+            debug: [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "warning" if debug else "quiet",
+                "-ignore_unknown",
+                "-protocol_whitelist",
+                # support nested protocols (e.g. within playlist)
+                "file,http,https,tcp,tls,crypto,pipe,fd",
+            ]
+            for debug in (False, True)
+        }
+        # reconnect options for a direct stream from http
+        self.reconnect_args = ["-reconnect", "1", "-reconnect_streamed", "1"]
+        self.reconnect_args += ["-reconnect_delay_max", "10"]
+        if capabilities.reconnect_on_error:
+            self.reconnect_args += [
+                "-reconnect_on_network_error",
+                "1",
+                "-reconnect_on_http_error",
+                "5xx",
+            ]
+        self._output_args: dict[tuple[str, int, int], list[str]] = {}
+
+    def get_output_args(self, pcm_format: AudioFormat) -> list[str]:
+        """Return the output args to write (pcm) audio of the given format to stdout."""
+        key = (pcm_format.content_type.value, pcm_format.sample_rate, pcm_format.channels)
+        if (output_args := self._output_args.get(key)) is None:
+            output_args = self._output_args[key] = [
+                "-acodec",
+                pcm_format.content_type.name.lower(),
+                "-f",
+                pcm_format.content_type.value,
+                "-ac",
+                str(pcm_format.channels),
+                "-ar",
+                str(pcm_format.sample_rate),
+                "-",
+            ]
+        return output_args
+
+
+_ffmpeg_args: FFMpegArgs | None = None
+
+
+async def probe_capabilities() -> FFMpegCapabilities:
+    """Detect the capabilities of the ffmpeg binary (by running it)."""
+    returncode, output = await check_output("ffmpeg -version")
+    version_info = output.decode(errors="ignore")
+    if returncode != 0 or "FFmpeg" not in version_info:
+        return FFMpegCapabilities()
+    _, http_options = await check_output("ffmpeg -hide_banner -h protocol=http")
+    return FFMpegCapabilities(
+        present=True,
+        version=version_info.split("ffmpeg version ")[1].split(" ")[0].split("-")[0],
+        libsoxr="enable-libsoxr" in version_info,
+        reconnect_on_error="reconnect_on_network_error" in http_options.decode(errors="ignore"),
+    )
+
+
+async def load_ffmpeg_capabilities(mass: MusicAssistant) -> FFMpegCapabilities:
+    """Load the ffmpeg capabilities from the cache db, probe them if the binary changed."""
+    global _ffmpeg_args  # noqa: PLW0603
+    checksum = await asyncio.to_thread(_get_binary_checksum)
+    capabilities = None
+    if checksum and (cache := await mass.cache.get(CACHE_KEY, checksum=checksum)):
+        capabilities = FFMpegCapabilities.from_dict(cache)
+    if capabilities is None:
+        capabilities = await probe_capabilities()
+        LOGGER.debug("Probed ffmpeg capabilities: %s", capabilities)
+        if checksum and capabilities.present:
+            await mass.cache.set(
+                CACHE_KEY, capabilities.to_dict(), checksum=checksum, expiration=86400 * 365
+            )
+    _ffmpeg_args = FFMpegArgs(capabilities)
+    return capabilities
+
+
+async def get_ffmpeg_args() -> FFMpegArgs:
+    """Return the (precomputed) ffmpeg args, probes ffmpeg if the capabilities are not loaded."""
+    global _ffmpeg_args  # noqa: PLW0603
+    if _ffmpeg_args is None:
+        _ffmpeg_args = FFMpegArgs(await probe_capabilities())
+    return _ffmpeg_args
+
+
+def _get_binary_checksum() -> str | None:
+    """Return a checksum (path and modification time) of the ffmpeg binary to detect changes."""
+    if not (ffmpeg_path := shutil.which("ffmpeg")):
+        return None
+    ffmpeg_path = os.path.realpath(ffmpeg_path)
+    return f"{ffmpeg_path}|{os.path.getmtime(ffmpeg_path)}"
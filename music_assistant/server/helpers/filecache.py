@@ -0,0 +1,160 @@
+"""Persistent (on disk) cache of files, limited in total size."""
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import OrderedDict
+from contextlib import suppress
+
+import shortuuid
+
+
+class FileCache:
+    """Persistent (on disk) cache of files, limited in total size.
+
+    The files are stored by their (hashed) key, the least recently used files
+    are removed when the max size is exceeded.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int) -> None:
+        """Initialize (with the max size of all files in bytes)."""
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._size = 0
+        # key --> file size, in order of last access
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        """Return the total size (in bytes) of all cached files."""
+        return self._size
+
+    async def setup(self) -> None:
+        """Load the existing files from disk."""
+
+        def _load() -> list[tuple[float, str, int]]:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for sub_dir in os.scandir(self.cache_dir):
+                if not sub_dir.is_dir():
+                    continue
+                for entry in os.scandir(sub_dir.path):
+                    if entry.name.endswith(".tmp"):
+                        # leftover of an incomplete write
+                        os.remove(entry.path)
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            return sorted(entries)
+
+        for _, key, size in await asyncio.to_thread(_load):
+            self._entries[key] = size
+            self._size += size
+        await self._evict()
+
+    def __contains__(self, key: str) -> bool:
+        """Return if file is in the cache."""
+        return key in self._entries
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the file data for given key (if present)."""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        file_path = self._get_file_path(key)
+
+        def _read() -> bytes | None:
+            try:
+                with open(file_path, "rb") as _file:
+                    data = _file.read()
+            except FileNotFoundError:
+                return None
+            # the modification time is used to restore the LRU order on restart
+            os.utime(file_path)
+            return data
+
+        if (data := await asyncio.to_thread(_read)) is None:
+            self._size -= self._entries.pop(key, 0)
+        return data
+
+    async def get_file_path(self, key: str) -> str | None:
+        """Return the path of the (cached) file for given key (if present).
+
+        Use this to access (large) files directly, instead of reading them in memory.
+        """
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        file_path = self._get_file_path(key)
+        try:
+            # the modification time is used to restore the LRU order on restart
+            await asyncio.to_thread(os.utime, file_path)
+        except FileNotFoundError:
+            self._size -= self._entries.pop(key, 0)
+            return None
+        return file_path
+
+    async def set(self, key: str, data: bytes) -> None:
+        """Store file data for given key."""
+        if len(data) > self.max_size:
+            return
+        temp_file_path = await self.create_temp_file(key)
+
+        def _write() -> None:
+            with open(temp_file_path, "wb") as _file:
+                _file.write(data)
+
+        await asyncio.to_thread(_write)
+        await self.store_file(key, temp_file_path)
+
+    async def create_temp_file(self, key: str) -> str:
+        """Return the path of a (new) temporary file to write the data for given key to.
+
+        Use store_file to add the file to the cache once it is complete,
+        so we never serve a partially written file.
+        """
+        file_path = self._get_file_path(key)
+        await asyncio.to_thread(os.makedirs, os.path.dirname(file_path), exist_ok=True)
+        return f"{file_path}.{shortuuid.uuid()}.tmp"
+
+    async def store_file(self, key: str, temp_file_path: str) -> None:
+        """Add a (complete) temporary file (created with create_temp_file) to the cache."""
+        file_path = self._get_file_path(key)
+
+        def _store() -> int:
+            size = os.path.getsize(temp_file_path)
+            if size > self.max_size:
+                os.remove(temp_file_path)
+            else:
+                os.replace(temp_file_path, file_path)
+            return size
+
+        size = await asyncio.to_thread(_store)
+        if size > self.max_size:
+            return
+        self._size -= self._entries.pop(key, 0)
+        self._entries[key] = size
+        self._size += size
+        await self._evict()
+
+    async def _evict(self) -> None:
+        """Remove the least recently used files until the cache fits its max size."""
+        evicted_keys = []
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            evicted_keys.append(key)
+        if not evicted_keys:
+            return
+
+        def _remove() -> None:
+            for key in evicted_keys:
+                with suppress(FileNotFoundError):
+                    os.remove(self._get_file_path(key))
+
+        await asyncio.to_thread(_remove)
+
+    def _get_file_path(self, key: str) -> str:
+        """Return the file path for given key."""
+        # use subdirectories to prevent a single huge directory
+        return os.path.join(self.cache_dir, key[:2], key)
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import os
 import random
 from io import BytesIO
 from typing import TYPE_CHECKING
@@ -10,12 +12,17 @@ import aiofiles
 from PIL import Image
 
 from music_assistant.common.models.media_items import MediaItemImage
+from music_assistant.server.helpers.filecache import FileCache
 from music_assistant.server.helpers.tags import get_embedded_image
 
 if TYPE_CHECKING:
     from music_assistant.server import MusicAssistant
     from music_assistant.server.models.music_provider import MusicProvider
 
+# supported (output) formats for thumbnails: format --> PIL format name
+THUMBNAIL_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+DEFAULT_THUMBNAIL_QUALITY = 80
+
 
 async def get_image_data(mass: MusicAssistant, path_or_url: str, provider: str = "url") -> bytes:
     """Create thumbnail from image url."""
@@ -32,23 +39,84 @@ async def get_image_data(mass: MusicAssistant, path_or_url: str, provider: str =
     raise FileNotFoundError(f"Image not found: {path_or_url}")
 
 
+async def get_image_checksum(
+    mass: MusicAssistant, path_or_url: str, provider: str = "url"
+) -> str | None:
+    """Return a checksum of the (source) image, used to detect changes of the image.
+
+    Raises FileNotFoundError if the (local) image does not exist (anymore).
+    """
+    if provider != "url" and (prov := mass.get_provider(provider)):
+        prov: MusicProvider
+        return await prov.get_image_checksum(path_or_url)
+    if path_or_url.startswith(("http://", "https://")):
+        # (remote) urls are assumed to be immutable
+        return None
+    stat = await asyncio.to_thread(os.stat, path_or_url)
+    return f"{int(stat.st_mtime)}.{stat.st_size}"
+
+
 async def get_image_thumb(
-    mass: MusicAssistant, path_or_url: str, size: int | None, provider: str = "url"
+    mass: MusicAssistant,
+    path_or_url: str,
+    size: int | None,
+    provider: str = "url",
+    image_format: str = "png",
+    quality: int = DEFAULT_THUMBNAIL_QUALITY,
 ) -> bytes:
-    """Get (optimized) PNG thumbnail from image url."""
+    """Get thumbnail (in png, jpeg or webp format) from image url."""
+    image_format = image_format.lower()
+    if image_format not in THUMBNAIL_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
     img_data = await get_image_data(mass, path_or_url, provider)
 
     def _create_image():
         data = BytesIO()
         img = Image.open(BytesIO(img_data))
         if size:
-            img.thumbnail((size, size), Image.LANCZOS)
-        img.convert("RGB").save(data, "PNG", optimize=True)
+            if img.format == "JPEG":
+                # let the jpeg decoder scale down the image (by a power of 2) while decoding
+                # which is a lot faster than decoding the full image before resizing
+                img.draft("RGB", (size * 2, size * 2))
+            # thumbnail first reduces the image by an integer factor (fast),
+            # the final (lanczos) resize is only performed on the reduced image
+            img.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        img = img.convert("RGB")
+        if image_format == "png":
+            img.save(data, "PNG")
+        else:
+            img.save(data, THUMBNAIL_FORMATS[image_format], quality=quality)
         return data.getvalue()
 
     return await asyncio.to_thread(_create_image)
 
 
+class ThumbnailCache(FileCache):
+    """Persistent (on disk) cache of generated thumbnails, limited in total size.
+
+    The thumbnails are stored by the hash of their key (provider, path, checksum of the
+    source image, size and format), the least recently used thumbnails are removed
+    when the max size is exceeded.
+    """
+
+    @staticmethod
+    def get_key(
+        path: str,
+        provider: str = "url",
+        size: int | None = None,
+        image_format: str = "png",
+        quality: int | None = None,
+        checksum: str | None = None,
+    ) -> str:
+        """Return the (unique) key of a thumbnail."""
+        key = f"{provider}|{path}|{size or 0}"
+        if checksum:
+            key += f"|{checksum}"
+        if image_format != "png":
+            key += f"|{image_format}|{quality}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+
 async def create_collage(mass: MusicAssistant, images: list[MediaItemImage]) -> bytes:
     """Create a basic collage image from multiple image urls."""
 
@@ -0,0 +1,240 @@
+"""Helpers to process raw (interleaved, little endian) PCM audio in-process using NumPy."""
+from __future__ import annotations
+
+import numpy as np
+
+# supported (integer) PCM bit depths
+PCM_INT_BIT_DEPTHS = (16, 24, 32)
+# audio with a RMS level below this threshold (-34 dBFS) is considered silence
+SILENCE_THRESHOLD = 0.02
+# size of the windows (in seconds) used for silence detection
+SILENCE_WINDOW = 0.01
+# ITU-R BS.1770 loudness: 400ms gating blocks with 75% overlap (4 segments of 100ms)
+LOUDNESS_SEGMENT = 0.1
+LOUDNESS_SEGMENTS_PER_BLOCK = 4
+LOUDNESS_ABSOLUTE_GATE = -70.0
+LOUDNESS_RELATIVE_GATE = -10.0
+
+
+def pcm_to_array(
+    data: bytes | memoryview, bit_depth: int, floating_point: bool = False, channels: int = 2
+) -> np.ndarray:
+    """Convert PCM audio to a (frames, channels) array of (float64) samples in range -1..1.
+
+    Raises ValueError for unsupported sample formats.
+    """
+    _check_format(bit_depth, floating_point)
+    frame_size = bit_depth // 8 * channels
+    # ignore any trailing incomplete frame
+    data = memoryview(data)[: len(data) - len(data) % frame_size]
+    if floating_point:
+        samples = np.frombuffer(data, dtype="<f4").astype(np.float64)
+    elif bit_depth == 24:
+        # numpy has no 24 bits type: combine the 3 bytes into an int32 and sign extend it
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8
+        samples = samples / (1 << 23)
+    else:
+        samples = np.frombuffer(data, dtype=f"<i{bit_depth // 8}") / (1 << (bit_depth - 1))
+    return samples.reshape(-1, channels)
+
+
+def array_to_pcm(samples: np.ndarray, bit_depth: int, floating_point: bool = False) -> bytes:
+    """Convert an array of (float) samples in range -1..1 to (interleaved) PCM audio."""
+    _check_format(bit_depth, floating_point)
+    if floating_point:
+        return samples.astype("<f4").tobytes()
+    max_value = 1 << (bit_depth - 1)
+    samples = np.clip(np.rint(samples * max_value), -max_value, max_value - 1)
+    if bit_depth == 24:
+        # drop the most significant byte of the (little endian) int32 values
+        return samples.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return samples.astype(f"<i{bit_depth // 8}").tobytes()
+
+
+def crossfade(
+    fade_in_part: bytes | memoryview,
+    fade_out_part: bytes | memoryview,
+    bit_depth: int,
+    floating_point: bool = False,
+    curve: str = "linear",
+    channels: int = 2,
+) -> bytes:
+    """Crossfade two chunks of PCM audio (same semantics as the ffmpeg acrossfade filter).
+
+    The length of the crossfade is the length of the smallest chunk, any remaining audio
+    of the fade out part is prepended and of the fade in part is appended to the result.
+    Curve can be linear or equal_power.
+    Raises ValueError for unsupported sample formats.
+    """
+    frame_size = bit_depth // 8 * channels
+    fade_size = min(len(fade_in_part), len(fade_out_part)) // frame_size * frame_size
+    fade_out_view = memoryview(fade_out_part)
+    fade_in_view = memoryview(fade_in_part)
+    fade_out = pcm_to_array(
+        fade_out_view[len(fade_out_view) - fade_size :], bit_depth, floating_point, channels
+    )
+    fade_in = pcm_to_array(fade_in_view[:fade_size], bit_depth, floating_point, channels)
+    # gain (per frame) for the fade in part, the fade out part gets the inverse
+    position = np.arange(len(fade_in)) / max(len(fade_in), 1)
+    if curve == "equal_power":
+        fade_in_gain = np.sin(position * np.pi / 2)
+        fade_out_gain = np.cos(position * np.pi / 2)
+    elif curve == "linear":
+        fade_in_gain = position
+        fade_out_gain = 1 - position
+    else:
+        raise ValueError(f"Unsupported crossfade curve: {curve}")
+    crossfaded = fade_out * fade_out_gain[:, None] + fade_in * fade_in_gain[:, None]
+    return b"".join(
+        (
+            fade_out_view[: len(fade_out_view) - fade_size],
+            array_to_pcm(crossfaded, bit_depth, floating_point),
+            fade_in_view[fade_size:],
+        )
+    )
+
+
+def get_rms(samples: np.ndarray, window_size: int) -> np.ndarray:
+    """Return the RMS level (of all channels combined) per window of window_size frames."""
+    if not len(samples):
+        return np.zeros(0)
+    power = np.square(samples).mean(axis=1)
+    window_starts = np.arange(0, len(power), window_size)
+    window_lengths = np.diff(np.append(window_starts, len(power)))
+    return np.sqrt(np.add.reduceat(power, window_starts) / window_lengths)
+
+
+def get_audio_bounds(
+    data: bytes | memoryview,
+    bit_depth: int,
+    sample_rate: int,
+    floating_point: bool = False,
+    channels: int = 2,
+    threshold: float = SILENCE_THRESHOLD,
+) -> tuple[int, int] | None:
+    """Return the (byte) offsets of the start and end of the audio within a chunk of PCM audio.
+
+    Any silence before the start or after the end offset may be stripped from the chunk,
+    returns None if the whole chunk is silence.
+    Raises ValueError for unsupported sample formats.
+    """
+    samples = pcm_to_array(data, bit_depth, floating_point, channels)
+    window_size = max(int(sample_rate * SILENCE_WINDOW), 1)
+    audio_windows = np.flatnonzero(get_rms(samples, window_size) >= threshold)
+    if not len(audio_windows):
+        return None
+    frame_size = bit_depth // 8 * channels
+    start = int(audio_windows[0]) * window_size * frame_size
+    end = min((int(audio_windows[-1]) + 1) * window_size * frame_size, len(data))
+    return (start, end)
+
+
+class LoudnessMeter:
+    """Incremental (gated) ITU-R BS.1770 / EBU R128 integrated loudness meter for PCM audio.
+
+    The K-weighting filter is applied in the frequency domain on (independent) segments
+    of 100ms, which is a close approximation of the (IIR) filter of the specification.
+    Only (stereo) channels with equal weights are supported (which is what we stream).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        bit_depth: int,
+        floating_point: bool = False,
+        channels: int = 2,
+    ) -> None:
+        """Initialize meter, raises ValueError for unsupported sample formats."""
+        _check_format(bit_depth, floating_point)
+        self.sample_rate = sample_rate
+        self.bit_depth = bit_depth
+        self.floating_point = floating_point
+        self.channels = channels
+        self._segment_size = int(sample_rate * LOUDNESS_SEGMENT)
+        self._segment_bytes = self._segment_size * bit_depth // 8 * channels
+        self._weights = _get_k_weighting(sample_rate, self._segment_size)
+        # pcm data that does not yet fill a complete segment
+        self._pending = b""
+        # mean square of the (K-weighted) audio per segment (summed over channels)
+        self._segment_powers: list[float] = []
+
+    @property
+    def duration(self) -> float:
+        """Return the duration (in seconds) of the audio measured so far."""
+        return len(self._segment_powers) * LOUDNESS_SEGMENT
+
+    @property
+    def integrated_loudness(self) -> float | None:
+        """Return the integrated loudness (in LUFS) of the audio measured so far.
+
+        Returns None if there is not enough audio or if the audio is silence.
+        """
+        if len(self._segment_powers) < LOUDNESS_SEGMENTS_PER_BLOCK:
+            return None
+        block_powers = np.convolve(
+            self._segment_powers,
+            np.full(LOUDNESS_SEGMENTS_PER_BLOCK, 1 / LOUDNESS_SEGMENTS_PER_BLOCK),
+            mode="valid",
+        )
+        with np.errstate(divide="ignore"):
+            block_loudness = -0.691 + 10 * np.log10(block_powers)
+        gated = block_loudness > LOUDNESS_ABSOLUTE_GATE
+        if not gated.any():
+            return None
+        relative_gate = -0.691 + 10 * np.log10(block_powers[gated].mean())
+        gated &= block_loudness > relative_gate + LOUDNESS_RELATIVE_GATE
+        return round(float(-0.691 + 10 * np.log10(block_powers[gated].mean())), 2)
+
+    def update(self, data: bytes | memoryview) -> None:
+        """Feed a chunk of PCM audio to the meter."""
+        data = self._pending + bytes(data)
+        num_segments = len(data) // self._segment_bytes
+        self._pending = data[num_segments * self._segment_bytes :]
+        if not num_segments:
+            return
+        samples = pcm_to_array(
+            memoryview(data)[: num_segments * self._segment_bytes],
+            self.bit_depth,
+            self.floating_point,
+            self.channels,
+        )
+        spectrum = np.fft.rfft(samples.reshape(num_segments, self._segment_size, -1), axis=1)
+        powers = (np.square(np.abs(spectrum)) * self._weights[None, :, None]).sum(axis=(1, 2))
+        self._segment_powers.extend(powers.tolist())
+
+
+def _get_k_weighting(sample_rate: int, size: int) -> np.ndarray:
+    """Return the weights to get the mean square of the K-weighted signal from a (r)fft.
+
+    The weights are the squared magnitude response of the K-weighting filter (a high shelf
+    and a high pass biquad, designed like libebur128 does for any sample rate) per bin,
+    scaled to get the mean square (Parseval) from the rfft of a segment of given size.
+    """
+    z = np.exp(-2j * np.pi * np.fft.rfftfreq(size, 1 / sample_rate) / sample_rate)
+    # stage 1: high shelf (head effects)
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh**0.4996667741545416
+    response = (
+        vh + vb * k / q + k * k + 2 * (k * k - vh) * z + (vh - vb * k / q + k * k) * z**2
+    ) / (1 + k / q + k * k + 2 * (k * k - 1) * z + (1 - k / q + k * k) * z**2)
+    # stage 2: high pass (RLB weighting)
+    k = np.tan(np.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    response *= ((1 - 2 * z + z**2) * (1 + k / q + k * k)) / (
+        1 + k / q + k * k + 2 * (k * k - 1) * z + (1 - k / q + k * k) * z**2
+    )
+    weights = np.square(np.abs(response))
+    # the (positive) frequency bins of the rfft represent the negative frequencies too
+    weights[1 : (size + 1) // 2] *= 2
+    return weights / (size * size)
+
+
+def _check_format(bit_depth: int, floating_point: bool) -> None:
+    """Raise ValueError if the sample format is not supported."""
+    if floating_point and bit_depth != 32:
+        raise ValueError(f"Unsupported floating point bit depth: {bit_depth}")
+    if not floating_point and bit_depth not in PCM_INT_BIT_DEPTHS:
+        raise ValueError(f"Unsupported bit depth: {bit_depth}")
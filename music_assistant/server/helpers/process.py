@@ -6,6 +6,7 @@ even when properly handling reading/writes from different tasks.
 from __future__ import annotations
 
 import asyncio
+import fcntl
 import logging
 from collections.abc import AsyncGenerator, Coroutine
 from contextlib import suppress
@@ -26,13 +27,18 @@ class AsyncProcess:
         enable_stdin: bool = False,
         enable_stdout: bool = True,
         enable_stderr: bool = False,
+        pipe_size: int | None = None,
     ):
-        """Initialize."""
+        """Initialize.
+
+        The (kernel) buffer size of the stdin/stdout pipes can be set with pipe_size (Linux only).
+        """
         self._proc = None
         self._args = args
         self._enable_stdin = enable_stdin
         self._enable_stdout = enable_stdout
         self._enable_stderr = enable_stderr
+        self._pipe_size = pipe_size
         self._attached_task: asyncio.Task = None
         self.closed = False
 
@@ -45,6 +51,8 @@ class AsyncProcess:
             stderr=asyncio.subprocess.PIPE if self._enable_stderr else None,
             close_fds=True,
         )
+        if self._pipe_size:
+            self._set_pipe_size(self._pipe_size)
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
@@ -133,6 +141,20 @@ class AsyncProcess:
         self._attached_task = task = asyncio.create_task(coro)
         return task
 
+    def _set_pipe_size(self, pipe_size: int) -> None:
+        """Set the (kernel) buffer size of the stdin and stdout pipes."""
+        if not hasattr(fcntl, "F_SETPIPE_SZ"):
+            # only supported on Linux
+            return
+        for fd in (0, 1):
+            if not (pipe_transport := self._proc._transport.get_pipe_transport(fd)):
+                continue
+            try:
+                fcntl.fcntl(pipe_transport.get_extra_info("pipe"), fcntl.F_SETPIPE_SZ, pipe_size)
+            except OSError as err:
+                # e.g. larger than the max pipe size of the system
+                LOGGER.debug("Unable to set pipe size to %s: %s", pipe_size, str(err))
+
 
 async def check_output(shell_cmd: str) -> tuple[int, bytes]:
     """Run shell subprocess and return output."""
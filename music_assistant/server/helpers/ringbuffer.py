@@ -0,0 +1,143 @@
+"""Ring buffer to fan out a stream of (audio) chunks to multiple readers.
+
+All readers share the same (bounded) buffer of chunks, each reader has its own read
+position and receives (zero copy) memoryview slices of the buffered chunks.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, Callable
+
+
+class RingBufferReader:
+    """Reader (with its own read position) of a RingBuffer."""
+
+    def __init__(self, ring_buffer: RingBuffer, position: int, backpressure: bool) -> None:
+        """Initialize reader, use RingBuffer.add_reader to create a reader."""
+        self.ring_buffer = ring_buffer
+        # (absolute) position in the stream of the next byte to read
+        self.position = position
+        # if the writer should wait for this reader if it falls behind (instead of skipping data)
+        self.backpressure = backpressure
+        # number of bytes this reader missed because it fell behind (without backpressure)
+        self.bytes_skipped = 0
+
+    @property
+    def lag(self) -> int:
+        """Return the number of bytes written to the buffer that this reader did not yet read."""
+        return self.ring_buffer.bytes_written - self.position
+
+    async def read(self) -> memoryview | None:
+        """Return the next (part of a) chunk from the buffer.
+
+        Returns None if the buffer is closed (and all data is read) or the reader is removed.
+        """
+        await self.ring_buffer._wait_for(
+            lambda: self.lag > 0 or self.ring_buffer.closed or self not in self.ring_buffer.readers
+        )
+        if self not in self.ring_buffer.readers:
+            return None
+        chunk = self.ring_buffer._get_chunk(self)
+        # wake up the writer that may be waiting for this reader
+        self.ring_buffer._notify()
+        return chunk
+
+    async def iter_chunks(self) -> AsyncGenerator[memoryview, None]:
+        """Iterate all chunks from the buffer until it is closed (or the reader is removed)."""
+        try:
+            while (chunk := await self.read()) is not None:
+                yield chunk
+        finally:
+            self.ring_buffer.remove_reader(self)
+
+
+class RingBuffer:
+    """Buffer that fans out chunks to multiple readers without copying the data.
+
+    The writer only waits (backpressure) for readers that have backpressure enabled and
+    would otherwise lose data, other readers that fall behind more than max_size bytes
+    skip the data that is no longer in the buffer.
+    The buffer keeps (at least) max_size bytes of history so (late joining) readers
+    can start reading at a recent position in the stream.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize buffer with the (approximate) max size in bytes of the buffered chunks."""
+        self.max_size = max_size
+        # total number of bytes written to the buffer
+        self.bytes_written = 0
+        self.closed = False
+        self.readers: set[RingBufferReader] = set()
+        # buffered chunks together with their (absolute) start position in the stream
+        self._chunks: deque[tuple[int, bytes]] = deque()
+        self._buffered_size = 0
+        # event that is set (and replaced) on every change of the buffer or its readers
+        self._changed = asyncio.Event()
+
+    @property
+    def start_position(self) -> int:
+        """Return the (absolute) position of the oldest byte that is still in the buffer."""
+        return self.bytes_written - self._buffered_size
+
+    def add_reader(self, rewind: int = 0, backpressure: bool = True) -> RingBufferReader:
+        """Add a reader that starts reading at the current position minus rewind bytes."""
+        position = max(self.bytes_written - rewind, self.start_position)
+        reader = RingBufferReader(self, position, backpressure)
+        self.readers.add(reader)
+        return reader
+
+    def remove_reader(self, reader: RingBufferReader) -> None:
+        """Remove a reader from the buffer."""
+        if reader in self.readers:
+            self.readers.remove(reader)
+            self._notify()
+
+    async def put(self, chunk: bytes) -> None:
+        """Write a chunk to the buffer, waits for (slow) readers that have backpressure enabled."""
+        if not chunk:
+            return
+        max_lag = max(self.max_size, len(chunk)) - len(chunk)
+        await self._wait_for(
+            lambda: self.closed or all(x.lag <= max_lag for x in self.readers if x.backpressure)
+        )
+        if self.closed:
+            return
+        self._chunks.append((self.bytes_written, chunk))
+        self._buffered_size += len(chunk)
+        self.bytes_written += len(chunk)
+        # drop the oldest chunk(s) but always keep at least max_size bytes of history
+        while self._buffered_size - len(self._chunks[0][1]) >= self.max_size:
+            self._buffered_size -= len(self._chunks.popleft()[1])
+        self._notify()
+
+    def close(self) -> None:
+        """Close the buffer (EOF), readers receive the remaining buffered data first."""
+        self.closed = True
+        self._notify()
+
+    def _get_chunk(self, reader: RingBufferReader) -> memoryview | None:
+        """Return the next (part of a) chunk for the given reader and advance its position."""
+        if reader.lag <= 0:
+            return None
+        if reader.position < self.start_position:
+            # the reader fell behind and missed some data
+            reader.bytes_skipped += self.start_position - reader.position
+            reader.position = self.start_position
+        # the reader is usually near the end of the buffer, so search from there
+        for start, chunk in reversed(self._chunks):
+            if start <= reader.position:
+                data = memoryview(chunk)[reader.position - start :]
+                reader.position = start + len(chunk)
+                return data
+        return None  # pragma: no cover
+
+    def _notify(self) -> None:
+        """Wake up all waiting readers and writer."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait_for(self, predicate: Callable[[], bool]) -> None:
+        """Wait until the predicate (re-evaluated on every change of the buffer) is True."""
+        while not predicate():
+            await self._changed.wait()
@@ -0,0 +1,398 @@
+"""Seek index for (exact) byte range seeking in compressed audio files.
+
+Seeking in a compressed (VBR) file by estimating the byte offset from the (average)
+bitrate is inaccurate and may start in the middle of a frame. The seek index contains
+the byte offsets of the (audio) frames at a fixed time interval, which is built once
+(by parsing the frame headers of the whole file) and stored in the library database.
+Supported are MP3 and AAC (ADTS) files and FLAC files (using the seektable if it is
+dense enough, otherwise by parsing the frame headers).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import struct
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from mashumaro import DataClassDictMixin
+
+from music_assistant.common.models.enums import ContentType
+from music_assistant.constants import ROOT_LOGGER_NAME
+
+if TYPE_CHECKING:
+    from music_assistant.common.models.media_items import StreamDetails
+    from music_assistant.server import MusicAssistant
+
+LOGGER = logging.getLogger(f"{ROOT_LOGGER_NAME}.seek_index")
+
+SEEK_INDEX_CONTENT_TYPES = (ContentType.MP3, ContentType.AAC, ContentType.FLAC)
+# time (in seconds) between the points of the seek index
+SEEK_INDEX_INTERVAL = 1.0
+# only use a seek index for long files (e.g. audiobooks, dj mixes),
+# the inaccuracy of estimating the seek position is acceptable for short tracks
+SEEK_INDEX_MIN_DURATION = 600
+
+# bitrates (kbps) per MPEG version (1 or 2/2.5) and layer (1-3)
+MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# sample rates per MPEG version bits
+MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+AAC_SAMPLE_RATES = (
+    96000,
+    88200,
+    64000,
+    48000,
+    44100,
+    32000,
+    24000,
+    22050,
+    16000,
+    12000,
+    11025,
+    8000,
+    7350,
+)
+FLAC_FRAME_SYNC = re.compile(b"\xff[\xf8\xf9]")
+# max size of a flac frame header (including the crc)
+FLAC_MAX_HEADER_SIZE = 16
+
+
+@dataclass
+class SeekIndex(DataClassDictMixin):
+    """Byte offsets of the audio frames in a file at a fixed time interval."""
+
+    # checksum of the file the index was built for (e.g. modification time or size)
+    checksum: str
+    interval: float = SEEK_INDEX_INTERVAL
+    # byte offset of the (last) frame that starts at or before each point in time
+    offsets: list[int] = field(default_factory=list)
+    # data (e.g. the flac stream header) that must be prepended when starting at an offset
+    header: bytes = b""
+
+    def get_offset(self, position: float) -> int:
+        """Return the byte offset to start reading at to seek to the given position."""
+        if not self.offsets:
+            return 0
+        return self.offsets[min(int(position / self.interval), len(self.offsets) - 1)]
+
+
+class SeekIndexBuilder:
+    """Incremental builder of a seek index from the (chunked) contents of a file."""
+
+    def __init__(self, content_type: ContentType, checksum: str) -> None:
+        """Initialize builder, raises ValueError for unsupported content types."""
+        if content_type not in SEEK_INDEX_CONTENT_TYPES:
+            raise ValueError(f"Unsupported content type for seek index: {content_type}")
+        self.content_type = content_type
+        self.seek_index = SeekIndex(checksum=checksum)
+        self._buffer = bytearray()
+        # (absolute) position in the file of the start of the buffer
+        self._buffer_start = 0
+        # (absolute) position in the file where parsing continues
+        self._position = 0
+        # start time and position of the last frame found
+        self._last_frame: tuple[float, int] | None = None
+        # start time of the next (mpeg) frame
+        self._time = 0.0
+        self._header_parsed = False
+        self._done = False
+        # flac stream info and seektable
+        self._sample_rate = 0
+        self._block_size = 0
+        self._seektable: list[tuple[float, int]] = []
+
+    def update(self, chunk: bytes) -> None:
+        """Feed a chunk of the file to the builder."""
+        if self._done:
+            return
+        self._buffer += chunk
+        self._parse(eof=False)
+
+    def finish(self) -> SeekIndex | None:
+        """Finish building (all data is fed), returns None if no frames were found."""
+        if not self._done:
+            self._parse(eof=True)
+        if self._last_frame is not None:
+            last_time, last_position = self._last_frame
+            while len(self.seek_index.offsets) * self.seek_index.interval <= last_time:
+                self.seek_index.offsets.append(last_position)
+        self._done = True
+        self._buffer = bytearray()
+        return self.seek_index if self.seek_index.offsets else None
+
+    def _add_frame(self, time: float, position: int) -> None:
+        """Add a frame (with its start time and position) to the index."""
+        while self._last_frame is not None and (
+            len(self.seek_index.offsets) * self.seek_index.interval < time
+        ):
+            self.seek_index.offsets.append(self._last_frame[1])
+        self._last_frame = (time, position)
+
+    def _parse(self, eof: bool) -> None:
+        """Parse the buffered data."""
+        if not self._header_parsed:
+            self._parse_header(eof)
+        if self._header_parsed and not self._done:
+            if self.content_type == ContentType.FLAC:
+                self._parse_flac_frames(eof)
+            else:
+                self._parse_mpeg_frames()
+        # drop the data that is parsed
+        parsed = min(self._position - self._buffer_start, len(self._buffer))
+        del self._buffer[:parsed]
+        self._buffer_start += parsed
+
+    def _parse_header(self, eof: bool) -> None:
+        """Parse (skip) the header of the file (ID3 tag or flac metadata)."""
+        buffer = self._buffer
+        if self.content_type != ContentType.FLAC:
+            if len(buffer) < 10 and not eof:
+                return
+            if buffer[:3] == b"ID3" and len(buffer) >= 10:
+                # skip the ID3v2 tag (synchsafe size, optional footer)
+                size = (buffer[6] << 21) | (buffer[7] << 14) | (buffer[8] << 7) | buffer[9]
+                self._position = 10 + size + (10 if buffer[5] & 0x10 else 0)
+            self._header_parsed = True
+            return
+        # flac: "fLaC" marker followed by the metadata blocks
+        if self._position == 0:
+            if len(buffer) < 4:
+                if eof:
+                    self._done = True
+                return
+            if buffer[:4] != b"fLaC":
+                self._done = True
+                return
+            self._position = 4
+        while True:
+            offset = self._position - self._buffer_start
+            if offset + 4 > len(buffer):
+                if eof:
+                    self._done = True
+                return
+            is_last = buffer[offset] & 0x80
+            block_type = buffer[offset] & 0x7F
+            block_size = int.from_bytes(buffer[offset + 1 : offset + 4], "big")
+            if block_type in (0, 3) and offset + 4 + block_size > len(buffer):
+                # we need the whole stream info/seektable block
+                if eof:
+                    self._done = True
+                return
+            block = buffer[offset + 4 : offset + 4 + block_size]
+            if block_type == 0:
+                self._parse_flac_stream_info(buffer[offset : offset + 4 + block_size])
+            elif block_type == 3:
+                self._parse_flac_seektable(block)
+            self._position += 4 + block_size
+            if is_last:
+                break
+        self._header_parsed = True
+        if self._seektable:
+            # the seektable offsets are relative to the first frame
+            for time, offset in self._seektable:
+                self._add_frame(time, self._position + offset)
+            self._done = True
+
+    def _parse_flac_stream_info(self, block: bytes) -> None:
+        """Parse the flac stream info block (including its block header)."""
+        min_block_size, max_block_size = struct.unpack(">HH", block[4:8])
+        self._block_size = min_block_size if min_block_size == max_block_size else 0
+        self._sample_rate = (block[14] << 12) | (block[15] << 4) | (block[16] >> 4)
+        # the header to prepend when starting at a frame: the stream info as the last block
+        self.seek_index.header = b"fLaC" + bytes([0x80]) + bytes(block[1:])
+
+    def _parse_flac_seektable(self, block: bytes) -> None:
+        """Use the flac seektable as index if its points are close enough together."""
+        if not self._sample_rate:
+            return
+        points = []
+        for index in range(len(block) // 18):
+            sample, offset, _ = struct.unpack(">QQH", block[index * 18 : index * 18 + 18])
+            if sample == 0xFFFFFFFFFFFFFFFF:
+                # placeholder point
+                continue
+            points.append((sample / self._sample_rate, offset))
+        if len(points) >= 2 and all(
+            points[i + 1][0] - points[i][0] <= self.seek_index.interval
+            for i in range(len(points) - 1)
+        ):
+            self._seektable = points
+        # otherwise the seektable is (too) sparse and the frames are parsed instead
+
+    def _parse_mpeg_frames(self) -> None:
+        """Parse the headers of the MP3 or AAC (ADTS) frames in the buffer."""
+        buffer = self._buffer
+        parse_header = (
+            _parse_mp3_frame_header
+            if self.content_type == ContentType.MP3
+            else _parse_adts_frame_header
+        )
+        while True:
+            offset = self._position - self._buffer_start
+            if offset + 7 > len(buffer):
+                return
+            if frame_info := parse_header(buffer, offset):
+                frame_size, samples, sample_rate = frame_info
+                self._add_frame(self._time, self._position)
+                self._time += samples / sample_rate
+                self._position += frame_size
+                continue
+            # lost sync (e.g. garbage or a trailing tag), search the next frame
+            next_sync = buffer.find(b"\xff", offset + 1)
+            if next_sync == -1:
+                self._position = self._buffer_start + len(buffer)
+                return
+            self._position = self._buffer_start + next_sync
+
+    def _parse_flac_frames(self, eof: bool) -> None:
+        """Parse the headers of the flac frames in the buffer."""
+        buffer = self._buffer
+        while True:
+            offset = self._position - self._buffer_start
+            if not (match := FLAC_FRAME_SYNC.search(buffer, offset)):
+                # keep the last byte, it may be the start of a sync code
+                self._position = self._buffer_start + max(len(buffer) - 1, offset)
+                return
+            offset = match.start()
+            self._position = self._buffer_start + offset
+            if offset + FLAC_MAX_HEADER_SIZE > len(buffer) and not eof:
+                return
+            if (sample := self._parse_flac_frame_header(buffer, offset)) is not None:
+                self._add_frame(sample / self._sample_rate, self._position)
+            self._position += 2
+
+    def _parse_flac_frame_header(self, buffer: bytearray, offset: int) -> int | None:
+        """Return the (first) sample number of the flac frame at offset, None if invalid."""
+        header = buffer[offset : offset + FLAC_MAX_HEADER_SIZE]
+        if len(header) < 6 or header[3] & 0x01 or not self._sample_rate:
+            return None
+        block_size_bits = header[2] >> 4
+        sample_rate_bits = header[2] & 0x0F
+        if block_size_bits == 0 or sample_rate_bits == 15:
+            return None
+        # utf-8 like coded frame number (fixed block size) or sample number (variable)
+        first = header[4]
+        num_bytes = 1
+        while num_bytes < 8 and first & (0x80 >> (num_bytes - 1)):
+            num_bytes += 1
+        num_bytes = max(num_bytes - 1, 1)
+        if first & 0x80 and num_bytes == 1:
+            # continuation byte at the start
+            return None
+        number = first & (0xFF >> (num_bytes + 1)) if num_bytes > 1 else first
+        end = 4 + num_bytes
+        if end > len(header):
+            return None
+        for byte in header[5:end]:
+            if byte & 0xC0 != 0x80:
+                return None
+            number = (number << 6) | (byte & 0x3F)
+        # optional block size and sample rate at the end of the header
+        end += {6: 1, 7: 2}.get(block_size_bits, 0)
+        end += {12: 1, 13: 2, 14: 2}.get(sample_rate_bits, 0)
+        if end >= len(header) or _crc8(header[:end]) != header[end]:
+            return None
+        if header[1] & 0x01:
+            # variable block size: the number is the sample number
+            return number
+        if not self._block_size:
+            return None
+        return number * self._block_size
+
+
+async def build_seek_index(
+    content_type: ContentType, checksum: str, chunks: AsyncGenerator[bytes, None]
+) -> SeekIndex | None:
+    """Build the seek index from the (chunked) contents of a file."""
+    builder = SeekIndexBuilder(content_type, checksum)
+    async for chunk in chunks:
+        await asyncio.to_thread(builder.update, chunk)
+    return builder.finish()
+
+
+async def get_seek_index(
+    mass: MusicAssistant,
+    streamdetails: StreamDetails,
+    checksum: str,
+    read_file: Callable[[], AsyncGenerator[bytes, None]],
+) -> SeekIndex | None:
+    """Return the seek index of a (long) file from the database.
+
+    If the index does not exist (or the file changed), it is built in the background
+    (using read_file to read the contents of the file) and None is returned.
+    """
+    content_type = streamdetails.audio_format.content_type
+    if content_type not in SEEK_INDEX_CONTENT_TYPES:
+        return None
+    if (streamdetails.duration or 0) < SEEK_INDEX_MIN_DURATION:
+        return None
+    item_id, provider = streamdetails.item_id, streamdetails.provider
+    seek_index = await mass.music.get_seek_index(item_id, provider)
+    if seek_index and seek_index.checksum == checksum:
+        return seek_index
+
+    async def _build() -> None:
+        seek_index = await build_seek_index(content_type, checksum, read_file())
+        if seek_index is None:
+            LOGGER.debug("Unable to build seek index for %s", streamdetails.uri)
+            return
+        await mass.music.set_seek_index(item_id, provider, seek_index)
+        LOGGER.debug("Built seek index for %s", streamdetails.uri)
+
+    mass.create_task(_build, task_id=f"seek_index_{provider}_{item_id}")
+    return None
+
+
+def _parse_mp3_frame_header(buffer: bytearray, offset: int) -> tuple[int, int, int] | None:
+    """Return the frame size, number of samples and sample rate of the MP3 frame at offset."""
+    if buffer[offset] != 0xFF or buffer[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version_bits = (buffer[offset + 1] >> 3) & 0x03
+    layer = 4 - ((buffer[offset + 1] >> 1) & 0x03)
+    bitrate_index = buffer[offset + 2] >> 4
+    sample_rate_index = (buffer[offset + 2] >> 2) & 0x03
+    padding = (buffer[offset + 2] >> 1) & 0x01
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    version = 1 if version_bits == 3 else 2
+    bitrate = MP3_BITRATES[(version, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+    if layer == 1:
+        return ((12 * bitrate // sample_rate + padding) * 4, 384, sample_rate)
+    samples = 576 if layer == 3 and version == 2 else 1152
+    return (samples // 8 * bitrate // sample_rate + padding, samples, sample_rate)
+
+
+def _parse_adts_frame_header(buffer: bytearray, offset: int) -> tuple[int, int, int] | None:
+    """Return the frame size, number of samples and sample rate of the ADTS frame at offset."""
+    if buffer[offset] != 0xFF or buffer[offset + 1] & 0xF6 != 0xF0:
+        return None
+    sample_rate_index = (buffer[offset + 2] >> 2) & 0x0F
+    if sample_rate_index >= len(AAC_SAMPLE_RATES):
+        return None
+    frame_size = (
+        ((buffer[offset + 3] & 0x03) << 11) | (buffer[offset + 4] << 3) | (buffer[offset + 5] >> 5)
+    )
+    if frame_size < 7:
+        return None
+    samples = ((buffer[offset + 6] & 0x03) + 1) * 1024
+    return (frame_size, samples, AAC_SAMPLE_RATES[sample_rate_index])
+
+
+def _crc8(data: bytes) -> int:
+    """Return the CRC-8 (polynomial 0x07) of the data, as used in flac frame headers."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
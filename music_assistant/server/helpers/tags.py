@@ -1,6 +1,12 @@
-"""Helpers/utilities to parse ID3 tags from audio files with ffmpeg."""
+"""Helpers/utilities to parse ID3 tags from audio files.
+
+The tags of (local) files in the common formats are parsed in-process with mutagen,
+ffprobe/ffmpeg is used for all other formats and (remote) urls/streams.
+"""
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
 import logging
 import os
@@ -9,6 +15,9 @@ from dataclasses import dataclass
 from json import JSONDecodeError
 from typing import Any
 
+import mutagen
+from mutagen.flac import Picture
+
 from music_assistant.common.helpers.util import try_parse_int
 from music_assistant.common.models.enums import AlbumType
 from music_assistant.common.models.errors import InvalidDataError
@@ -24,6 +33,67 @@ LOGGER = logging.getLogger(ROOT_LOGGER_NAME).getChild("tags")
 # artists actually containing a slash in the name, such as ACDC
 TAG_SPLITTER = ";"
 
+# file extensions of which the tags are parsed in-process (with mutagen),
+# m4b (audiobook) files are left to ffprobe because we need the chapters
+NATIVE_TAG_EXTENSIONS = ("mp3", "flac", "m4a", "mp4", "ogg", "opus")
+# ffprobe format name for the (mutagen) file types
+NATIVE_FORMAT_NAMES = {
+    "MP3": "mp3",
+    "FLAC": "flac",
+    "MP4": "mov,mp4,m4a,3gp,3g2,mj2",
+    "OggVorbis": "ogg",
+    "OggOpus": "ogg",
+    "OggFLAC": "ogg",
+}
+# mapping of the (native) tag names to the tag names reported by ffprobe
+ID3_TAG_NAMES = {
+    "TALB": "album",
+    "TCMP": "compilation",
+    "TCOM": "composer",
+    "TCON": "genre",
+    "TCOP": "copyright",
+    "TDRC": "date",
+    "TDRL": "date",
+    "TENC": "encoded_by",
+    "TIT1": "grouping",
+    "TIT2": "title",
+    "TLAN": "language",
+    "TPE1": "artist",
+    "TPE2": "album_artist",
+    "TPE3": "performer",
+    "TPOS": "disc",
+    "TPUB": "publisher",
+    "TRCK": "track",
+    "TSOA": "album-sort",
+    "TSOP": "artist-sort",
+    "TSOT": "title-sort",
+    "TSSE": "encoder",
+    "TYER": "date",
+}
+VORBIS_TAG_NAMES = {
+    "albumartist": "album_artist",
+    "description": "comment",
+    "discnumber": "disc",
+    "tracknumber": "track",
+}
+MP4_TAG_NAMES = {
+    "aART": "album_artist",
+    "cpil": "compilation",
+    "desc": "description",
+    "disk": "disc",
+    "trkn": "track",
+    "©alb": "album",
+    "©ART": "artist",
+    "©cmt": "comment",
+    "©day": "date",
+    "©gen": "genre",
+    "©grp": "grouping",
+    "©nam": "title",
+    "©too": "encoder",
+    "©wrt": "composer",
+}
+MP4_FREEFORM_PREFIX = "----:com.apple.iTunes:"
+
 
 def split_items(org_str: str, split_slash: bool = False) -> tuple[str, ...]:
     """Split up a tags string by common splitter."""
@@ -290,6 +360,60 @@ async def parse_tags(
 ) -> AudioTags:
     """Parse tags from a media file.
 
+    input_file may be a (local) filename/url accessible by ffmpeg or
+    an AsyncGenerator which yields the file contents as bytes.
+    """
+    if _is_native_file(input_file):
+        try:
+            tags = await asyncio.to_thread(parse_tags_native, input_file)
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("Unable to parse tags of %s in-process: %s", input_file, str(err))
+        else:
+            if not tags.duration and file_size and tags.bit_rate:
+                # estimate duration from filesize/bitrate
+                tags.duration = int((file_size * 8) / tags.bit_rate)
+            return tags
+    return await parse_tags_ffprobe(input_file, file_size)
+
+
+def parse_tags_native(file_path: str) -> AudioTags:
+    """Parse tags from a (local) media file in-process with mutagen (blocking IO).
+
+    The (raw) info is returned in the same structure as ffprobe would return it.
+    Raises InvalidDataError if the file is not a (supported) audio file.
+    """
+    audio = mutagen.File(file_path)
+    if audio is None or (format_name := NATIVE_FORMAT_NAMES.get(type(audio).__name__)) is None:
+        raise InvalidDataError("Unsupported file format")
+    info = audio.info
+    audio_stream = {
+        "codec_type": "audio",
+        "codec_name": format_name,
+        "sample_rate": str(info.sample_rate),
+        "channels": info.channels,
+    }
+    if bits_per_sample := getattr(info, "bits_per_sample", None):
+        audio_stream["bits_per_raw_sample"] = str(bits_per_sample)
+    streams = [audio_stream]
+    if _get_native_pictures(audio):
+        # ffprobe reports the embedded cover image as a (video) stream
+        streams.append({"codec_type": "video", "codec_name": "mjpeg"})
+    raw_format = {
+        "filename": file_path,
+        "format_name": format_name,
+        "duration": str(info.length),
+        "tags": _get_native_tags(audio),
+    }
+    if info.bitrate:
+        raw_format["bit_rate"] = str(info.bitrate)
+    return AudioTags.parse({"streams": streams, "format": raw_format, "chapters": []})
+
+
+async def parse_tags_ffprobe(
+    input_file: str | AsyncGenerator[bytes, None], file_size: int | None = None
+) -> AudioTags:
+    """Parse tags from a media file with ffprobe.
+
     input_file may be a (local) filename/url accessible by ffmpeg or
     an AsyncGenerator which yields the file contents as bytes.
     """
@@ -363,6 +487,22 @@ async def get_embedded_image(input_file: str | AsyncGenerator[bytes, None]) -> b
     input_file may be a (local) filename/url accessible by ffmpeg or
     an AsyncGenerator which yields the file contents as bytes.
     """
+    if _is_native_file(input_file):
+
+        def _get_pictures() -> list[Picture]:
+            audio = mutagen.File(input_file)
+            if audio is None or type(audio).__name__ not in NATIVE_FORMAT_NAMES:
+                raise InvalidDataError("Unsupported file format")
+            return _get_native_pictures(audio)
+
+        try:
+            pictures = await asyncio.to_thread(_get_pictures)
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("Unable to read image of %s in-process: %s", input_file, str(err))
+        else:
+            # prefer the front cover
+            pictures.sort(key=lambda x: x.type != 3)
+            return pictures[0].data if pictures else None
     file_path = input_file if isinstance(input_file, str) else "-"
     args = (
         "ffmpeg",
@@ -397,3 +537,79 @@ async def get_embedded_image(input_file: str | AsyncGenerator[bytes, None]) -> b
             proc.attach_task(chunk_feeder())
 
         return await proc.read(-1)
+
+
+def _is_native_file(input_file: str | AsyncGenerator[bytes, None]) -> bool:
+    """Return if the tags of the given file can be parsed in-process."""
+    return (
+        isinstance(input_file, str)
+        and "://" not in input_file
+        and input_file.rsplit(".", 1)[-1].lower() in NATIVE_TAG_EXTENSIONS
+    )
+
+
+def _get_native_tags(audio: mutagen.FileType) -> dict[str, str]:
+    """Return the tags of a mutagen file with the same names/values as ffprobe reports them."""
+    file_type = type(audio).__name__
+    tags: dict[str, list[str]] = {}
+    for raw_key, raw_value in (audio.tags or {}).items():
+        if file_type == "MP3":
+            if not raw_key.startswith("T"):
+                # only text frames
+                continue
+            key = raw_value.desc if raw_key.startswith("TXXX:") else raw_key
+            key = ID3_TAG_NAMES.get(key, key)
+            values = [str(x) for x in getattr(raw_value, "text", [])]
+        elif file_type == "MP4":
+            if raw_key == "covr":
+                continue
+            key = raw_key.removeprefix(MP4_FREEFORM_PREFIX)
+            key = MP4_TAG_NAMES.get(key, key)
+            raw_values = raw_value if isinstance(raw_value, list) else [raw_value]
+            values = [_mp4_value_to_str(x) for x in raw_values]
+        else:
+            # vorbis comments
+            if raw_key == "metadata_block_picture":
+                continue
+            key = VORBIS_TAG_NAMES.get(raw_key, raw_key)
+            values = raw_value
+        tags.setdefault(key, []).extend(values)
+    # multiple values of a tag are joined with the semicolon (like ffprobe does)
+    return {key: ";".join(values) for key, values in tags.items()}
+
+
+def _mp4_value_to_str(value: Any) -> str:
+    """Convert a (mp4) tag value to string."""
+    if isinstance(value, tuple):
+        # track/disc number and total
+        number, total = value
+        return f"{number}/{total}" if total else str(number)
+    if isinstance(value, bytes):
+        # freeform tag values
+        return value.decode(errors="ignore")
+    return str(value)
+
+
+def _get_native_pictures(audio: mutagen.FileType) -> list[Picture]:
+    """Return the (embedded) pictures of a mutagen file (as FLAC Picture objects)."""
+    if pictures := getattr(audio, "pictures", None):
+        # flac
+        return list(pictures)
+    pictures = []
+    tags = audio.tags or {}
+    if type(audio).__name__ == "MP3":
+        for frame in tags.getall("APIC"):
+            picture = Picture()
+            picture.type = frame.type
+            picture.data = frame.data
+            pictures.append(picture)
+    elif type(audio).__name__ == "MP4":
+        for cover in tags.get("covr", []):
+            picture = Picture()
+            picture.type = 3
+            picture.data = bytes(cover)
+            pictures.append(picture)
+    else:
+        for value in tags.get("metadata_block_picture", []):
+            pictures.append(Picture(base64.b64decode(value)))
+    return pictures
@@ -1,7 +1,12 @@
 """Model/base for a Music Provider implementation."""
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any
 
 from music_assistant.common.models.enums import MediaType, ProviderFeature
 from music_assistant.common.models.errors import MediaNotFoundError, MusicAssistantError
@@ -18,11 +23,18 @@ from music_assistant.common.models.media_items import (
     StreamDetails,
     Track,
 )
+from music_assistant.constants import DB_SYNC_BATCH_SIZE
 
 from .provider import Provider
 
+if TYPE_CHECKING:
+    from music_assistant.server.helpers.database import DatabaseConnection
+
 # ruff: noqa: ARG001, ARG002
 
+# max number of pages of a paged (api) listing that are fetched concurrently
+PAGED_FETCH_CONCURRENCY = 4
+
 
 class MusicProvider(Provider):
     """Base representation of a Music Provider (controller).
@@ -254,6 +266,14 @@ class MusicProvider(Provider):
         """
         raise NotImplementedError
 
+    async def get_image_checksum(self, path: str) -> str | None:  # noqa: ARG002
+        """
+        Return a checksum of an image (e.g. its modification time), if supported.
+
+        Used to invalidate the (cached) thumbnails of the image when it changes.
+        """
+        return None
+
     async def get_item(self, media_type: MediaType, prov_item_id: str) -> MediaItemType:
         """Get single MediaItem from provider."""
         if media_type == MediaType.ARTIST:
@@ -363,41 +383,9 @@ class MusicProvider(Provider):
             self.logger.debug("Start sync of %s items.", media_type.value)
             controller = self.mass.music.get_controller(media_type)
             cur_db_ids = set()
-            async for prov_item in self._get_library_gen(media_type):
-                library_item = await controller.get_library_item_by_prov_mappings(
-                    prov_item.provider_mappings,
-                )
-                try:
-                    if not library_item and not prov_item.available:
-                        # skip unavailable tracks
-                        self.logger.debug(
-                            "Skipping sync of item %s because it is unavailable", prov_item.uri
-                        )
-                        continue
-                    if not library_item:
-                        # create full db item
-                        # note that we skip the metadata lookup purely to speed up the sync
-                        # the additional metadata is then lazy retrieved afterwards
-
-                        prov_item.favorite = True
-                        extra_kwargs = (
-                            {"add_album_tracks": True} if media_type == MediaType.ALBUM else {}
-                        )
-                        library_item = await controller.add_item_to_library(
-                            prov_item, metadata_lookup=False, **extra_kwargs
-                        )
-                    elif (
-                        library_item.metadata.checksum and prov_item.metadata.checksum
-                    ) and library_item.metadata.checksum != prov_item.metadata.checksum:
-                        # existing dbitem checksum changed
-                        library_item = await controller.update_item_in_library(
-                            library_item.item_id, prov_item
-                        )
-                    cur_db_ids.add(library_item.item_id)
-                except MusicAssistantError as err:
-                    self.logger.warning(
-                        "Skipping sync of item %s - error details: %s", prov_item.uri, str(err)
-                    )
+            # run the sync within a single transaction and commit the changes in batches
+            async with self.mass.music.database.transaction() as database:
+                await self._sync_library_items(media_type, cur_db_ids, database)
 
             # process deletions (= no longer in library)
             cache_key = f"library_items.{media_type}.{self.instance_id}"
@@ -429,6 +417,54 @@ class MusicProvider(Provider):
 
     # DO NOT OVERRIDE BELOW
 
+    async def _iter_paged_items(
+        self,
+        get_page: Callable[[int, int], Awaitable[tuple[list[Any], int | None]]],
+        limit: int,
+        concurrency: int = PAGED_FETCH_CONCURRENCY,
+    ) -> AsyncGenerator[Any, None]:
+        """Yield all items of a paged (api) listing, fetching the pages concurrently.
+
+        get_page is called with the offset and limit of a page and returns the items of
+        the page and the total number of items (None if the api does not report it).
+        The first page is fetched to learn the total, the remaining pages are then requested
+        concurrently (the request rate is still limited by the throttler of the provider).
+        If the total is unknown, pages are requested ahead until a page is not full.
+        The items are yielded in order, while the next pages are being fetched.
+        Close the generator (e.g. with contextlib.aclosing) if it is not consumed completely,
+        so the pending page requests are cancelled right away.
+        """
+        items, total = await get_page(0, limit)
+        for item in items:
+            yield item
+        if total is not None and 0 < len(items) < min(limit, total):
+            # the api uses a smaller page size than requested
+            limit = len(items)
+        elif total is None and len(items) < limit:
+            return
+        offsets = (
+            iter(range(limit, total, limit)) if total is not None else itertools.count(limit, limit)
+        )
+        pending: deque[asyncio.Task] = deque()
+        try:
+            while True:
+                # keep (up to) concurrency pages in flight
+                while len(pending) < concurrency and (offset := next(offsets, None)) is not None:
+                    pending.append(asyncio.create_task(get_page(offset, limit)))
+                if not pending:
+                    break
+                items, _ = await pending.popleft()
+                for item in items:
+                    yield item
+                if total is None and len(items) < limit:
+                    # this was the last page
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            # wait for the cancelled requests (and retrieve the exceptions of failed requests)
+            await asyncio.gather(*pending, return_exceptions=True)
+
     def library_supported(self, media_type: MediaType) -> bool:
         """Return if Library is supported for given MediaType on this provider."""
         if media_type == MediaType.ARTIST:
@@ -457,6 +493,86 @@ class MusicProvider(Provider):
             return ProviderFeature.LIBRARY_RADIOS_EDIT in self.supported_features
         return False
 
+    async def _sync_library_items(
+        self,
+        media_type: MediaType,
+        cur_db_ids: set[int],
+        database: DatabaseConnection,
+    ) -> None:
+        """Sync all library items of given media type from the provider into the library db.
+
+        The items are processed in batches: the existing library items of a batch are
+        looked up with a single query and the changes are committed per batch.
+        """
+        batch: list[MediaItemType] = []
+        async with aclosing(self._get_library_gen(media_type)) as library_items:
+            async for prov_item in library_items:
+                batch.append(prov_item)
+                if len(batch) < DB_SYNC_BATCH_SIZE:
+                    continue
+                await self._sync_library_batch(media_type, batch, cur_db_ids)
+                await database.commit()
+                batch = []
+        await self._sync_library_batch(media_type, batch, cur_db_ids)
+
+    async def _sync_library_batch(
+        self,
+        media_type: MediaType,
+        prov_items: list[MediaItemType],
+        cur_db_ids: set[int],
+    ) -> None:
+        """Sync a batch of library items of given media type into the library db."""
+        if not prov_items:
+            return
+        controller = self.mass.music.get_controller(media_type)
+        # lookup the existing library items of the whole batch at once (by provider item id)
+        prov_item_ids = {x.item_id for x in prov_items}
+        library_items: dict[str, MediaItemType] = {}
+        async for library_item in controller.iter_library_items_by_prov_id(
+            self.instance_id, provider_item_ids=tuple(prov_item_ids)
+        ):
+            for mapping in library_item.provider_mappings:
+                if (
+                    mapping.provider_instance == self.instance_id
+                    and mapping.item_id in prov_item_ids
+                ):
+                    library_items[mapping.item_id] = library_item
+        for prov_item in prov_items:
+            library_item = library_items.get(prov_item.item_id)
+            try:
+                if not library_item and not prov_item.available:
+                    # skip unavailable tracks
+                    self.logger.debug(
+                        "Skipping sync of item %s because it is unavailable", prov_item.uri
+                    )
+                    continue
+                if not library_item:
+                    # create full db item
+                    # note that we skip the metadata lookup purely to speed up the sync
+                    # the additional metadata is then lazy retrieved afterwards
+
+                    prov_item.favorite = True
+                    extra_kwargs = (
+                        {"add_album_tracks": True} if media_type == MediaType.ALBUM else {}
+                    )
+                    library_item = await controller.add_item_to_library(
+                        prov_item, metadata_lookup=False, **extra_kwargs
+                    )
+                    # the same item may be listed again (later in the batch)
+                    library_items[prov_item.item_id] = library_item
+                elif (
+                    library_item.metadata.checksum and prov_item.metadata.checksum
+                ) and library_item.metadata.checksum != prov_item.metadata.checksum:
+                    # existing dbitem checksum changed
+                    library_item = await controller.update_item_in_library(
+                        library_item.item_id, prov_item
+                    )
+                cur_db_ids.add(library_item.item_id)
+            except MusicAssistantError as err:
+                self.logger.warning(
+                    "Skipping sync of item %s - error details: %s", prov_item.uri, str(err)
+                )
+
     def _get_library_gen(self, media_type: MediaType) -> AsyncGenerator[MediaItemType, None]:
         """Return library generator for given media_type."""
         if media_type == MediaType.ARTIST:
@@ -20,6 +20,7 @@ from pychromecast.socket_client import CONNECTION_STATUS_CONNECTED, CONNECTION_S
 
 from music_assistant.common.models.config_entries import (
     CONF_ENTRY_HIDE_GROUP_MEMBERS,
+    CONF_ENTRY_STREAM_PROFILE,
     ConfigEntry,
     ConfigValueType,
 )
@@ -62,6 +63,10 @@ BASE_PLAYER_CONFIG_ENTRIES = (
         "the playback experience but may not work on non-Google hardware.",
         advanced=True,
     ),
+    # (wireless) cast devices benefit from large bursts of audio
+    ConfigEntry.from_dict(
+        {**CONF_ENTRY_STREAM_PROFILE.to_dict(), "default_value": "high_throughput"}
+    ),
 )
 
 
@@ -24,7 +24,11 @@ from async_upnp_client.profiles.dlna import DmrDevice, TransportState
 from async_upnp_client.search import async_search
 from async_upnp_client.utils import CaseInsensitiveDict
 
-from music_assistant.common.models.config_entries import ConfigEntry, ConfigValueType
+from music_assistant.common.models.config_entries import (
+    CONF_ENTRY_STREAM_PROFILE,
+    ConfigEntry,
+    ConfigValueType,
+)
 from music_assistant.common.models.enums import (
     ConfigEntryType,
     PlayerFeature,
@@ -257,6 +261,17 @@ class DLNAPlayerProvider(PlayerProvider):
             for dlna_player in self.dlnaplayers.values():
                 tg.create_task(self._device_disconnect(dlna_player))
 
+    async def get_player_config_entries(
+        self, player_id: str  # noqa: ARG002
+    ) -> tuple[ConfigEntry, ...]:
+        """Return all (provider/player specific) Config Entries for the given player (if any)."""
+        return (
+            # (wireless) dlna renderers benefit from large bursts of audio
+            ConfigEntry.from_dict(
+                {**CONF_ENTRY_STREAM_PROFILE.to_dict(), "default_value": "high_throughput"}
+            ),
+        )
+
     def on_player_config_changed(
         self, config: PlayerConfig, changed_keys: set[str]  # noqa: ARG002
     ) -> None:
@@ -114,7 +114,7 @@ class FanartTvMetadataProvider(MetadataProvider):
                 return metadata
         return None
 
-    @use_cache(86400 * 14)
+    @use_cache(86400 * 14, stale_while_revalidate=86400 * 7)
     async def _get_data(self, endpoint, **kwargs) -> dict | None:
         """Get data from api."""
         url = f"http://webservice.fanart.tv/v3/{endpoint}"
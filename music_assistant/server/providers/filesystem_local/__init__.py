@@ -4,6 +4,7 @@ from __future__ import annotations
 import asyncio
 import os
 import os.path
+import time
 from collections.abc import AsyncGenerator
 from typing import TYPE_CHECKING
 
@@ -11,7 +12,7 @@ import aiofiles
 from aiofiles.os import wrap
 
 from music_assistant.common.models.config_entries import ConfigEntry, ConfigValueType
-from music_assistant.common.models.enums import ConfigEntryType
+from music_assistant.common.models.enums import ConfigEntryType, MediaType
 from music_assistant.common.models.errors import SetupFailedError
 from music_assistant.constants import CONF_PATH
 
@@ -22,6 +23,7 @@ from .base import (
     FileSystemProviderBase,
 )
 from .helpers import get_absolute_path, get_relative_path
+from .watcher import FileSystemWatcher
 
 if TYPE_CHECKING:
     from music_assistant.common.models.config_entries import ProviderConfig
@@ -36,6 +38,22 @@ isfile = wrap(os.path.isfile)
 exists = wrap(os.path.exists)
 makedirs = wrap(os.makedirs)
 
+CONF_WATCH_CHANGES = "watch_changes"
+# interval (in seconds) of the full sync (as consistency check) when watching for changes
+WATCH_FULL_SYNC_INTERVAL = 86400
+
+CONF_ENTRY_WATCH_CHANGES = ConfigEntry(
+    key=CONF_WATCH_CHANGES,
+    type=ConfigEntryType.BOOLEAN,
+    label="Watch the music directory for changes",
+    default_value=False,
+    description="Process changes in the music directory right away (using inotify, "
+    "or polling if that is not available) instead of only on the periodic sync. "
+    "The full sync of the music directory then only runs once a day as consistency check.",
+    advanced=True,
+    required=False,
+)
+
 
 async def setup(
     mass: MusicAssistant, manifest: ProviderManifest, config: ProviderConfig
@@ -64,41 +82,98 @@ async def get_config_entries(
     """
     # ruff: noqa: ARG001
     return (
-        ConfigEntry(key="path", type=ConfigEntryType.STRING, label="Path", default_value="/media"),
+        ConfigEntry(
+            key="path",
+            type=ConfigEntryType.STRING,
+            label="Path",
+            default_value="/media",
+            description="The (local) path of the music directory. Note that the periodic sync "
+            "only lists the directories that changed (files added/removed/renamed), files that "
+            "are edited in place (e.g. new tags) are picked up by the full scan of all "
+            "directories which runs once a week (or right away when watching for changes).",
+        ),
         CONF_ENTRY_MISSING_ALBUM_ARTIST,
+        CONF_ENTRY_WATCH_CHANGES,
     )
 
 
-async def create_item(base_path: str, entry: os.DirEntry) -> FileSystemItem:
-    """Create FileSystemItem from os.DirEntry."""
+def create_item(base_path: str, entry: os.DirEntry) -> FileSystemItem:
+    """Create FileSystemItem from os.DirEntry (blocking IO, run in a thread)."""
+    absolute_path = get_absolute_path(base_path, entry.path)
+    stat = entry.stat(follow_symlinks=False)
+    return FileSystemItem(
+        name=entry.name,
+        path=get_relative_path(base_path, entry.path),
+        absolute_path=absolute_path,
+        is_file=entry.is_file(follow_symlinks=False),
+        is_dir=entry.is_dir(follow_symlinks=False),
+        checksum=str(int(stat.st_mtime)),
+        file_size=stat.st_size,
+        # local filesystem is always local resolvable
+        local_path=absolute_path,
+    )
 
-    def _create_item():
-        absolute_path = get_absolute_path(base_path, entry.path)
-        stat = entry.stat(follow_symlinks=False)
-        return FileSystemItem(
-            name=entry.name,
-            path=get_relative_path(base_path, entry.path),
-            absolute_path=absolute_path,
-            is_file=entry.is_file(follow_symlinks=False),
-            is_dir=entry.is_dir(follow_symlinks=False),
-            checksum=str(int(stat.st_mtime)),
-            file_size=stat.st_size,
-            # local filesystem is always local resolvable
-            local_path=absolute_path,
-        )
 
-    # run in thread because strictly taken this may be blocking IO
-    return await asyncio.to_thread(_create_item)
+def scan_dir(base_path: str, abs_path: str) -> list[FileSystemItem]:
+    """Scan (the entries of) a single directory (blocking IO, run in a thread)."""
+    items = []
+    with os.scandir(abs_path) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or any(x in entry.name for x in IGNORE_DIRS):
+                # skip invalid/system files and dirs
+                continue
+            items.append(create_item(base_path, entry))
+    return items
 
 
 class LocalFileSystemProvider(FileSystemProviderBase):
     """Implementation of a musicprovider for local files."""
 
     base_path: str
+    _watcher: FileSystemWatcher | None = None
+    _last_full_sync: float = 0
 
     async def handle_setup(self) -> None:
         """Handle async initialization of the provider."""
         self.base_path = self.config.get_value(CONF_PATH)
+        if self.config.get_value(CONF_WATCH_CHANGES):
+            # prevent the (incremental) sync of changes and a full sync from running at once
+            self._sync_lock = asyncio.Lock()
+            self._watcher = FileSystemWatcher(self.base_path, self._on_changes, self.logger)
+            await self._watcher.start()
+
+    async def unload(self) -> None:
+        """
+        Handle unload/close of the provider.
+
+        Called when provider is deregistered (e.g. MA exiting or config reloading).
+        """
+        if self._watcher:
+            await self._watcher.stop()
+
+    async def sync_library(self, media_types: tuple[MediaType, ...]) -> None:
+        """Run library sync for this provider."""
+        if self._watcher is None:
+            await super().sync_library(media_types)
+            return
+        if self._watcher.running and time.time() - self._last_full_sync < WATCH_FULL_SYNC_INTERVAL:
+            # all changes are picked up by the watcher,
+            # the full sync only runs (once in a while) as consistency check
+            self.logger.debug("Skip full sync, changes are picked up by the watcher")
+            return
+        async with self._sync_lock:
+            await super().sync_library(media_types)
+        self._last_full_sync = time.time()
+
+    async def _on_changes(self, paths: set[str]) -> None:
+        """Handle (a batch of) changes in the music directory, reported by the watcher."""
+        rel_paths = {get_relative_path(self.base_path, x) for x in paths}
+        self.logger.debug("Detected changes in: %s", ", ".join(sorted(rel_paths)))
+        try:
+            async with self._sync_lock:
+                await self.sync_paths(rel_paths)
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.exception("Error processing changes - %s", str(err))
 
     async def listdir(
         self, path: str, recursive: bool = False
@@ -119,12 +194,8 @@ class LocalFileSystemProvider(FileSystemProviderBase):
         abs_path = get_absolute_path(self.base_path, path)
         rel_path = get_relative_path(self.base_path, path)
         self.logger.debug("Processing: %s", rel_path)
-        entries = await asyncio.to_thread(os.scandir, abs_path)
-        for entry in entries:
-            if entry.name.startswith(".") or any(x in entry.name for x in IGNORE_DIRS):
-                # skip invalid/system files and dirs
-                continue
-            item = await create_item(self.base_path, entry)
+        # scan the whole directory in a single (worker) thread
+        for item in await asyncio.to_thread(scan_dir, self.base_path, abs_path):
             if recursive and item.is_dir:
                 try:
                     async for subitem in self.listdir(item.absolute_path, True):
@@ -6,6 +6,7 @@ import contextlib
 import os
 from abc import abstractmethod
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 from dataclasses import dataclass
 
 import cchardet
@@ -42,11 +43,19 @@ from music_assistant.common.models.media_items import (
     StreamDetails,
     Track,
 )
-from music_assistant.constants import VARIOUS_ARTISTS_ID_MBID, VARIOUS_ARTISTS_NAME
+from music_assistant.constants import (
+    DB_SYNC_BATCH_SIZE,
+    DB_TABLE_ALBUM_ARTISTS,
+    DB_TABLE_ALBUM_TRACKS,
+    DB_TABLE_TRACK_ARTISTS,
+    VARIOUS_ARTISTS_ID_MBID,
+    VARIOUS_ARTISTS_NAME,
+)
 from music_assistant.server.controllers.cache import use_cache
 from music_assistant.server.controllers.music import DB_SCHEMA_VERSION
 from music_assistant.server.helpers.compare import compare_strings
 from music_assistant.server.helpers.playlists import parse_m3u, parse_pls
+from music_assistant.server.helpers.seek_index import SeekIndex, get_seek_index
 from music_assistant.server.helpers.tags import parse_tags, split_items
 from music_assistant.server.models.music_provider import MusicProvider
 
@@ -77,6 +86,19 @@ SUPPORTED_EXTENSIONS = TRACK_EXTENSIONS + PLAYLIST_EXTENSIONS
 IMAGE_EXTENSIONS = ("jpg", "jpeg", "JPG", "JPEG", "png", "PNG", "gif", "GIF")
 SEEKABLE_FILES = (ContentType.MP3, ContentType.WAV, ContentType.FLAC)
 IGNORE_DIRS = ("recycle", "Recently-Snaphot")
+# number of files that are parsed concurrently during the library sync
+SCAN_WORKERS = 8
+# max number of (changed) files/items queued between the stages of the library sync
+SCAN_QUEUE_SIZE = 100
+# interval (in seconds) of the full scan of all directories (ignoring the scan manifest)
+FULL_SCAN_INTERVAL = 86400 * 7
+CACHE_KEY_FULL_SCAN = "filesystem_full_scan"
+
+# (name, artist) of the artists parsed by name within the parse stage of the library sync,
+# their library lookup is done by the db writer, which also sees the uncommitted artists
+_DEFERRED_ARTIST_LOOKUPS: ContextVar[list[tuple[str, Artist]] | None] = ContextVar(
+    "deferred_artist_lookups", default=None
+)
 
 SUPPORTED_FEATURES = (
     ProviderFeature.LIBRARY_ARTISTS,
@@ -277,9 +299,147 @@ class FileSystemProviderBase(MusicProvider):
                 )
 
     async def sync_library(self, media_types: tuple[MediaType, ...]) -> None:  # noqa: ARG002
-        """Run library sync for this provider."""
-        # first build a listing of all current items and their checksums
-        prev_checksums = {}
+        """Run library sync for this provider.
+
+        The directory tree is walked only once, the changed files are then processed
+        as a pipeline: a (bounded) pool of workers parses the files concurrently and
+        the parsed items are written to the library (in batches) by a single writer.
+
+        A manifest with the checksum of all directories and files is stored in the db.
+        Directories that did not change since the previous sync are not listed again, their
+        files are taken from the manifest. The checksum (modification time) of a directory
+        only changes when entries are added/removed/renamed, so a full scan of all
+        directories still runs once in a while to pick up files that were changed in place.
+        """
+        prev_manifest = await self.mass.music.get_scan_manifest(self.instance_id)
+        if prev_manifest:
+            prev_checksums = {
+                x: checksum for x, (is_dir, checksum) in prev_manifest.items() if not is_dir
+            }
+        else:
+            # first sync (with a manifest): build a listing of all current items in the library
+            prev_checksums = await self._get_library_checksums()
+        full_scan_key = f"{CACHE_KEY_FULL_SCAN}.{self.instance_id}"
+        full_scan = not await self.mass.cache.get(full_scan_key)
+        prev_children: dict[str, list[str]] = {}
+        for path in prev_manifest:
+            if path:
+                prev_children.setdefault(os.path.dirname(path), []).append(path)
+
+        manifest: dict[str, tuple[bool, str | None]] = {}
+        changed_items: list[FileSystemItem] = []
+
+        async def scan(path: str, checksum: str) -> None:
+            """Find all music files in the directory and all subfolders."""
+            manifest[path] = (True, checksum)
+            if not full_scan and prev_manifest.get(path) == (True, checksum):
+                # directory did not change, only its subdirectories need to be checked
+                for child_path in prev_children.get(path, []):
+                    is_dir, child_checksum = prev_manifest[child_path]
+                    if not is_dir:
+                        manifest[child_path] = (False, child_checksum)
+                        continue
+                    with contextlib.suppress(FileNotFoundError):
+                        await scan(child_path, (await self.resolve(child_path)).checksum)
+                return
+            try:
+                items = [x async for x in self.listdir(path)]
+            except (OSError, PermissionError) as err:
+                self.logger.warning("Skip folder %s: %s", path, str(err))
+                # make sure the folder is listed again on the next sync
+                manifest[path] = (True, None)
+                return
+            for item in items:
+                if item.is_dir:
+                    await scan(item.path, item.checksum)
+                    continue
+                if "." not in item.name or not item.ext:
+                    # skip system files and files without extension
+                    continue
+                if item.ext not in SUPPORTED_EXTENSIONS:
+                    # unsupported file extension
+                    continue
+                manifest[item.path] = (False, item.checksum)
+                # continue if the item did not change (checksum still the same)
+                if item.checksum != prev_checksums.get(item.path):
+                    changed_items.append(item)
+
+        await scan("", (await self.resolve("")).checksum)
+        self.mass.music.update_sync_progress(self.instance_id, 0, len(changed_items))
+
+        # process all deleted (or renamed) files first
+        cur_filenames = {x for x, (is_dir, _) in manifest.items() if not is_dir}
+        deleted_files = set(prev_checksums.keys()) - cur_filenames
+        await self._process_deletions(deleted_files)
+        for file_path in await self._process_changed_items(changed_items):
+            # make sure the failed files are processed again on the next sync
+            manifest[file_path] = (False, None)
+            manifest[os.path.dirname(file_path)] = (True, None)
+        await self.mass.music.set_scan_manifest(self.instance_id, manifest)
+        if full_scan:
+            await self.mass.cache.set(full_scan_key, True, expiration=FULL_SCAN_INTERVAL)
+
+    async def sync_paths(self, paths: set[str]) -> None:
+        """Run an (incremental) library sync for the given (changed) paths only.
+
+        A path may be a file or a directory (which is scanned recursively),
+        files that no longer exist (within the given paths) are removed from the library.
+        The entries of the given paths in the scan manifest are updated accordingly.
+        """
+        prev_manifest = await self.mass.music.get_scan_manifest(self.instance_id)
+        if prev_manifest:
+            prev_checksums = {
+                x: checksum for x, (is_dir, checksum) in prev_manifest.items() if not is_dir
+            }
+        else:
+            # no manifest yet, it is created by the next (full) library sync
+            prev_checksums = await self._get_library_checksums()
+        # the (new) manifest entries of the given paths
+        manifest: dict[str, tuple[bool, str | None]] = {}
+        changed_items: list[FileSystemItem] = []
+
+        async def scan(item: FileSystemItem) -> None:
+            if item.is_dir:
+                manifest[item.path] = (True, item.checksum)
+                try:
+                    sub_items = [x async for x in self.listdir(item.path)]
+                except (OSError, PermissionError) as err:
+                    self.logger.warning("Skip folder %s: %s", item.path, str(err))
+                    manifest[item.path] = (True, None)
+                    return
+                for sub_item in sub_items:
+                    await scan(sub_item)
+                return
+            if "." not in item.name or item.ext not in SUPPORTED_EXTENSIONS:
+                return
+            manifest[item.path] = (False, item.checksum)
+            if item.checksum != prev_checksums.get(item.path):
+                changed_items.append(item)
+
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                await scan(await self.resolve(path))
+
+        def in_paths(file_path: str) -> bool:
+            return any(file_path == x or file_path.startswith(os.path.join(x, "")) for x in paths)
+
+        # all (previous) files within the given paths that were not found are deleted
+        deleted_files = {x for x in prev_checksums if x not in manifest and in_paths(x)}
+        self.logger.debug(
+            "Processing %s changed and %s deleted file(s)", len(changed_items), len(deleted_files)
+        )
+        await self._process_deletions(deleted_files)
+        for file_path in await self._process_changed_items(changed_items):
+            # make sure the failed files are processed again on the next sync
+            manifest[file_path] = (False, None)
+            manifest[os.path.dirname(file_path)] = (True, None)
+        if prev_manifest:
+            removed_paths = {x for x in prev_manifest if x not in manifest and in_paths(x)}
+            await self.mass.music.update_scan_manifest(self.instance_id, manifest, removed_paths)
+
+    async def _get_library_checksums(self) -> dict[str, str]:
+        """Return the checksum of all (track and playlist) files in the library."""
+        checksums = {}
         for ctrl in (self.mass.music.tracks, self.mass.music.playlists):
             async for db_item in ctrl.iter_library_items_by_prov_id(self.instance_id):
                 file_name = next(
@@ -287,58 +447,92 @@ class FileSystemProviderBase(MusicProvider):
                     for x in db_item.provider_mappings
                     if x.provider_instance == self.instance_id
                 )
-                prev_checksums[file_name] = db_item.metadata.checksum
+                checksums[file_name] = db_item.metadata.checksum
+        return checksums
 
-        # process all deleted (or renamed) files first
-        cur_filenames = set()
-        async for item in self.listdir("", recursive=True):
-            if "." not in item.name or not item.ext:
-                # skip system files and files without extension
-                continue
-
-            if item.ext not in SUPPORTED_EXTENSIONS:
-                # unsupported file extension
-                continue
-            cur_filenames.add(item.path)
-        # work out deletions
-        deleted_files = set(prev_checksums.keys()) - cur_filenames
-        await self._process_deletions(deleted_files)
+    async def _process_changed_items(self, changed_items: list[FileSystemItem]) -> set[str]:
+        """Parse the (new or changed) files and add/update them in the library.
 
-        # find all music files in the music directory and all subfolders
+        Returns the paths of the files that failed to process.
+        """
+        failed: set[str] = set()
+        if not changed_items:
+            return failed
+        database = self.mass.music.database
         # we work bottom up, as-in we derive all info from the tracks
-        async for item in self.listdir("", recursive=True):
-            if "." not in item.name or not item.ext:
-                # skip system files and files without extension
-                continue
-
-            if item.ext not in SUPPORTED_EXTENSIONS:
-                # unsupported file extension
-                continue
-
-            try:
-                # continue if the item did not change (checksum still the same)
-                if item.checksum == prev_checksums.get(item.path):
+        parse_queue: asyncio.Queue[FileSystemItem | None] = asyncio.Queue(SCAN_QUEUE_SIZE)
+        write_queue: asyncio.Queue[
+            tuple[Track | Playlist, list[tuple[str, Artist]]] | None
+        ] = asyncio.Queue(SCAN_QUEUE_SIZE)
+        processed = 0
+
+        def report_progress() -> None:
+            nonlocal processed
+            processed += 1
+            self.mass.music.update_sync_progress(self.instance_id, processed, len(changed_items))
+
+        async def feed() -> None:
+            for item in changed_items:
+                await parse_queue.put(item)
+            for _ in range(SCAN_WORKERS):
+                await parse_queue.put(None)
+
+        async def parse_worker() -> None:
+            while (item := await parse_queue.get()) is not None:
+                deferred_artists: list[tuple[str, Artist]] = []
+                _DEFERRED_ARTIST_LOOKUPS.set(deferred_artists)
+                try:
+                    if item.ext in TRACK_EXTENSIONS:
+                        media_item = await self._parse_track(item)
+                    else:
+                        media_item = await self.get_playlist(item.path)
+                        media_item.metadata.checksum = item.checksum
+                        # playlist is always in-library
+                        media_item.favorite = True
+                except Exception as err:  # pylint: disable=broad-except
+                    # we don't want the whole sync to crash on one file so we catch all exceptions
+                    self.logger.exception("Error processing %s - %s", item.path, str(err))
+                    failed.add(item.path)
+                    report_progress()
                     continue
-
-                if item.ext in TRACK_EXTENSIONS:
-                    # add/update track to db
-                    track = await self._parse_track(item)
-                    await self.mass.music.tracks.add_item_to_library(track, metadata_lookup=False)
-                elif item.ext in PLAYLIST_EXTENSIONS:
-                    playlist = await self.get_playlist(item.path)
-                    # add/update] playlist to db
-                    playlist.metadata.checksum = item.checksum
-                    # playlist is always in-library
-                    playlist.favorite = True
-                    await self.mass.music.playlists.add_item_to_library(
-                        playlist, metadata_lookup=False
-                    )
-            except Exception as err:  # pylint: disable=broad-except
-                # we don't want the whole sync to crash on one file so we catch all exceptions here
-                self.logger.exception("Error processing %s - %s", item.path, str(err))
+                await write_queue.put((media_item, deferred_artists))
+
+        async def parse() -> None:
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(SCAN_WORKERS):
+                    tg.create_task(parse_worker())
+            await write_queue.put(None)
+
+        async def write() -> None:
+            count = 0
+            async with database.transaction():
+                while (queue_item := await write_queue.get()) is not None:
+                    media_item, deferred_artists = queue_item
+                    try:
+                        for name, artist in deferred_artists:
+                            await self._match_library_artist(name, artist)
+                        # add/update track/playlist to db
+                        controller = self.mass.music.get_controller(media_item.media_type)
+                        await controller.add_item_to_library(media_item, metadata_lookup=False)
+                    except Exception as err:  # pylint: disable=broad-except
+                        self.logger.exception(
+                            "Error processing %s - %s", media_item.item_id, str(err)
+                        )
+                        failed.add(media_item.item_id)
+                    count += 1
+                    if count % DB_SYNC_BATCH_SIZE == 0:
+                        await database.commit()
+                    report_progress()
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(feed())
+            tg.create_task(parse())
+            tg.create_task(write())
+        return failed
 
     async def _process_deletions(self, deleted_files: set[str]) -> None:
         """Process all deletions."""
+        database = self.mass.music.database
         # process deleted tracks/playlists
         album_ids = set()
         artist_ids = set()
@@ -357,27 +551,38 @@ class FileSystemProviderBase(MusicProvider):
                 file_path, self.instance_id
             ):
                 if library_item.media_type == MediaType.TRACK:
-                    if library_item.album:
-                        album_ids.add(library_item.album.item_id)
-                        # need to fetch the library album to resolve the itemmapping
-                        db_album = await self.mass.music.albums.get_library_item(
-                            library_item.album.item_id
-                        )
-                        for artist in db_album.artists:
-                            artist_ids.add(artist.item_id)
-                    for artist in library_item.artists:
-                        artist_ids.add(artist.item_id)
-                await controller.remove_item_from_library(library_item.item_id)
+                    # collect the album(s) and artist(s) of the track to cleanup afterwards
+                    match = {"track_id": int(library_item.item_id)}
+                    async for db_row in database.iter_items(DB_TABLE_ALBUM_TRACKS, match):
+                        album_ids.add(db_row["album_id"])
+                    async for db_row in database.iter_items(DB_TABLE_TRACK_ARTISTS, match):
+                        artist_ids.add(db_row["artist_id"])
+                # only remove the item itself if it has no other providers attached to it
+                await controller.remove_provider_mapping(
+                    library_item.item_id, self.instance_id, file_path
+                )
         # check if any albums need to be cleaned up
         for album_id in album_ids:
-            if not self.mass.music.albums.tracks(album_id, "library"):
-                await self.mass.music.albums.remove_item_from_library(album_id)
+            if await database.get_count_from_query(
+                f"SELECT track_id FROM {DB_TABLE_ALBUM_TRACKS} WHERE album_id = :album_id",
+                {"album_id": album_id},
+            ):
+                continue
+            async for db_row in database.iter_items(DB_TABLE_ALBUM_ARTISTS, {"album_id": album_id}):
+                artist_ids.add(db_row["artist_id"])
+            # drop our mapping, the album is only removed if no other providers are attached
+            await self.mass.music.albums.remove_provider_mappings(album_id, self.instance_id)
         # check if any artists need to be cleaned up
         for artist_id in artist_ids:
-            if not self.mass.music.artists.albums(
-                artist_id, "library"
-            ) and self.mass.music.artists.tracks(artist_id, "library"):
-                await self.mass.music.artists.remove_item_from_library(album_id)
+            if await database.get_count_from_query(
+                f"SELECT album_id FROM {DB_TABLE_ALBUM_ARTISTS} WHERE artist_id = :artist_id "
+                f"UNION ALL SELECT track_id FROM {DB_TABLE_TRACK_ARTISTS} "
+                "WHERE artist_id = :artist_id",
+                {"artist_id": artist_id},
+            ):
+                continue
+            # drop our mapping, the artist is only removed if no other providers are attached
+            await self.mass.music.artists.remove_provider_mappings(artist_id, self.instance_id)
 
     async def get_artist(self, prov_artist_id: str) -> Artist:
         """Get full artist details by id."""
@@ -573,7 +778,7 @@ class FileSystemProviderBase(MusicProvider):
         prov_mapping = next(x for x in library_item.provider_mappings if x.item_id == item_id)
         file_item = await self.resolve(item_id)
 
-        return StreamDetails(
+        streamdetails = StreamDetails(
             provider=self.instance_id,
             item_id=item_id,
             audio_format=prov_mapping.audio_format,
@@ -583,6 +788,10 @@ class FileSystemProviderBase(MusicProvider):
             direct=file_item.local_path,
             can_seek=prov_mapping.audio_format.content_type in SEEKABLE_FILES,
         )
+        if await self._get_seek_index(streamdetails, file_item):
+            # we can seek (exactly) in the file ourselves using the seek index
+            streamdetails.direct = None
+        return streamdetails
 
     async def get_audio_stream(
         self, streamdetails: StreamDetails, seek_position: int = 0
@@ -591,13 +800,30 @@ class FileSystemProviderBase(MusicProvider):
         if seek_position:
             assert streamdetails.duration, "Duration required for seek requests"
             assert streamdetails.size, "Filesize required for seek requests"
-            seek_bytes = int((streamdetails.size / streamdetails.duration) * seek_position)
+            file_item = await self.resolve(streamdetails.item_id)
+            if seek_index := await self._get_seek_index(streamdetails, file_item):
+                seek_bytes = seek_index.get_offset(seek_position)
+                if seek_index.header:
+                    yield seek_index.header
+            else:
+                seek_bytes = int((streamdetails.size / streamdetails.duration) * seek_position)
         else:
             seek_bytes = 0
 
         async for chunk in self.read_file_content(streamdetails.item_id, seek_bytes):
             yield chunk
 
+    async def _get_seek_index(
+        self, streamdetails: StreamDetails, file_item: FileSystemItem
+    ) -> SeekIndex | None:
+        """Return the seek index for a (long) file, it is built in the background if missing."""
+        return await get_seek_index(
+            self.mass,
+            streamdetails,
+            file_item.checksum,
+            lambda: self.read_file_content(file_item.absolute_path),
+        )
+
     async def resolve_image(self, path: str) -> str | bytes | AsyncGenerator[bytes, None]:
         """
         Resolve an image from an image path.
@@ -608,6 +834,11 @@ class FileSystemProviderBase(MusicProvider):
         file_item = await self.resolve(path)
         return file_item.local_path or self.read_file_content(file_item.absolute_path)
 
+    async def get_image_checksum(self, path: str) -> str | None:
+        """Return a checksum of an image (modification time and size of the file)."""
+        file_item = await self.resolve(path)
+        return f"{file_item.checksum}.{file_item.file_size}"
+
     async def _parse_track(
         self, file_item: FileSystemItem, playlist_position: int | None = None
     ) -> Track | AlbumTrack | PlaylistTrack:
@@ -767,18 +998,11 @@ class FileSystemProviderBase(MusicProvider):
         """Lookup metadata in Artist folder."""
         assert name or artist_path
         if not artist_path:
-            # check if we have an existing item
-            sort_name = create_sort_name(name)
-            async for item in self.mass.music.artists.iter_library_items(search=sort_name):
-                if not compare_strings(sort_name, item.sort_name):
-                    continue
-                for prov_mapping in item.provider_mappings:
-                    if prov_mapping.provider_instance == self.instance_id:
-                        artist_path = prov_mapping.url
-                        break
-                if artist_path:
-                    break
-            else:
+            deferred_artists = _DEFERRED_ARTIST_LOOKUPS.get()
+            if deferred_artists is None:
+                # check if we have an existing item (deferred to the db writer during a sync)
+                artist_path = await self._get_library_artist_path(name)
+            if not artist_path:
                 # check if we have an artist folder for this artist at root level
                 if await self.exists(name):
                     artist_path = name
@@ -787,6 +1011,10 @@ class FileSystemProviderBase(MusicProvider):
                 else:
                     # use fake artist path as item id which is just the name
                     artist_path = name
+            if deferred_artists is not None:
+                artist = await self._parse_artist(name, artist_path)
+                deferred_artists.append((name, artist))
+                return artist
 
         if not name:
             name = artist_path.split(os.sep)[-1]
@@ -834,6 +1062,36 @@ class FileSystemProviderBase(MusicProvider):
 
         return artist
 
+    async def _get_library_artist_path(self, name: str) -> str | None:
+        """Return the path of an existing library artist (of this provider) by name."""
+        sort_name = create_sort_name(name)
+        async for item in self.mass.music.artists.iter_library_items(search=sort_name):
+            if not compare_strings(sort_name, item.sort_name):
+                continue
+            for prov_mapping in item.provider_mappings:
+                if prov_mapping.provider_instance == self.instance_id:
+                    return prov_mapping.url
+        return None
+
+    async def _match_library_artist(self, name: str, artist: Artist) -> None:
+        """Use the path of the existing library artist for an artist that was parsed by name.
+
+        Called by the db writer of the library sync (within its transaction),
+        so the artists added earlier in the same sync are found.
+        """
+        artist_path = await self._get_library_artist_path(name)
+        if not artist_path or artist_path == artist.item_id:
+            return
+        artist.item_id = artist_path
+        artist.provider_mappings = {
+            ProviderMapping(
+                item_id=artist_path,
+                provider_domain=self.domain,
+                provider_instance=self.instance_id,
+                url=artist_path,
+            )
+        }
+
     async def _parse_album(
         self,
         name: str | None,
@@ -0,0 +1,140 @@
+"""Watch a (local) directory for changes, with inotify or polling as fallback."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
+
+from .base import IGNORE_DIRS
+
+if TYPE_CHECKING:
+    from watchdog.events import FileSystemEvent
+    from watchdog.observers.api import BaseObserver
+
+# changes are processed once there were no new changes for this many seconds
+WATCH_DEBOUNCE = 5
+# ...but (during a continuous stream of changes) never later than this many seconds
+WATCH_MAX_DELAY = 60
+# interval (in seconds) of the polling fallback (if inotify is not available)
+WATCH_POLL_INTERVAL = 300
+
+
+class FileSystemWatcher:
+    """Watch a directory (recursively) and report the changed paths in (debounced) batches.
+
+    Serves as the (watchdog) event handler of the observer, watchdog is only imported
+    once the watcher is started.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        callback: Callable[[set[str]], Awaitable[None]],
+        logger: logging.Logger,
+    ) -> None:
+        """Initialize watcher, callback is called with the (absolute) changed paths."""
+        self.path = path
+        self.callback = callback
+        self.logger = logger
+        self._observer: BaseObserver | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: set[str] = set()
+        self._first_change: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        """Return if the watcher is running."""
+        return self._observer is not None and self._observer.is_alive()
+
+    async def start(self) -> None:
+        """Start watching the directory (adding the watches may take a while)."""
+        self._loop = asyncio.get_running_loop()
+
+        def _start() -> BaseObserver:
+            # pylint: disable=import-outside-toplevel
+            from watchdog.observers import Observer
+            from watchdog.observers.polling import PollingObserver
+
+            try:
+                observer = Observer()
+                observer.schedule(self, self.path, recursive=True)
+                observer.start()
+            except OSError as err:
+                # e.g. inotify is not supported (network share) or the watch limit is reached
+                self.logger.warning(
+                    "Unable to watch %s (%s), falling back to polling", self.path, str(err)
+                )
+                observer = PollingObserver(timeout=WATCH_POLL_INTERVAL)
+                observer.schedule(self, self.path, recursive=True)
+                observer.start()
+            return observer
+
+        self._observer = await asyncio.to_thread(_start)
+
+    async def stop(self) -> None:
+        """Stop watching the directory."""
+        if self._timer:
+            self._timer.cancel()
+        if self._observer is None:
+            return
+        observer = self._observer
+        self._observer = None
+        observer.stop()
+        await asyncio.to_thread(observer.join)
+
+    def dispatch(self, event: FileSystemEvent) -> None:
+        """Handle (any) event from the observer (called from the observer thread)."""
+        if event.event_type not in ("created", "deleted", "moved", "modified"):
+            return
+        if event.is_directory and event.event_type == "modified":
+            # the (content) changes of a directory are reported for the files itself
+            return
+        paths = [event.src_path]
+        if dest_path := getattr(event, "dest_path", None):
+            paths.append(dest_path)
+        for path in paths:
+            if not self._ignore_path(path):
+                self._loop.call_soon_threadsafe(self._add_change, path)
+
+    def _ignore_path(self, path: str) -> bool:
+        """Return if changes to the path should be ignored (hidden/system files and dirs)."""
+        return any(
+            part.startswith(".") or any(x in part for x in IGNORE_DIRS)
+            for part in os.path.relpath(path, self.path).split(os.sep)
+        )
+
+    def _add_change(self, path: str) -> None:
+        """Add a changed path to the pending batch and (re)schedule processing of the batch."""
+        self._pending.add(path)
+        now = time.monotonic()
+        if self._first_change is None:
+            self._first_change = now
+        if self._timer:
+            self._timer.cancel()
+        delay = min(WATCH_DEBOUNCE, self._first_change + WATCH_MAX_DELAY - now)
+        self._timer = self._loop.call_later(max(delay, 0), self._process_changes)
+
+    def _process_changes(self) -> None:
+        """Process the pending batch of changes."""
+        paths = coalesce_paths(self._pending)
+        self._pending = set()
+        self._first_change = None
+        self._timer = None
+        task = self._loop.create_task(self.callback(paths))
+        # keep a reference to the task until it is done
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def coalesce_paths(paths: set[str]) -> set[str]:
+    """Return the paths without the paths that are within one of the other (directory) paths."""
+    result = set()
+    for path in sorted(paths):
+        if not any(path.startswith(os.path.join(x, "")) for x in result):
+            result.add(path)
+    return result
@@ -75,7 +75,8 @@ async def get_config_entries(
             label="Share",
             required=True,
             description="The name of the share/service you'd like to connect to on "
-            "the remote host, For example 'media'.",
+            "the remote host, For example 'media'. Note that files that are edited in place "
+            "(e.g. new tags) are picked up by the full scan of the share which runs once a week.",
         ),
         ConfigEntry(
             key=CONF_USERNAME,
@@ -173,28 +173,28 @@ class QobuzProvider(MusicProvider):
     async def get_library_artists(self) -> AsyncGenerator[Artist, None]:
         """Retrieve all library artists from Qobuz."""
         endpoint = "favorite/getUserFavorites"
-        for item in await self._get_all_items(endpoint, key="artists", type="artists"):
+        async for item in self._iter_all_items(endpoint, key="artists", type="artists"):
             if item and item["id"]:
                 yield await self._parse_artist(item)
 
     async def get_library_albums(self) -> AsyncGenerator[Album, None]:
         """Retrieve all library albums from Qobuz."""
         endpoint = "favorite/getUserFavorites"
-        for item in await self._get_all_items(endpoint, key="albums", type="albums"):
+        async for item in self._iter_all_items(endpoint, key="albums", type="albums"):
             if item and item["id"]:
                 yield await self._parse_album(item)
 
     async def get_library_tracks(self) -> AsyncGenerator[Track, None]:
         """Retrieve library tracks from Qobuz."""
         endpoint = "favorite/getUserFavorites"
-        for item in await self._get_all_items(endpoint, key="tracks", type="tracks"):
+        async for item in self._iter_all_items(endpoint, key="tracks", type="tracks"):
             if item and item["id"]:
                 yield await self._parse_track(item)
 
     async def get_library_playlists(self) -> AsyncGenerator[Playlist, None]:
         """Retrieve all library playlists from the provider."""
         endpoint = "playlist/getUserPlaylists"
-        for item in await self._get_all_items(endpoint, key="playlists"):
+        async for item in self._iter_all_items(endpoint, key="playlists"):
             if item and item["id"]:
                 yield await self._parse_playlist(item)
 
@@ -238,7 +238,7 @@ class QobuzProvider(MusicProvider):
     async def get_playlist_tracks(self, prov_playlist_id) -> AsyncGenerator[PlaylistTrack, None]:
         """Get all playlist tracks for given playlist id."""
         count = 1
-        for track_obj in await self._get_all_items(
+        async for track_obj in self._iter_all_items(
             "playlist/get",
             key="tracks",
             playlist_id=prov_playlist_id,
@@ -644,23 +644,19 @@ class QobuzProvider(MusicProvider):
 
     async def _get_all_items(self, endpoint, key="tracks", **kwargs):
         """Get all items from a paged list."""
-        limit = 50
-        offset = 0
-        all_items = []
-        while True:
-            kwargs["limit"] = limit
-            kwargs["offset"] = offset
-            result = await self._get_data(endpoint, **kwargs)
-            offset += limit
-            if not result:
-                break
-            if not result.get(key) or not result[key].get("items"):
-                break
-            for item in result[key]["items"]:
-                all_items.append(item)
-            if len(result[key]["items"]) < limit:
-                break
-        return all_items
+        return [item async for item in self._iter_all_items(endpoint, key, **kwargs)]
+
+    async def _iter_all_items(self, endpoint, key="tracks", **kwargs) -> AsyncGenerator[dict, None]:
+        """Yield all items from a paged list (the pages are fetched concurrently)."""
+
+        async def get_page(offset: int, limit: int) -> tuple[list[dict], int | None]:
+            result = await self._get_data(endpoint, limit=limit, offset=offset, **kwargs)
+            if not result or not result.get(key) or not result[key].get("items"):
+                return [], 0
+            return result[key]["items"], result[key].get("total")
+
+        async for item in self._iter_paged_items(get_page, 50):
+            yield item
 
     async def _get_data(self, endpoint, sign_request=False, **kwargs):
         """Get data from api."""
@@ -18,6 +18,7 @@ from aioslimproto.discovery import start_discovery
 
 from music_assistant.common.models.config_entries import (
     CONF_ENTRY_OUTPUT_CODEC,
+    CONF_ENTRY_STREAM_PROFILE,
     ConfigEntry,
     ConfigValueOption,
     ConfigValueType,
@@ -343,6 +344,10 @@ class SlimprotoProvider(PlayerProvider):
             ConfigEntry.from_dict(
                 {**CONF_ENTRY_OUTPUT_CODEC.to_dict(), "default_value": default_codec}
             ),
+            # squeezebox players (and the airplay bridge) have small buffers
+            ConfigEntry.from_dict(
+                {**CONF_ENTRY_STREAM_PROFILE.to_dict(), "default_value": "low_latency"}
+            ),
         )
 
     async def cmd_stop(self, player_id: str) -> None:
@@ -208,19 +208,19 @@ class SpotifyProvider(MusicProvider):
 
     async def get_library_albums(self) -> AsyncGenerator[Album, None]:
         """Retrieve library albums from the provider."""
-        for item in await self._get_all_items("me/albums"):
+        async for item in self._iter_all_items("me/albums"):
             if item["album"] and item["album"]["id"]:
                 yield await self._parse_album(item["album"])
 
     async def get_library_tracks(self) -> AsyncGenerator[Track, None]:
         """Retrieve library tracks from the provider."""
-        for item in await self._get_all_items("me/tracks"):
+        async for item in self._iter_all_items("me/tracks"):
             if item and item["track"]["id"]:
                 yield await self._parse_track(item["track"])
 
     async def get_library_playlists(self) -> AsyncGenerator[Playlist, None]:
         """Retrieve playlists from the provider."""
-        for item in await self._get_all_items("me/playlists"):
+        async for item in self._iter_all_items("me/playlists"):
             if item and item["id"]:
                 yield await self._parse_playlist(item)
 
@@ -258,7 +258,7 @@ class SpotifyProvider(MusicProvider):
     async def get_playlist_tracks(self, prov_playlist_id) -> AsyncGenerator[PlaylistTrack, None]:
         """Get all playlist tracks for given playlist id."""
         count = 1
-        for item in await self._get_all_items(
+        async for item in self._iter_all_items(
             f"playlists/{prov_playlist_id}/tracks",
         ):
             if not (item and item["track"] and item["track"]["id"]):
@@ -692,20 +692,19 @@ class SpotifyProvider(MusicProvider):
 
     async def _get_all_items(self, endpoint, key="items", **kwargs) -> list[dict]:
         """Get all items from a paged list."""
-        limit = 50
-        offset = 0
-        all_items = []
-        while True:
-            kwargs["limit"] = limit
-            kwargs["offset"] = offset
-            result = await self._get_data(endpoint, **kwargs)
-            offset += limit
+        return [item async for item in self._iter_all_items(endpoint, key, **kwargs)]
+
+    async def _iter_all_items(self, endpoint, key="items", **kwargs) -> AsyncGenerator[dict, None]:
+        """Yield all items from a paged list (the pages are fetched concurrently)."""
+
+        async def get_page(offset: int, limit: int) -> tuple[list[dict], int | None]:
+            result = await self._get_data(endpoint, limit=limit, offset=offset, **kwargs)
             if not result or key not in result or not result[key]:
-                break
-            all_items += result[key]
-            if len(result[key]) < limit:
-                break
-        return all_items
+                return [], 0
+            return result[key], result.get("total")
+
+        async for item in self._iter_paged_items(get_page, 50):
+            yield item
 
     async def _get_data(self, endpoint, tokeninfo: dict | None = None, **kwargs):
         """Get data from api."""
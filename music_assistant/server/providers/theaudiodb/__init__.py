@@ -313,7 +313,7 @@ class AudioDbMetadataProvider(MetadataProvider):
                     break
         return metadata
 
-    @use_cache(86400 * 14)
+    @use_cache(86400 * 14, stale_while_revalidate=86400 * 7)
     async def _get_data(self, endpoint, **kwargs) -> dict | None:
         """Get data from api."""
         url = f"https://theaudiodb.com/api/v1/json/{app_var(3)}/{endpoint}"
@@ -721,19 +721,17 @@ class TidalProvider(MusicProvider):
     async def _iter_items(
         self, func: Awaitable | Callable, *args, **kwargs
     ) -> AsyncGenerator[Any, None]:
-        """Yield all items from a larger listing."""
-        offset = 0
-        async with self._throttler:
-            while True:
+        """Yield all items from a larger listing (the pages are fetched concurrently)."""
+
+        async def get_page(offset: int, limit: int) -> tuple[list[Any], int | None]:  # noqa: ARG001
+            # the tidal api does not report the total number of items
+            async with self._throttler:
                 if asyncio.iscoroutinefunction(func):
-                    chunk = await func(*args, **kwargs, offset=offset)
-                else:
-                    chunk = await asyncio.to_thread(func, *args, **kwargs, offset=offset)
-                offset += len(chunk)
-                for item in chunk:
-                    yield item
-                if len(chunk) < DEFAULT_LIMIT:
-                    break
+                    return await func(*args, **kwargs, offset=offset), None
+                return await asyncio.to_thread(func, *args, **kwargs, offset=offset), None
+
+        async for item in self._iter_paged_items(get_page, DEFAULT_LIMIT):
+            yield item
 
     async def _get_media_info(
         self, item_id: str, url: str, force_refresh: bool = False
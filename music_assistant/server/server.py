@@ -437,6 +437,7 @@ class MusicAssistant:
         """Register all methods decorated as api_command within a class(instance)."""
         for cls in (
             self,
+            self.cache,
             self.config,
             self.metadata,
             self.music,
@@ -0,0 +1,65 @@
+"""
+Benchmark the (in-process) NumPy crossfade against the ffmpeg crossfade.
+
+Usage: python script/benchmark_crossfade.py [--duration 8] [--runs 10]
+"""
+import argparse
+import asyncio
+import math
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+
+from music_assistant.server.helpers import pcm  # noqa: E402
+from music_assistant.server.helpers.audio import crossfade_pcm_parts_ffmpeg  # noqa: E402
+
+# ruff: noqa: T201
+
+# (bit_depth, sample_rate) combinations to benchmark
+FORMATS = ((16, 44100), (24, 96000), (32, 192000))
+
+
+def generate_pcm(bit_depth: int, sample_rate: int, duration: int, frequency: int) -> bytes:
+    """Generate a (stereo) sine wave as PCM audio."""
+    position = np.arange(sample_rate * duration) / sample_rate
+    samples = 0.5 * np.sin(2 * math.pi * frequency * position)
+    return pcm.array_to_pcm(np.repeat(samples[:, None], 2, axis=1), bit_depth)
+
+
+async def benchmark(duration: int, runs: int) -> None:
+    """Run the benchmark."""
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    if not has_ffmpeg:
+        print("ffmpeg not found, only benchmarking the NumPy crossfade")
+    for bit_depth, sample_rate in FORMATS:
+        fade_out_part = generate_pcm(bit_depth, sample_rate, duration, 440)
+        fade_in_part = generate_pcm(bit_depth, sample_rate, duration, 660)
+        timings = {}
+        start = time.perf_counter()
+        for _ in range(runs):
+            pcm.crossfade(fade_in_part, fade_out_part, bit_depth)
+        timings["numpy"] = (time.perf_counter() - start) / runs
+        if has_ffmpeg:
+            start = time.perf_counter()
+            for _ in range(runs):
+                await crossfade_pcm_parts_ffmpeg(
+                    fade_in_part, fade_out_part, bit_depth, sample_rate
+                )
+            timings["ffmpeg"] = (time.perf_counter() - start) / runs
+        print(
+            f"{bit_depth} bits / {sample_rate} Hz / {duration} seconds: "
+            + " - ".join(f"{key}: {value * 1000:.1f} ms" for key, value in timings.items())
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=int, default=8, help="crossfade duration (seconds)")
+    parser.add_argument("--runs", type=int, default=10, help="number of runs per format")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.duration, args.runs))
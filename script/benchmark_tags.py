@@ -0,0 +1,77 @@
+"""
+Benchmark the (in-process) mutagen tag reader against ffprobe.
+
+Usage: python script/benchmark_tags.py <music directory> [--limit 500] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from music_assistant.server.helpers import tags  # noqa: E402
+
+# ruff: noqa: T201
+
+
+def find_files(music_dir: str, limit: int) -> list[str]:
+    """Return (up to limit) audio files of the formats supported by the native tag reader."""
+    files = []
+    for root, _, file_names in os.walk(music_dir):
+        for file_name in file_names:
+            if file_name.rsplit(".", 1)[-1].lower() in tags.NATIVE_TAG_EXTENSIONS:
+                files.append(os.path.join(root, file_name))
+                if len(files) >= limit:
+                    return files
+    return files
+
+
+async def run(
+    files: list[str], parse_func: Callable[[str], Awaitable[tags.AudioTags]], concurrency: int
+) -> tuple[float, int]:
+    """Parse all files (concurrently) and return the files per second and number of errors."""
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def parse(file_path: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                await parse_func(file_path)
+            except Exception:  # pylint: disable=broad-except
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(parse(x) for x in files))
+    return len(files) / (time.perf_counter() - start), errors
+
+
+async def benchmark(music_dir: str, limit: int, concurrency: int) -> None:
+    """Run the benchmark."""
+    files = find_files(music_dir, limit)
+    if not files:
+        print(f"No supported audio files found in {music_dir}")
+        return
+    print(f"Parsing {len(files)} files with a concurrency of {concurrency}")
+    backends = {"mutagen": lambda x: asyncio.to_thread(tags.parse_tags_native, x)}
+    if shutil.which("ffprobe"):
+        backends["ffprobe"] = tags.parse_tags_ffprobe
+    else:
+        print("ffprobe not found, only benchmarking the native tag reader")
+    for name, parse_func in backends.items():
+        files_per_second, errors = await run(files, parse_func, concurrency)
+        print(f"{name}: {files_per_second:.1f} files/second ({errors} errors)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("music_dir", help="directory with audio files")
+    parser.add_argument("--limit", type=int, default=500, help="max number of files to parse")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of parallel parsers")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.music_dir, args.limit, args.concurrency))
@@ -0,0 +1,91 @@
+"""Tests for the cache controller helpers."""
+
+import asyncio
+import pathlib
+import time
+from types import SimpleNamespace
+
+from music_assistant.common.helpers.json import json_dumps
+from music_assistant.server.controllers.cache import CacheController, MemoryCache, use_cache
+from music_assistant.server.helpers.database import DatabaseConnection
+
+
+def test_memory_cache():
+    """Test the size bounded LRU memory cache."""
+    mem_cache = MemoryCache(10000)
+    for i in range(10):
+        mem_cache[f"key{i}"] = "x" * 900
+    # oldest items are evicted once the max size is reached
+    assert mem_cache.size <= 10000
+    assert "key0" not in mem_cache
+    assert "key9" in mem_cache
+    evictions = mem_cache.evictions
+    assert evictions > 0
+    # accessing an item refreshes its position
+    oldest_key = next(iter(mem_cache))
+    assert mem_cache.get(oldest_key)
+    mem_cache["new"] = "x" * 900
+    assert oldest_key in mem_cache
+    assert mem_cache.evictions == evictions + 1
+    # items larger than the cache are not stored
+    mem_cache["large"] = "x" * 20000
+    assert "large" not in mem_cache
+    # expired items are never returned
+    mem_cache.set("expired", "value", expires=time.time() - 1)
+    assert mem_cache.get("expired") is None
+    mem_cache.set("expiring", "value", expires=time.time() - 1)
+    assert mem_cache.purge_expired() == 1
+    stats = mem_cache.get_stats()
+    assert stats["expirations"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    mem_cache.clear()
+    assert len(mem_cache) == 0
+    assert mem_cache.size == 0
+
+
+async def test_use_cache_none_result(tmp_path: pathlib.Path):
+    """Test that a None result is not cached (with stale_while_revalidate)."""
+    mass = SimpleNamespace(config=SimpleNamespace(get_raw_core_config_value=lambda *_: "GLOBAL"))
+
+    cache = CacheController(mass)
+    cache.database = DatabaseConnection(str(tmp_path.joinpath("cache.db")))
+    await cache.database.setup()
+    await cache._CacheController__create_database_tables()
+
+    class Provider:
+        def __init__(self) -> None:
+            self.cache = cache
+            self.results = [None, "value"]
+            self.calls = 0
+
+        @use_cache(expiration=60, stale_while_revalidate=60)
+        async def get_item(self, item_id: str) -> str | None:  # noqa: ARG002
+            self.calls += 1
+            return self.results.pop(0)
+
+    provider = Provider()
+    try:
+        assert await provider.get_item("1") is None
+        await asyncio.sleep(0)
+        assert await provider.get_item("1") == "value"
+        await asyncio.sleep(0)
+        # the (not None) result is served from the cache
+        assert await provider.get_item("1") == "value"
+        assert provider.calls == 2
+    finally:
+        await cache.database.close()
+
+
+async def test_cache_item_size():
+    """Test that the size of a cached item is estimated from its serialized data."""
+    mass = SimpleNamespace(config=SimpleNamespace(get_raw_core_config_value=lambda *_: "GLOBAL"))
+    cache = CacheController(mass)
+    data = {"items": [{"name": f"item {x}", "values": list(range(10))} for x in range(100)]}
+    await cache.set("key", data, expiration=60)
+    assert await cache.get("key") == data
+    _, _, size = cache._mem_cache.d["key"]
+    assert size == len("key") + len(json_dumps(data))
+    # data that is only kept in memory does not need to be serializable
+    await cache.set("other", object(), expiration=60)
+    assert "other" in cache._mem_cache
@@ -0,0 +1,137 @@
+"""Tests for the database helpers."""
+
+import asyncio
+import pathlib
+from types import SimpleNamespace
+
+from music_assistant.constants import DB_TABLE_RADIOS
+from music_assistant.server.controllers.media.radio import RadioController
+from music_assistant.server.controllers.music import MusicController
+from music_assistant.server.helpers.database import DatabaseConnection
+
+
+async def test_transaction_batched_writes(tmp_path: pathlib.Path):
+    """Test (batched) writes within a transaction."""
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")))
+    await database.setup()
+    await database.execute("CREATE TABLE items(item_id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    async with database.transaction():
+        db_id = await database.insert("items", {"name": "first"})
+        assert db_id == 1
+        await database.insert_many("items", ({"name": f"item {x}"} for x in range(10)))
+        await database.insert_or_replace_many("items", [{"name": "item 1"}])
+        await database.update("items", {"item_id": db_id}, {"name": "updated"})
+        # writes are visible within the transaction
+        assert await database.get_count("items") == 11
+    # reopen the database to verify everything got committed
+    await database.close()
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")))
+    await database.setup()
+    assert await database.get_count("items") == 11
+    assert (await database.get_row("items", {"item_id": 1}))["name"] == "updated"
+    await database.close()
+
+
+async def test_transaction_isolation(tmp_path: pathlib.Path):
+    """Test that a transaction is bound to its database and the task that runs it."""
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")))
+    other_database = DatabaseConnection(str(tmp_path.joinpath("other.db")))
+    await database.setup()
+    await other_database.setup()
+    try:
+        for db in (database, other_database):
+            await db.execute("CREATE TABLE items(item_id INTEGER PRIMARY KEY, name TEXT)")
+            await db.commit()
+
+        async def insert_item(db: DatabaseConnection, name: str) -> None:
+            await db.insert("items", {"name": name})
+
+        async with database.transaction():
+            await database.insert("items", {"name": "in transaction"})
+            # a write to another database (instance) is committed right away
+            await insert_item(other_database, "other")
+            assert await other_database.get_count("items") == 1
+            # a task started within the transaction is not part of it (commits its writes)
+            await asyncio.create_task(insert_item(database, "task"))
+            assert not database._db.in_transaction
+            await database.insert("items", {"name": "in transaction 2"})
+            assert database._db.in_transaction
+        assert not database._db.in_transaction
+        assert await database.get_count("items") == 3
+    finally:
+        await database.close()
+        await other_database.close()
+
+
+async def test_read_pool_and_vacuum(tmp_path: pathlib.Path):
+    """Test reads from the read-only connection pool and the (conditional) vacuum."""
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")), read_pool_size=2)
+    await database.setup()
+    await database.execute("CREATE TABLE items(item_id INTEGER PRIMARY KEY, name TEXT)")
+    # committed writes are visible to the read pool
+    await database.insert_many("items", ({"name": "x" * 1000} for _ in range(500)))
+    assert await database.get_count("items") == 500
+    # nothing to reclaim yet
+    assert not await database.vacuum()
+    await database.delete("items", query="item_id > 10")
+    assert await database.get_count("items") == 10
+    assert await database.vacuum()
+    await database.close()
+
+
+async def test_iter_items(tmp_path: pathlib.Path):
+    """Test iterating all (matching) rows of a table in pages."""
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")))
+    await database.setup()
+    await database.execute("CREATE TABLE items(item_id INTEGER PRIMARY KEY, name TEXT)")
+    await database.insert_many("items", ({"name": f"item {x % 2}"} for x in range(25)))
+    rows = [x async for x in database.iter_items("items", limit=10)]
+    assert [x["item_id"] for x in rows] == list(range(1, 26))
+    rows = [x async for x in database.iter_items("items", {"name": "item 1"}, limit=5)]
+    assert len(rows) == 12
+    await database.close()
+
+
+async def test_library_items_cursor(tmp_path: pathlib.Path):
+    """Test (keyset) pagination of library items with a cursor."""
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")))
+    await database.setup()
+    try:
+        mass = SimpleNamespace(
+            music=SimpleNamespace(database=database), register_api_command=lambda *_: None
+        )
+        # create the library tables with the (private) setup of the music controller
+        await MusicController._MusicController__create_database_tables(mass.music)
+        await database.insert_many(
+            DB_TABLE_RADIOS,
+            (
+                {
+                    "name": f"Radio {x:02d}",
+                    # some duplicate sort names to verify the tie breaker on item_id
+                    "sort_name": f"radio {x // 2:02d}",
+                    "favorite": False,
+                    "metadata": "{}",
+                    "provider_mappings": "[]",
+                    "timestamp_added": x,
+                    "timestamp_modified": x,
+                }
+                for x in range(25)
+            ),
+        )
+        controller = RadioController(mass)
+        names = []
+        cursor = None
+        while True:
+            page = await controller.library_items(limit=10, cursor=cursor)
+            names += [x.name for x in page.items]
+            assert page.total == 25
+            if not (cursor := page.next_cursor):
+                break
+        assert names == [f"Radio {x:02d}" for x in range(25)]
+        page = await controller.library_items(limit=10, order_by="timestamp_added DESC")
+        page = await controller.library_items(
+            limit=10, order_by="timestamp_added DESC", cursor=page.next_cursor
+        )
+        assert [x.name for x in page.items] == [f"Radio {x:02d}" for x in range(14, 4, -1)]
+    finally:
+        await database.close()
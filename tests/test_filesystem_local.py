@@ -0,0 +1,223 @@
+"""Tests for the local filesystem provider helpers."""
+
+import asyncio
+import logging
+import os
+import pathlib
+import shutil
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+
+from music_assistant.common.models.enums import MediaType
+from music_assistant.common.models.errors import MediaNotFoundError
+from music_assistant.common.models.media_items import Album, Artist, ProviderMapping, Track
+from music_assistant.constants import DB_TABLE_ARTISTS, DB_TABLE_TRACKS
+from music_assistant.server.controllers.cache import CacheController
+from music_assistant.server.controllers.media.albums import AlbumsController
+from music_assistant.server.controllers.media.artists import ArtistsController
+from music_assistant.server.controllers.media.playlists import PlaylistController
+from music_assistant.server.controllers.media.tracks import TracksController
+from music_assistant.server.controllers.music import MusicController
+from music_assistant.server.helpers.database import DatabaseConnection
+from music_assistant.server.providers.filesystem_local import LocalFileSystemProvider
+from music_assistant.server.providers.filesystem_local import base as filesystem_base
+from music_assistant.server.providers.filesystem_local.base import FileSystemItem
+from music_assistant.server.providers.filesystem_local.watcher import coalesce_paths
+
+RESOURCES_DIR = pathlib.Path(__file__).parent.resolve().joinpath("fixtures")
+
+
+def test_coalesce_paths():
+    """Test removing the changed paths that are within one of the other (directory) paths."""
+    paths = {
+        "/music/Artist/Album/01.flac",
+        "/music/Artist/Album",
+        "/music/Artist/Album 2/01.flac",
+        "/music/Artist/Album 2 (Deluxe)/01.flac",
+        "/music/Other.mp3",
+    }
+    assert coalesce_paths(paths) == {
+        "/music/Artist/Album",
+        "/music/Artist/Album 2/01.flac",
+        "/music/Artist/Album 2 (Deluxe)/01.flac",
+        "/music/Other.mp3",
+    }
+    assert coalesce_paths({"/music", "/music/Artist"}) == {"/music"}
+    assert coalesce_paths(set()) == set()
+
+
+class _FileSystemProvider(LocalFileSystemProvider):
+    """Local filesystem provider with a fixed instance id (for the tests)."""
+
+    instance_id = "local"
+    domain = "filesystem_local"
+
+
+def _mapping(item_id: str, provider: str) -> set[ProviderMapping]:
+    return {ProviderMapping(item_id=item_id, provider_domain=provider, provider_instance=provider)}
+
+
+@asynccontextmanager
+async def _get_provider(tmp_path: pathlib.Path) -> AsyncGenerator[_FileSystemProvider, None]:
+    """Return a provider (for the music dir in tmp_path) with a (minimal) library around it."""
+    database = DatabaseConnection(str(tmp_path.joinpath("library.db")))
+    await database.setup()
+    cache_database = DatabaseConnection(str(tmp_path.joinpath("cache.db")))
+    await cache_database.setup()
+    try:
+        music = SimpleNamespace(
+            database=database,
+            update_sync_progress=lambda *_: None,
+            get_running_sync_tasks=lambda: [],
+        )
+        mass = SimpleNamespace(
+            music=music,
+            config=SimpleNamespace(get_raw_core_config_value=lambda *_: "GLOBAL"),
+            loop=asyncio.get_running_loop(),
+            create_task=lambda target, *args: asyncio.create_task(target(*args)),
+            register_api_command=lambda *_: None,
+            signal_event=lambda *_: None,
+        )
+        # create the library tables with the (private) setup of the music controller
+        await MusicController._MusicController__create_database_tables(music)
+        music.artists = ArtistsController(mass)
+        music.albums = AlbumsController(mass)
+        music.tracks = TracksController(mass)
+        music.playlists = PlaylistController(mass)
+        music.get_controller = partial(MusicController.get_controller, music)
+        music.get_scan_manifest = partial(MusicController.get_scan_manifest, music)
+        music.set_scan_manifest = partial(MusicController.set_scan_manifest, music)
+        mass.cache = CacheController(mass)
+        mass.cache.database = cache_database
+        await mass.cache._CacheController__create_database_tables()
+        prov = object.__new__(_FileSystemProvider)
+        prov.mass = mass
+        prov.cache = mass.cache
+        prov.logger = logging.getLogger(__name__)
+        prov.base_path = str(tmp_path.joinpath("music"))
+        mass.get_provider = lambda *_: prov
+        yield prov
+    finally:
+        await database.close()
+        await cache_database.close()
+
+
+async def test_process_deletions(tmp_path: pathlib.Path):
+    """Test that deleted files only remove the items that are not mapped to other providers."""
+    async with _get_provider(tmp_path) as prov:
+        music = prov.mass.music
+        album_artist = await music.artists.add_item_to_library(
+            Artist(
+                item_id="Artist",
+                provider="local",
+                name="Artist",
+                provider_mappings=_mapping("Artist", "local"),
+            ),
+            metadata_lookup=False,
+        )
+        track_artist = await music.artists.add_item_to_library(
+            Artist(
+                item_id="Other",
+                provider="local",
+                name="Other",
+                provider_mappings=_mapping("Other", "local"),
+            ),
+            metadata_lookup=False,
+        )
+        # a local album that is merged with the same album on a streaming provider
+        album = await music.albums.add_item_to_library(
+            Album(
+                item_id="Artist/Album",
+                provider="local",
+                name="Album",
+                artists=[album_artist],
+                provider_mappings=_mapping("Artist/Album", "local") | _mapping("123", "spotify"),
+            ),
+            metadata_lookup=False,
+        )
+        await music.tracks.add_item_to_library(
+            Track(
+                item_id="Artist/Album/01.flac",
+                provider="local",
+                name="Track",
+                artists=[track_artist],
+                album=album,
+                provider_mappings=_mapping("Artist/Album/01.flac", "local"),
+            ),
+            metadata_lookup=False,
+        )
+        await prov._process_deletions({"Artist/Album/01.flac"})
+
+        assert await music.database.get_count(DB_TABLE_TRACKS) == 0
+        # the album (and its artist) remain, only the local mapping is removed
+        library_album = await music.albums.get_library_item(album.item_id)
+        assert {x.provider_instance for x in library_album.provider_mappings} == {"spotify"}
+        assert await music.artists.get_library_item(album_artist.item_id)
+        # the track artist is no longer used by any (library) item
+        with pytest.raises(MediaNotFoundError):
+            await music.artists.get_library_item(track_artist.item_id)
+
+
+async def test_process_changed_items_new_artist(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that files (of one batch) which introduce the same new artist add a single artist."""
+    music_dir = tmp_path.joinpath("music")
+    # the artist is found by its folder for the first file and by name for the second file
+    for file_path in ("Music/MyArtist/MyAlbum/01.mp3", "Singles/02.mp3"):
+        music_dir.joinpath(file_path).parent.mkdir(parents=True)
+        shutil.copy(RESOURCES_DIR.joinpath("MyArtist - MyTitle.mp3"), music_dir.joinpath(file_path))
+    # a single parse worker, so the files are written in order
+    monkeypatch.setattr(filesystem_base, "SCAN_WORKERS", 1)
+    async with _get_provider(tmp_path) as prov:
+        items = sorted([x async for x in prov.listdir("", recursive=True)], key=lambda x: x.path)
+        assert not await prov._process_changed_items(items)
+
+        artists = [x async for x in prov.mass.music.artists.iter_library_items(search="MyArtist")]
+        artist = next(x for x in artists if x.name == "MyArtist")
+        assert [x.item_id for x in artist.provider_mappings] == ["Music/MyArtist"]
+        assert await prov.mass.music.database.get_count(DB_TABLE_ARTISTS) == 2
+
+
+async def test_sync_library_manifest(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that the sync skips unchanged directories, except for the (periodic) full scan."""
+    music_dir = tmp_path.joinpath("music")
+    album_dir = music_dir.joinpath("MyArtist", "MyAlbum")
+    album_dir.mkdir(parents=True)
+    shutil.copy(RESOURCES_DIR.joinpath("MyArtist - MyTitle.mp3"), album_dir.joinpath("01.mp3"))
+    async with _get_provider(tmp_path) as prov:
+        process_changed_items = prov._process_changed_items
+        changed_paths: list[list[str]] = []
+
+        async def _process_changed_items(changed_items: list[FileSystemItem]) -> set[str]:
+            changed_paths.append([x.path for x in changed_items])
+            return await process_changed_items(changed_items)
+
+        monkeypatch.setattr(prov, "_process_changed_items", _process_changed_items)
+        await prov.sync_library((MediaType.TRACK,))
+        assert changed_paths.pop() == ["MyArtist/MyAlbum/01.mp3"]
+        assert await prov.mass.music.database.get_count(DB_TABLE_TRACKS) == 1
+
+        # a file that is changed in place does not change the (mtime of the) directory,
+        # so it is not picked up until the next full scan
+        dir_mtime = album_dir.stat().st_mtime
+        os.utime(album_dir.joinpath("01.mp3"), (dir_mtime + 10, dir_mtime + 10))
+        await prov.sync_library((MediaType.TRACK,))
+        assert changed_paths.pop() == []
+        # a new file changes the directory
+        shutil.copy(album_dir.joinpath("01.mp3"), album_dir.joinpath("02.mp3"))
+        os.utime(album_dir, (dir_mtime + 20, dir_mtime + 20))
+        await prov.sync_library((MediaType.TRACK,))
+        assert sorted(changed_paths.pop()) == [
+            "MyArtist/MyAlbum/01.mp3",
+            "MyArtist/MyAlbum/02.mp3",
+        ]
+        # the full scan lists all directories again
+        os.utime(album_dir.joinpath("02.mp3"), (dir_mtime + 30, dir_mtime + 30))
+        await prov.mass.cache.delete(f"{filesystem_base.CACHE_KEY_FULL_SCAN}.{prov.instance_id}")
+        await prov.sync_library((MediaType.TRACK,))
+        assert changed_paths.pop() == ["MyArtist/MyAlbum/02.mp3"]
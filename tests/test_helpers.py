@@ -1,10 +1,26 @@
 """Tests for utility/helper functions."""
 
+import asyncio
+import pathlib
+from types import SimpleNamespace
+
+import numpy as np
 from pytest import raises
 
 from music_assistant.common.helpers import uri, util
 from music_assistant.common.models import media_items
+from music_assistant.common.models.enums import ContentType
 from music_assistant.common.models.errors import MusicAssistantError
+from music_assistant.server.helpers import (
+    audio,
+    compare,
+    ffmpeg,
+    filecache,
+    images,
+    pcm,
+    ringbuffer,
+    seek_index,
+)
 
 
 def test_version_extract():
@@ -44,3 +60,182 @@ def test_uri_parsing():
     # test invalid uri
     with raises(MusicAssistantError):
         uri.parse_uri("invalid://blah")
+
+
+def test_create_search_string():
+    """Test creating the (unaccented) search string for the full text search index."""
+    assert compare.create_search_string("Björk") == "bjork"
+    assert compare.create_search_string("Don't Stop Me Now - Remastered") == (
+        "dont stop me now remastered"
+    )
+    assert compare.create_search_string(" / ") == ""
+
+
+async def test_thumbnail_cache(tmp_path: pathlib.Path):
+    """Test the (size limited) on disk thumbnail cache."""
+    thumb_cache = images.ThumbnailCache(str(tmp_path), max_size=3000)
+    await thumb_cache.setup()
+    keys = [images.ThumbnailCache.get_key(f"/music/{x}.jpg", "file", 256) for x in range(4)]
+    for key in keys[:3]:
+        await thumb_cache.set(key, b"x" * 1000)
+    assert await thumb_cache.get(keys[0]) == b"x" * 1000
+    # the least recently used thumbnail is removed when the max size is exceeded
+    await thumb_cache.set(keys[3], b"x" * 1000)
+    assert keys[1] not in thumb_cache
+    assert await thumb_cache.get(keys[1]) is None
+    # thumbnails persist on disk
+    thumb_cache = images.ThumbnailCache(str(tmp_path), max_size=3000)
+    await thumb_cache.setup()
+    assert all(key in thumb_cache for key in (keys[0], keys[2], keys[3]))
+
+
+async def test_fill_audio_cache(tmp_path: pathlib.Path):
+    """Test that only the audio of a completely received track is added to the audio cache."""
+    audio_cache = filecache.FileCache(str(tmp_path), max_size=10000)
+    await audio_cache.setup()
+    mass = SimpleNamespace(streams=SimpleNamespace(audio_cache=audio_cache))
+
+    async def get_audio_stream():
+        for _ in range(10):
+            yield b"x" * 100
+
+    # the track is not played until the end
+    audio_stream = audio._fill_audio_cache(mass, "partial", get_audio_stream())
+    async for _ in audio_stream:
+        break
+    await audio_stream.aclose()
+    assert "partial" not in audio_cache
+    assert not list(tmp_path.glob("**/*.tmp"))
+    # the whole track is received
+    audio_stream = audio._fill_audio_cache(mass, "complete", get_audio_stream())
+    assert b"".join([x async for x in audio_stream]) == b"x" * 1000
+    assert await audio_cache.get("complete") == b"x" * 1000
+
+
+async def test_image_checksum(tmp_path: pathlib.Path):
+    """Test that the thumbnail key changes when the (local) source image is modified."""
+    image_path = str(tmp_path.joinpath("folder.jpg"))
+    with open(image_path, "wb") as _file:
+        _file.write(b"x" * 100)
+    checksum = await images.get_image_checksum(None, image_path)
+    assert await images.get_image_checksum(None, "https://example.com/folder.jpg") is None
+    with open(image_path, "ab") as _file:
+        _file.write(b"x")
+    new_checksum = await images.get_image_checksum(None, image_path)
+    assert new_checksum != checksum
+    assert images.ThumbnailCache.get_key(
+        image_path, size=256, checksum=checksum
+    ) != images.ThumbnailCache.get_key(image_path, size=256, checksum=new_checksum)
+    with raises(FileNotFoundError):
+        await images.get_image_checksum(None, str(tmp_path.joinpath("missing.jpg")))
+
+
+async def test_image_thumb_format():
+    """Test creating a thumbnail in an unsupported format."""
+    with raises(ValueError):
+        await images.get_image_thumb(None, "/music/folder.jpg", 256, image_format="gif")
+
+
+def test_pcm_crossfade():
+    """Test the (in-process) crossfade of PCM audio."""
+    for bit_depth in pcm.PCM_INT_BIT_DEPTHS:
+        # 6 (stereo) frames of full scale audio fading out, 4 frames of silence fading in
+        fade_out_samples = [-1.0] * 12
+        fade_out_part = pcm.array_to_pcm(np.array(fade_out_samples), bit_depth)
+        fade_in_part = pcm.array_to_pcm(np.zeros(8), bit_depth)
+        # roundtrip of pcm conversion (including 24 bits sign extension)
+        assert pcm.pcm_to_array(fade_out_part, bit_depth).tolist() == [[-1.0, -1.0]] * 6
+        result = pcm.crossfade(fade_in_part, fade_out_part, bit_depth)
+        assert len(result) == len(fade_out_part)
+        result_samples = pcm.pcm_to_array(result, bit_depth)[:, 0].tolist()
+        assert result_samples == [-1.0, -1.0, -1.0, -0.75, -0.5, -0.25]
+    with raises(ValueError):
+        pcm.crossfade(b"", b"", 8)
+
+
+def test_pcm_audio_bounds():
+    """Test the detection of silence in PCM audio."""
+    # 0.5 seconds of silence, 1 second of audio and 0.5 seconds of silence (at 1000 Hz)
+    samples = np.zeros((2000, 2))
+    samples[500:1500] = 0.5
+    data = pcm.array_to_pcm(samples, 16)
+    assert pcm.get_audio_bounds(data, 16, 1000) == (500 * 4, 1500 * 4)
+    assert pcm.get_audio_bounds(pcm.array_to_pcm(np.zeros((2000, 2)), 16), 16, 1000) is None
+
+
+def test_pcm_loudness_meter():
+    """Test the (EBU R128) integrated loudness measurement of PCM audio."""
+    # 10 seconds of a 997 Hz sine at -20 dBFS (in both channels) is -20 LUFS
+    samples = 0.1 * np.sin(2 * np.pi * 997 * np.arange(480000) / 48000)
+    data = pcm.array_to_pcm(np.repeat(samples[:, None], 2, axis=1), 24)
+    meter = pcm.LoudnessMeter(48000, 24)
+    assert meter.integrated_loudness is None
+    # feed in chunks that do not align with the (100ms) segments
+    for start in range(0, len(data), 100003):
+        meter.update(data[start : start + 100003])
+    assert abs(meter.integrated_loudness + 20) < 0.05
+    assert round(meter.duration, 1) == 10.0
+
+
+async def test_ring_buffer():
+    """Test the fan out of chunks to multiple readers with a ring buffer."""
+    buffer = ringbuffer.RingBuffer(max_size=4)
+    fast_reader = buffer.add_reader()
+    slow_reader = buffer.add_reader(backpressure=False)
+    received = []
+
+    async def read_all() -> None:
+        async for chunk in fast_reader.iter_chunks():
+            received.append(bytes(chunk))
+
+    read_task = asyncio.create_task(read_all())
+    for chunk in (b"ab", b"cd", b"ef", b"gh"):
+        await buffer.put(chunk)
+    # a late joiner can start at a recent position within the buffer
+    late_reader = buffer.add_reader(rewind=3)
+    buffer.close()
+    await read_task
+    assert received == [b"ab", b"cd", b"ef", b"gh"]
+    # the slow reader (without backpressure) skipped the data that is no longer buffered
+    assert bytes(await slow_reader.read()) == b"ef"
+    assert slow_reader.bytes_skipped == 4
+    assert bytes(await late_reader.read()) == b"f"
+    assert bytes(await late_reader.read()) == b"gh"
+    assert await late_reader.read() is None
+
+
+def test_ffmpeg_capabilities():
+    """Test (serializing) the ffmpeg capabilities and the precomputed arguments."""
+    capabilities = ffmpeg.FFMpegCapabilities(present=True, version="6.0", libsoxr=True)
+    assert ffmpeg.FFMpegCapabilities.from_dict(capabilities.to_dict()) == capabilities
+    ffmpeg_args = ffmpeg.FFMpegArgs(capabilities)
+    assert "-reconnect_on_network_error" not in ffmpeg_args.reconnect_args
+    pcm_format = media_items.AudioFormat(
+        content_type=ContentType.PCM_S16LE, sample_rate=44100, bit_depth=16
+    )
+    output_args = ffmpeg_args.get_output_args(pcm_format)
+    assert output_args[-3:] == ["-ar", "44100", "-"]
+    assert ffmpeg_args.get_output_args(pcm_format) is output_args
+
+
+def test_seek_index():
+    """Test building a seek index for a (VBR) MP3 file."""
+    # ID3 tag followed by frames that alternate between 128 and 64 kbps (44.1 kHz)
+    data = b"ID3\x03\x00\x00\x00\x00\x00\x14" + b"\x00" * 20
+    frame_offsets = []
+    for index in range(200):
+        bitrate_index, frame_size = (9, 417) if index % 2 else (5, 208)
+        frame_offsets.append(len(data))
+        data += bytes([0xFF, 0xFB, bitrate_index << 4, 0x00]) + b"\x00" * (frame_size - 4)
+    builder = seek_index.SeekIndexBuilder(ContentType.MP3, "checksum")
+    # feed the data in (small) chunks that do not align with the frames
+    for start in range(0, len(data), 1000):
+        builder.update(data[start : start + 1000])
+    index = builder.finish()
+    frame_duration = 1152 / 44100
+    assert len(index.offsets) == 6
+    for position in (0, 1, 2.5, 5):
+        # the last frame that starts at (or before) the position
+        expected = frame_offsets[int(int(position) / frame_duration)]
+        assert index.get_offset(position) == expected
+    assert seek_index.SeekIndex.from_dict(index.to_dict()) == index
@@ -0,0 +1,159 @@
+"""Tests for the (base) music provider model."""
+
+import asyncio
+import logging
+import pathlib
+from contextlib import aclosing
+from functools import partial
+from types import SimpleNamespace
+
+from music_assistant.common.models.enums import MediaType
+from music_assistant.common.models.media_items import Album, Artist, ProviderMapping, Track
+from music_assistant.constants import DB_TABLE_ALBUM_TRACKS, DB_TABLE_TRACKS
+from music_assistant.server.controllers.media.albums import AlbumsController
+from music_assistant.server.controllers.media.artists import ArtistsController
+from music_assistant.server.controllers.media.tracks import TracksController
+from music_assistant.server.controllers.music import MusicController
+from music_assistant.server.helpers.database import DatabaseConnection
+from music_assistant.server.models.music_provider import MusicProvider
+
+
+class _MusicProvider(MusicProvider):
+    """Music provider with a fixed instance id (for the tests)."""
+
+    instance_id = "test"
+    domain = "test"
+
+
+def _get_provider() -> _MusicProvider:
+    prov = object.__new__(_MusicProvider)
+    prov.logger = logging.getLogger(__name__)
+    return prov
+
+
+def _mapping(item_id: str) -> set[ProviderMapping]:
+    return {ProviderMapping(item_id=item_id, provider_domain="test", provider_instance="test")}
+
+
+async def test_iter_paged_items():
+    """Test fetching all pages of a (paged) listing, with and without a known total."""
+    prov = _get_provider()
+    all_items = list(range(95))
+
+    async def get_page(offset: int, limit: int, report_total: bool) -> tuple[list[int], int | None]:
+        await asyncio.sleep(0)
+        return all_items[offset : offset + limit], len(all_items) if report_total else None
+
+    for report_total in (True, False):
+        get_items = partial(get_page, report_total=report_total)
+        assert [x async for x in prov._iter_paged_items(get_items, 10)] == all_items
+
+    # the api returns smaller pages than requested
+    async def get_small_page(offset: int, limit: int) -> tuple[list[int], int]:
+        return all_items[offset : offset + min(limit, 20)], len(all_items)
+
+    assert [x async for x in prov._iter_paged_items(get_small_page, 50)] == all_items
+
+
+async def test_iter_paged_items_cancel():
+    """Test that the pending page requests are cancelled when the generator is closed."""
+    prov = _get_provider()
+    cancelled: list[int] = []
+
+    async def get_page(offset: int, limit: int) -> tuple[list[int], int]:
+        if offset > 10:
+            try:
+                # the pages after the 2nd page never complete
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(offset)
+                raise
+        return list(range(offset, offset + limit)), 100
+
+    async with aclosing(prov._iter_paged_items(get_page, 10, concurrency=3)) as items:
+        async for item in items:
+            if item == 10:
+                break
+    assert sorted(cancelled) == [20, 30]
+
+
+async def test_sync_library_batch(tmp_path: pathlib.Path):
+    """Test the (batched) lookup of the existing library items of a library sync."""
+    database = DatabaseConnection(str(tmp_path.joinpath("test.db")))
+    await database.setup()
+    try:
+        music = SimpleNamespace(database=database)
+        mass = SimpleNamespace(
+            music=music,
+            register_api_command=lambda *_: None,
+            signal_event=lambda *_: None,
+        )
+        # create the library tables with the (private) setup of the music controller
+        await MusicController._MusicController__create_database_tables(music)
+        music.artists = ArtistsController(mass)
+        music.albums = AlbumsController(mass)
+        music.tracks = TracksController(mass)
+        music.get_controller = partial(MusicController.get_controller, music)
+        artist = await music.artists.add_item_to_library(
+            Artist(item_id="1", provider="test", name="Artist", provider_mappings=_mapping("1")),
+            metadata_lookup=False,
+        )
+        albums = [
+            await music.albums.add_item_to_library(
+                Album(
+                    item_id=item_id,
+                    provider="test",
+                    name=f"Album {item_id}",
+                    artists=[artist],
+                    provider_mappings=_mapping(item_id),
+                ),
+                metadata_lookup=False,
+            )
+            for item_id in ("1", "2")
+        ]
+        # note the quote in the (provider) item id
+        prov_tracks = [
+            Track(
+                item_id=item_id,
+                provider="test",
+                name=f"Track {item_id}",
+                artists=[artist],
+                provider_mappings=_mapping(item_id),
+            )
+            for item_id in ("1", "it's", "3")
+        ]
+        db_ids = set()
+        for prov_track in prov_tracks:
+            prov_track.album = albums[0]
+            library_track = await music.tracks.add_item_to_library(
+                prov_track, metadata_lookup=False
+            )
+            db_ids.add(library_track.item_id)
+            # the track is also on the 2nd album (so the track query returns 2 rows per track)
+            await database.insert(
+                DB_TABLE_ALBUM_TRACKS,
+                {
+                    "track_id": int(library_track.item_id),
+                    "album_id": int(albums[1].item_id),
+                    "disc_number": 1,
+                    "track_number": 1,
+                },
+            )
+        new_track = Track(
+            item_id="4",
+            provider="test",
+            name="Track 4",
+            artists=[artist],
+            provider_mappings=_mapping("4"),
+        )
+        prov = _get_provider()
+        prov.mass = mass
+        cur_db_ids: set[int] = set()
+        await prov._sync_library_batch(MediaType.TRACK, [*prov_tracks, new_track], cur_db_ids)
+
+        # the existing tracks are all found, only the new track is added
+        assert await database.get_count(DB_TABLE_TRACKS) == 4
+        assert len(cur_db_ids) == 4
+        assert db_ids < cur_db_ids
+    finally:
+        await database.close()
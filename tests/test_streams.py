@@ -0,0 +1,119 @@
+"""Tests for the streams controller helpers."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from types import SimpleNamespace
+
+import pytest
+
+from music_assistant.common.models.enums import ContentType
+from music_assistant.common.models.errors import MediaNotFoundError
+from music_assistant.common.models.media_items import AudioFormat
+from music_assistant.server.controllers import streams
+from music_assistant.server.controllers.streams import (
+    FlowStreamPrefetch,
+    StreamProfile,
+    batch_chunks,
+)
+
+
+async def _iter_chunks(chunks: list[bytes], delay: float = 0) -> AsyncGenerator[bytes, None]:
+    """Yield the chunks (with a delay before each chunk after the first)."""
+    for index, chunk in enumerate(chunks):
+        if index and delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+async def test_batch_chunks():
+    """Test batching audio chunks into an initial burst and (larger) writes."""
+    profile = StreamProfile(
+        pcm_chunk_seconds=2,
+        read_size=10,
+        pipe_size=None,
+        initial_burst=25,
+        write_batch_size=20,
+        max_batch_delay=10,
+    )
+    chunks = [b"x" * 10] * 8
+    result = [len(x) async for x in batch_chunks(_iter_chunks(chunks), profile)]
+    assert result == [30, 20, 20, 10]
+    # (large) chunks that fill a batch by itself are passed as-is
+    result = [len(x) async for x in batch_chunks(_iter_chunks([b"x" * 40] * 2), profile)]
+    assert result == [40, 40]
+    # (slow) real-time sources are not held back longer than the max delay
+    profile = StreamProfile(
+        pcm_chunk_seconds=2,
+        read_size=10,
+        pipe_size=None,
+        initial_burst=1000,
+        write_batch_size=1000,
+        max_batch_delay=0.01,
+    )
+    result = [len(x) async for x in batch_chunks(_iter_chunks([b"x" * 10] * 4, 0.02), profile)]
+    assert result == [20, 20]
+
+
+async def test_flow_stream_prefetch(monkeypatch: pytest.MonkeyPatch):
+    """Test prefetching (and buffering) the next track of a flow stream."""
+    # 4000 bytes per second
+    pcm_format = AudioFormat(
+        content_type=ContentType.PCM_S16LE, sample_rate=1000, bit_depth=16, channels=2
+    )
+    next_tracks = ["track1", "missing", "track2"]
+    received: list[str] = []
+    reported: list[str] = []
+
+    async def preload_next_url(queue_id: str) -> tuple[str, str, bool]:  # noqa: ARG001
+        return "url", next_tracks.pop(0), False
+
+    async def get_stream_details(mass: SimpleNamespace, queue_track: str) -> str:  # noqa: ARG001
+        if queue_track == "missing":
+            raise MediaNotFoundError("missing")
+        return f"{queue_track}_streamdetails"
+
+    async def get_media_stream(
+        mass: SimpleNamespace, streamdetails: str, **kwargs  # noqa: ARG001
+    ) -> AsyncGenerator[bytes, None]:
+        assert kwargs["report_playback"] is False
+        for _ in range(10):
+            received.append(streamdetails)
+            yield b"x" * 1000
+
+    async def report_stream_played(
+        mass: SimpleNamespace, streamdetails: str  # noqa: ARG001
+    ) -> None:
+        reported.append(streamdetails)
+
+    monkeypatch.setattr(streams, "get_stream_details", get_stream_details)
+    monkeypatch.setattr(streams, "get_media_stream", get_media_stream)
+    monkeypatch.setattr(streams, "report_stream_played", report_stream_played)
+    mass = SimpleNamespace(
+        player_queues=SimpleNamespace(preload_next_url=preload_next_url),
+    )
+    stream_controller = SimpleNamespace(mass=mass)
+
+    prefetch = FlowStreamPrefetch(stream_controller, "queue", pcm_format, buffer_seconds=1)
+    assert await prefetch.get_next_track() == ("track1", False, "track1_streamdetails")
+    await asyncio.sleep(0.01)
+    # the buffer is limited to 1 second of audio
+    assert len(received) == 5
+    chunks = [x async for x in prefetch.iter_chunks()]
+    assert b"".join(chunks) == b"x" * 10000
+    assert reported == ["track1_streamdetails"]
+
+    # a track without streamdetails is skipped by the flow stream
+    prefetch = FlowStreamPrefetch(stream_controller, "queue", pcm_format)
+    with pytest.raises(MediaNotFoundError):
+        await prefetch.get_next_track()
+
+    # a prefetched track that is never played (e.g. the stream ends) is not reported
+    received.clear()
+    prefetch = FlowStreamPrefetch(stream_controller, "queue", pcm_format, buffer_seconds=1)
+    await prefetch.get_next_track()
+    await asyncio.sleep(0.01)
+    prefetch.stop()
+    await asyncio.sleep(0.01)
+    assert prefetch._prefetch_task.cancelled()
+    assert len(received) == 5
+    assert reported == ["track1_streamdetails"]
@@ -1,7 +1,16 @@
 """Tests for parsing ID3 tags functions."""
 
+import base64
 import pathlib
 
+import pytest
+from mutagen._vorbis import VCommentDict
+from mutagen.flac import Picture
+from mutagen.id3 import APIC, ID3, TIT2, TPE1, TXXX
+from mutagen.mp3 import MP3
+from mutagen.mp4 import MP4, MP4Cover, MP4FreeForm, MP4Tags
+from mutagen.oggvorbis import OggVorbis
+
 from music_assistant.server.helpers import tags
 
 RESOURCES_DIR = pathlib.Path(__file__).parent.resolve().joinpath("fixtures")
@@ -73,3 +82,50 @@ async def test_parse_metadata_from_invalid_filename():
     assert _tags.musicbrainz_artistids == tuple()
     assert _tags.musicbrainz_releasegroupid is None
     assert _tags.musicbrainz_trackid is None
+
+
+# the mutagen file objects are created without a file
+@pytest.mark.filterwarnings("ignore:FileType constructor requires a filename")
+def test_native_tags():
+    """Test mapping the tags of the (in-process) mutagen reader to the ffprobe names."""
+    audio = MP3()
+    audio.tags = ID3()
+    audio.tags.add(TIT2(encoding=3, text=["MyTitle"]))
+    audio.tags.add(TPE1(encoding=3, text=["MyArtist", "MyArtist2"]))
+    audio.tags.add(TXXX(encoding=3, desc="MusicBrainz Album Id", text=["abcdefg"]))
+    audio.tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=b"image"))
+    assert tags._get_native_tags(audio) == {
+        "title": "MyTitle",
+        "artist": "MyArtist;MyArtist2",
+        "MusicBrainz Album Id": "abcdefg",
+    }
+    assert [x.data for x in tags._get_native_pictures(audio)] == [b"image"]
+
+    audio = MP4()
+    audio.tags = MP4Tags()
+    audio.tags["©nam"] = ["MyTitle"]
+    audio.tags["trkn"] = [(1, 10)]
+    audio.tags["disk"] = [(1, 0)]
+    audio.tags["----:com.apple.iTunes:MusicBrainz Track Id"] = [MP4FreeForm(b"abcdefg")]
+    audio.tags["covr"] = [MP4Cover(b"image", MP4Cover.FORMAT_JPEG)]
+    assert tags._get_native_tags(audio) == {
+        "title": "MyTitle",
+        "track": "1/10",
+        "disc": "1",
+        "MusicBrainz Track Id": "abcdefg",
+    }
+    assert [(x.type, x.data) for x in tags._get_native_pictures(audio)] == [(3, b"image")]
+    assert tags._mp4_value_to_str((2, 12)) == "2/12"
+    assert tags._mp4_value_to_str(b"abc") == "abc"
+    assert tags._mp4_value_to_str(2023) == "2023"
+
+    audio = OggVorbis()
+    audio.tags = VCommentDict()
+    audio.tags["albumartist"] = ["MyArtist"]
+    audio.tags["tracknumber"] = ["3"]
+    picture = Picture()
+    picture.type = 3
+    picture.data = b"image"
+    audio.tags["metadata_block_picture"] = [base64.b64encode(picture.write()).decode()]
+    assert tags._get_native_tags(audio) == {"album_artist": "MyArtist", "track": "3"}
+    assert [x.data for x in tags._get_native_pictures(audio)] == [b"image"]